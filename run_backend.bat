@@ -1,5 +1,6 @@
 @echo off
 call .venv\Scripts\activate.bat
+set SMS_DEBUG=1
 cd sms
 py manage.py populate_ledger
 py manage.py runserver
\ No newline at end of file
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 04:40
+
+import sms.campus
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense', '0004_expense_expense_date_category_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='campus',
+            field=models.CharField(default=sms.campus.current_campus, editable=False, max_length=20),
+        ),
+    ]
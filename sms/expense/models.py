@@ -1,7 +1,9 @@
 from django.db import models
+from sms.campus import CampusManager, current_campus
+from sms.tracking import TrackLoadedValuesMixin
 
 # Create your models here.
-class Expense(models.Model):
+class Expense(TrackLoadedValuesMixin, models.Model):
     class ExpenseCategory(models.TextChoices):
         SALARIES = 'SALARIES', 'Salaries'
         RENT = 'RENT', 'Rent'
@@ -17,6 +19,17 @@ class Expense(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     description = models.TextField(blank=True, null=True)
     date = models.DateField()
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = CampusManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'], name='expense_date_id_idx'),
+            # Date range + category filters
+            models.Index(fields=['date', 'category'], name='expense_date_category_idx'),
+        ]
 
     def __str__(self):
         return f"{self.category} - {self.amount}"
\ No newline at end of file
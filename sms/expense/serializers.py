@@ -1,9 +1,11 @@
 from rest_framework import serializers
+from sms.serializers import FastListSerializer, SparseFieldsMixin
 from .models import Expense
 
-class ExpenseSerializer(serializers.ModelSerializer):
+class ExpenseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category_display = serializers.CharField(source='get_category_display', read_only=True)
 
     class Meta:
         model = Expense
-        fields = ['id', 'category', 'category_display', 'amount', 'description', 'date']
\ No newline at end of file
+        fields = ['id', 'category', 'category_display', 'amount', 'description', 'date']
+        list_serializer_class = FastListSerializer
\ No newline at end of file
@@ -1,3 +1,15 @@
+from datetime import date
+
 from django.test import TestCase
 
-# Create your tests here.
+from expense.models import Expense
+from sms.testing import QueryBudgetMixin
+
+
+class ExpenseQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def add_expenses(self, count):
+        for i in range(count):
+            Expense.objects.create(category=Expense.ExpenseCategory.RENT, amount=1000, date=date(2025, 1, 1 + i))
+
+    def test_expense_list(self):
+        self.assertQueryCountFlat('/api/expenses/', self.add_expenses)
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import ExpenseListCreateAPIView, ExpenseRetrieveUpdateDestroyAPIView
+from .views import ExpenseListCreateAPIView, ExpenseRetrieveUpdateDestroyAPIView, ExpenseExportAPIView
 
 urlpatterns = [
     path('api/expenses/', ExpenseListCreateAPIView.as_view(), name='expense-list-create'),
+    path('api/expenses/export/', ExpenseExportAPIView.as_view(), name='expense-export'),
     path('api/expenses/<int:pk>/', ExpenseRetrieveUpdateDestroyAPIView.as_view(), name='expense-detail'),
 ]
\ No newline at end of file
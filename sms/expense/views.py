@@ -1,11 +1,29 @@
 from rest_framework import generics
 from .models import Expense
 from .serializers import ExpenseSerializer
+from sms.exports import ExportMixin
+from sms.filters import filter_date_range
+from sms.sync import ConditionalListMixin
 
 # List all expenses or create a new one
-class ExpenseListCreateAPIView(generics.ListCreateAPIView):
+class ExpenseListCreateAPIView(ConditionalListMixin, generics.ListCreateAPIView):
     queryset = Expense.objects.all()
     serializer_class = ExpenseSerializer
+    keyset_ordering = ('-date', '-id')
+
+    def get_queryset(self):
+        queryset = filter_date_range(super().get_queryset(), self.request, 'date', 'date_from', 'date_to')
+
+        category = self.request.query_params.get('category')
+        if category:
+            queryset = queryset.filter(category=category)
+
+        return queryset
+
+# Download the (filtered) expenses as CSV/XLSX
+class ExpenseExportAPIView(ExportMixin, ExpenseListCreateAPIView):
+    export_filename = 'expenses'
+    export_fields = ('id', 'date', 'category', 'amount', 'description')
 
 # Retrieve, update, or delete a specific expense by ID
 class ExpenseRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
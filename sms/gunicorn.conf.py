@@ -0,0 +1,37 @@
+# Production server profile: `gunicorn -c gunicorn.conf.py` (the Docker image's
+# command). SMS_SERVER=wsgi (the default) runs threaded sync workers on
+# sms.wsgi; SMS_SERVER=asgi runs uvicorn workers on sms.asgi with the async read
+# endpoints (sms.asyncviews). `kill -HUP <master>` replaces the workers gracefully; as
+# the app is preloaded, new code needs a full restart (or USR2 then QUIT).
+import multiprocessing
+import os
+
+server = os.environ.get('SMS_SERVER', 'wsgi')
+if server not in ('asgi', 'wsgi'):
+    raise ValueError(f"SMS_SERVER must be asgi or wsgi, not {server!r}")
+os.environ.setdefault('SMS_ASYNC_VIEWS', '1' if server == 'asgi' else '0')
+
+wsgi_app = f'sms.{server}:application'
+worker_class = 'uvicorn_worker.UvicornWorker' if server == 'asgi' else 'gthread'
+bind = os.environ.get('SMS_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('SMS_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# Threads per gthread worker (wsgi only)
+threads = int(os.environ.get('SMS_THREADS', 4))
+
+# Import Django once in the master; workers fork with it loaded
+preload_app = True
+keepalive = int(os.environ.get('SMS_KEEPALIVE', 5))
+timeout = int(os.environ.get('SMS_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('SMS_GRACEFUL_TIMEOUT', 30))
+# Recycle workers now and then, staggered so they don't all restart together
+max_requests = int(os.environ.get('SMS_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('SMS_MAX_REQUESTS_JITTER', 200))
+
+accesslog = os.environ.get('SMS_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Connections opened while preloading belong to the master
+    from django.db import connections
+    connections.close_all()
@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "object_id", "status", "done", "total", "created_at", "finished_at")
+    list_filter = ("kind", "status")
+    readonly_fields = ("result", "error")
@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from jobs.models import Job
+from jobs.queue import requeue_stale, run_job
+from sms.campus import use_campus
+
+class Command(BaseCommand):
+    help = 'Run queued generation jobs, and requeue running ones whose worker died, e.g. in a server restart'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forever', action='store_true', help='Keep polling for new jobs')
+        parser.add_argument('--interval', type=float, default=2.0, help='Polling interval in seconds')
+        parser.add_argument(
+            '--stale-minutes', type=int, default=settings.JOBS_STALE_MINUTES,
+            help='Requeue running jobs with no heartbeat for this long',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            for campus in settings.CAMPUSES:
+                with use_campus(campus):
+                    requeued = requeue_stale(options['stale_minutes'])
+                    if requeued:
+                        self.stdout.write(f"Requeued {requeued} stale job(s) [{campus}]")
+                    self.run_queued()
+
+            if not options['forever']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS('Job queue drained'))
+
+    def run_queued(self):
+        job_ids = list(Job.objects.filter(status=Job.Status.QUEUED).order_by('id').values_list('id', flat=True))
+        for job_id in job_ids:
+            run_job(job_id)
+            job = Job.objects.get(pk=job_id)
+            self.stdout.write(f"{job} [{job.campus}]")
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 04:40
+
+import sms.campus
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='campus',
+            field=models.CharField(default=sms.campus.current_campus, editable=False, max_length=20),
+        ),
+    ]
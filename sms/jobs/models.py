@@ -0,0 +1,43 @@
+from django.db import models
+from django.utils import timezone
+
+from sms.campus import CampusManager, current_campus
+
+
+class Job(models.Model):
+    class Kind(models.TextChoices):
+        GENERATE_FEES = 'GENERATE_FEES', 'Generate Fees'
+        GENERATE_TEACHER_PAY = 'GENERATE_TEACHER_PAY', 'Generate Teacher Pay'
+
+    class Status(models.TextChoices):
+        QUEUED = 'QUEUED', 'Queued'
+        RUNNING = 'RUNNING', 'Running'
+        SUCCEEDED = 'SUCCEEDED', 'Succeeded'
+        FAILED = 'FAILED', 'Failed'
+
+    kind = models.CharField(max_length=30, choices=Kind.choices)
+    object_id = models.IntegerField()
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED, db_index=True)
+    done = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Set when the job is claimed and on every progress report; a RUNNING job
+    # whose heartbeat stops was lost with its worker and is requeued by run_jobs
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    # Campus the job was queued for; it runs in that campus
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+
+    objects = CampusManager()
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id} ({self.status})"
+
+    @property
+    def duration_ms(self):
+        if not self.started_at:
+            return None
+        return round(((self.finished_at or timezone.now()) - self.started_at).total_seconds() * 1000, 2)
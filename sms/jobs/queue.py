@@ -0,0 +1,103 @@
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from jobs.models import Job
+from sms.campus import campus_database, use_campus
+
+logger = logging.getLogger(__name__)
+
+# Task callables receive (object_id, progress) and return a JSON-serialisable result
+TASKS = {
+    Job.Kind.GENERATE_FEES: 'students.utils.generate_fees_job',
+    Job.Kind.GENERATE_TEACHER_PAY: 'teachers.utils.generate_pay_job',
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.JOBS_MAX_WORKERS,
+                thread_name_prefix='sms-jobs',
+            )
+    return _executor
+
+
+def enqueue(kind, object_id):
+    job = Job.objects.create(kind=kind, object_id=object_id)
+
+    if settings.JOBS_RUN_INLINE:
+        run_job(job.pk)
+        job.refresh_from_db()
+    else:
+        transaction.on_commit(
+            lambda: _get_executor().submit(_run_in_worker, job.pk, job.campus), using=campus_database(job.campus)
+        )
+
+    return job
+
+
+def _run_in_worker(job_id, campus):
+    # Pool threads don't inherit the request's campus
+    try:
+        with use_campus(campus):
+            run_job(job_id)
+    finally:
+        connections.close_all()
+
+
+def run_job(job_id):
+    # Claim the job so the same row is never run twice (thread pool vs run_jobs)
+    now = timezone.now()
+    claimed = Job.objects.filter(pk=job_id, status=Job.Status.QUEUED).update(
+        status=Job.Status.RUNNING, started_at=now, heartbeat_at=now
+    )
+    if not claimed:
+        return
+
+    job = Job.objects.get(pk=job_id)
+
+    def progress(done, total):
+        # On the row (one small update per batch) so every worker and process sees it
+        Job.objects.filter(pk=job_id).update(done=done, total=total, heartbeat_at=timezone.now())
+
+    try:
+        result = import_string(TASKS[job.kind])(job.object_id, progress=progress)
+    except Exception:
+        logger.exception("Job %s failed", job_id)
+        Job.objects.filter(pk=job_id).update(
+            status=Job.Status.FAILED,
+            error=traceback.format_exc(),
+            finished_at=timezone.now(),
+        )
+    else:
+        Job.objects.filter(pk=job_id).update(
+            status=Job.Status.SUCCEEDED,
+            result=result,
+            finished_at=timezone.now(),
+        )
+
+
+def requeue_stale(minutes=None):
+    # RUNNING jobs with no heartbeat for `minutes` lost their worker (a restart
+    # or crash); put them back in the queue. The tasks are idempotent, so a job
+    # that was only slow just finds its work done.
+    minutes = settings.JOBS_STALE_MINUTES if minutes is None else minutes
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    return Job.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status=Job.Status.RUNNING,
+    ).update(status=Job.Status.QUEUED, started_at=None, heartbeat_at=None)
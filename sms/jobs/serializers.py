@@ -0,0 +1,12 @@
+from rest_framework import serializers
+from .models import Job
+
+class JobSerializer (serializers.ModelSerializer):
+    duration_ms = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'object_id', 'status', 'done', 'total', 'duration_ms',
+            'result', 'error', 'created_at', 'started_at', 'finished_at'
+        ]
@@ -0,0 +1,78 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs import queue
+from jobs.models import Job
+
+
+def counting_task(object_id, progress):
+    # Checks each progress report is visible to a poller while the job runs
+    for done in range(1, object_id + 1):
+        progress(done, object_id)
+        job = Job.objects.get(kind=Job.Kind.GENERATE_FEES, object_id=object_id)
+        counting_task.polled.append((job.status, job.done, job.total))
+    return {'counted': object_id}
+
+
+def failing_task(object_id, progress):
+    progress(1, 2)
+    raise RuntimeError('out of paper')
+
+
+TASKS = {Job.Kind.GENERATE_FEES: 'jobs.tests.counting_task'}
+
+
+@mock.patch.dict(queue.TASKS, TASKS)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        counting_task.polled = []
+
+    def test_enqueue_run_and_poll(self):
+        job = queue.enqueue(Job.Kind.GENERATE_FEES, 3)
+        self.assertEqual(self.client.get(f'/api/jobs/{job.pk}/').json()['status'], 'QUEUED')
+
+        queue.run_job(job.pk)
+        self.assertEqual(counting_task.polled, [('RUNNING', 1, 3), ('RUNNING', 2, 3), ('RUNNING', 3, 3)])
+        data = self.client.get(f'/api/jobs/{job.pk}/').json()
+        self.assertEqual(
+            (data['status'], data['done'], data['total'], data['result']), ('SUCCEEDED', 3, 3, {'counted': 3})
+        )
+        self.assertIsNotNone(data['duration_ms'])
+
+        # A finished job is never claimed again
+        queue.run_job(job.pk)
+        self.assertEqual(len(counting_task.polled), 3)
+
+    @mock.patch.dict(queue.TASKS, {Job.Kind.GENERATE_FEES: 'jobs.tests.failing_task'})
+    def test_failure_is_recorded(self):
+        job = queue.enqueue(Job.Kind.GENERATE_FEES, 1)
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            queue.run_job(job.pk)
+        data = self.client.get(f'/api/jobs/{job.pk}/').json()
+        self.assertEqual((data['status'], data['done'], data['total']), ('FAILED', 1, 2))
+        self.assertIn('RuntimeError: out of paper', data['error'])
+        self.assertIsNotNone(data['finished_at'])
+
+    @override_settings(CAMPUSES={'main': 'default'})
+    def test_run_jobs_requeues_stale_running_jobs(self):
+        old = timezone.now() - timedelta(hours=1)
+        lost = Job.objects.create(
+            kind=Job.Kind.GENERATE_FEES, object_id=2, status=Job.Status.RUNNING, started_at=old, heartbeat_at=old,
+        )
+        alive = Job.objects.create(
+            kind=Job.Kind.GENERATE_FEES, object_id=5, status=Job.Status.RUNNING, started_at=old,
+            heartbeat_at=timezone.now(),
+        )
+
+        out = StringIO()
+        call_command('run_jobs', stdout=out)
+        self.assertIn('Requeued 1 stale job(s)', out.getvalue())
+        lost.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual((lost.status, lost.result), (Job.Status.SUCCEEDED, {'counted': 2}))
+        self.assertEqual(alive.status, Job.Status.RUNNING)
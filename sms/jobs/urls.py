@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import JobListApiView, JobRetrieveApiView
+
+urlpatterns = [
+    path('api/jobs/', JobListApiView.as_view(), name='job-list'),
+    path('api/jobs/<int:pk>/', JobRetrieveApiView.as_view(), name='job-detail'),
+]
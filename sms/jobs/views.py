@@ -0,0 +1,21 @@
+from rest_framework import generics
+from .models import Job
+from .serializers import JobSerializer
+
+# Recent generation jobs, newest first
+class JobListApiView (generics.ListAPIView):
+    queryset = Job.objects.order_by('-id')
+    serializer_class = JobSerializer
+    keyset_ordering = ('-id',)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # Without ?page_size= or ?cursor= only the latest 50 jobs, not the whole table
+        if self.paginator is None or not self.paginator.is_paging(self.request):
+            return queryset[:50]
+        return queryset
+
+# Status, progress and failure details of a single job
+class JobRetrieveApiView (generics.RetrieveAPIView):
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
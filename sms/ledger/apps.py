@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class LedgerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ledger'
+
+    def ready(self):
+        # Keep Ledger rows current as fees, pays and expenses change
+        from ledger import signals  # noqa: F401
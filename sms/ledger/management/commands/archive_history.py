@@ -0,0 +1,34 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from sms.archive import ARCHIVE_BATCH_SIZE, academic_year_start
+from students.utils import archive_fees
+from teachers.utils import archive_pays
+
+
+class Command(BaseCommand):
+    help = 'Move fees and paid teacher pays of closed academic years into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before', help='YYYY-MM-DD, archive months before this; defaults to the start of the current academic year'
+        )
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would move')
+
+    def handle(self, *args, **options):
+        current_year = academic_year_start()
+        if options['before']:
+            try:
+                before = date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError('--before must be YYYY-MM-DD')
+            if before > current_year:
+                raise CommandError(f"Only closed academic years can be archived (before {current_year})")
+        else:
+            before = current_year
+
+        fees = archive_fees(before, batch_size=options['batch_size'], dry_run=options['dry_run'])
+        pays = archive_pays(before, batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = 'Would archive' if options['dry_run'] else 'Archived'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {fees} fees and {pays} teacher pays from before {before}"))
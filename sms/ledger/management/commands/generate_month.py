@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from sms.campus import run_per_campus
+from students.models import FeeGeneration
+from teachers.models import GenerateTeacherPay
+
+
+def generate(month):
+    # The same records the API creates; their jobs run right here in the campus's thread
+    with override_settings(JOBS_RUN_INLINE=True):
+        fees = FeeGeneration.objects.create(month=month)
+        pays = GenerateTeacherPay.objects.create(month=month)
+    return {'fees': fees.job.result, 'pays': pays.job.result}
+
+
+class Command(BaseCommand):
+    help = "Generate a month's student fees and teacher pay for every campus, campuses in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', required=True, help='YYYY-MM')
+        parser.add_argument('--campus', action='append', help='Limit to these campuses (default: all)')
+        parser.add_argument('--workers', type=int, help='Campuses generated at once (default: all)')
+
+    def handle(self, *args, **options):
+        try:
+            month = date.fromisoformat(f"{options['month']}-01")
+        except ValueError:
+            raise CommandError('--month must be YYYY-MM')
+
+        results = run_per_campus(lambda: generate(month), options['campus'], options['workers'])
+        for campus, result in results.items():
+            self.stdout.write(f"{campus}: fees {result['fees']}, pays {result['pays']}")
+        self.stdout.write(self.style.SUCCESS(f"Generated {month:%B %Y} for {len(results)} campuses"))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from sms.synthetic import generate_school
+from students.models import Student
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with a synthetic school: students, teachers and years of fees, pays and expenses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=500)
+        parser.add_argument('--teachers', type=int, default=30)
+        parser.add_argument('--years', type=int, default=2)
+        parser.add_argument('--expenses-per-month', type=int, default=8)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--append', action='store_true', help='Add to a database that already has students')
+
+    def handle(self, *args, **options):
+        if Student.objects.exists() and not options['append']:
+            raise CommandError('The database already has students; pass --append to add a synthetic school anyway')
+
+        counts = generate_school(
+            students=options['students'],
+            teachers=options['teachers'],
+            years=options['years'],
+            expenses_per_month=options['expenses_per_month'],
+            seed=options['seed'],
+        )
+        self.stdout.write(self.style.SUCCESS(', '.join(f"{count} {name}" for name, count in counts.items())))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from sms.loadtest import LOAD_PATHS, SERVER_COMMANDS, run_load, serve
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the read endpoints, either against a running server (--url) or starting each '
+        'server setup in turn on the configured database (--serve runserver asgi)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Base URL of a running server')
+        parser.add_argument('--serve', nargs='+', choices=sorted(SERVER_COMMANDS), help='Server setups to start and compare')
+        parser.add_argument('--port', type=int, default=8800)
+        parser.add_argument('--workers', type=int, help='SMS_WORKERS for the gunicorn setups')
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument('--paths', nargs='+', default=LOAD_PATHS)
+
+    def handle(self, *args, **options):
+        if bool(options['url']) == bool(options['serve']):
+            raise CommandError('Give either --url or --serve.')
+
+        load = {'paths': options['paths'], 'concurrency': options['concurrency'], 'duration': options['duration']}
+        results = {}
+        if options['url']:
+            results[options['url']] = run_load(options['url'], **load)
+        else:
+            env = {'SMS_WORKERS': str(options['workers'])} if options['workers'] else None
+            for kind in options['serve']:
+                self.stdout.write(f"Starting {kind}...")
+                with serve(kind, port=options['port'], env=env) as url:
+                    # One short pass to open connections and warm caches
+                    run_load(url, options['paths'], concurrency=2, duration=1)
+                    results[kind] = run_load(url, **load)
+
+        baseline = None
+        for name, result in results.items():
+            line = (
+                f"{name:<12} {result['requests_per_second']:>9.1f} req/s  p50 {result.get('p50_ms', '-')} ms  "
+                f"p95 {result.get('p95_ms', '-')} ms  p99 {result.get('p99_ms', '-')} ms  errors {result['errors']}"
+            )
+            if baseline is None:
+                baseline = result['requests_per_second']
+            elif baseline:
+                line += f"  {result['requests_per_second'] / baseline:.2f}x"
+            self.stdout.write(line)
@@ -1,10 +1,17 @@
 from django.core.management.base import BaseCommand
+from sms.campus import run_per_campus
 from sms.utils import calculate_monthly_profit  # Ensure this import is correct
 
 class Command(BaseCommand):
     help = 'Populate the Ledger table with monthly profit data'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--campus', action='append', help='Limit to these campuses (default: all)')
+        parser.add_argument('--workers', type=int, help='Campuses rebuilt at once (default: all)')
+
     def handle(self, *args, **kwargs):
-        # Call the function to populate the ledger
-        calculate_monthly_profit()
+        # Call the function to populate the ledger, each campus in parallel
+        results = run_per_campus(calculate_monthly_profit, kwargs['campus'], kwargs['workers'])
+        for campus, monthly_data in results.items():
+            self.stdout.write(f"{campus}: {len(monthly_data)} months")
         self.stdout.write(self.style.SUCCESS('Ledger populated successfully'))
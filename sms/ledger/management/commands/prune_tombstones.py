@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ledger.models import Tombstone
+from sms.campus import run_per_campus
+
+
+class Command(BaseCommand):
+    help = 'Delete the tombstones of rows deleted longer ago than settings.SYNC_TOMBSTONE_DAYS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SYNC_TOMBSTONE_DAYS)
+
+    def handle(self, *args, **options):
+        if options['days'] < settings.SYNC_TOMBSTONE_DAYS:
+            self.stdout.write(self.style.WARNING(
+                f"Clients may still sync from {settings.SYNC_TOMBSTONE_DAYS} days back and would miss these deletes"
+            ))
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        pruned = run_per_campus(lambda: Tombstone.objects.filter(deleted_at__lt=cutoff).delete()[0])
+        for campus, count in pruned.items():
+            self.stdout.write(f"{campus}: {count} tombstones")
+        self.stdout.write(self.style.SUCCESS('Tombstones pruned'))
@@ -0,0 +1,87 @@
+import json
+import platform
+import subprocess
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+from django.utils import timezone
+from sms.benchmarks import compare, run_benchmarks
+from sms.synthetic import generate_school
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Time and query-count the hot paths on a synthetic school and write the results as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--teachers', type=int, default=50)
+        parser.add_argument('--years', type=int, default=2)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--only', nargs='*', help='Run the benchmarks whose names contain any of these')
+        parser.add_argument('--output', default='benchmarks.json')
+        parser.add_argument('--compare', help='Earlier results file to print the change against')
+        parser.add_argument(
+            '--existing-data', action='store_true',
+            help='Use the configured database as it is instead of a throwaway one (generation benchmarks add rows)'
+        )
+
+    def handle(self, *args, **options):
+        previous = None
+        if options['compare']:
+            try:
+                previous = json.loads(Path(options['compare']).read_text())['results']
+            except (OSError, ValueError, KeyError):
+                raise CommandError(f"Can't read benchmark results from {options['compare']}")
+
+        scale = None
+        old_config = None
+        # The test client's host and a throwaway database, as in the test runner
+        setup_test_environment()
+        if not options['existing_data']:
+            old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            if not options['existing_data']:
+                scale = generate_school(
+                    students=options['students'], teachers=options['teachers'], years=options['years']
+                )
+                self.stdout.write(f"Generated {scale}")
+            results = run_benchmarks(repeat=options['repeat'], only=options['only'])
+        finally:
+            if old_config is not None:
+                teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'commit': _commit(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'scale': scale,
+            'results': results,
+        }
+        Path(options['output']).write_text(json.dumps(report, indent=2) + '\n')
+
+        for name, result in results.items():
+            self.stdout.write(f"{name:<40} {result['median_ms']:>10.2f} ms {result['queries']:>6} queries")
+        if previous:
+            self.stdout.write('\nChange against ' + options['compare'])
+            for name, before, after, ratio in compare(results, previous):
+                change = f"{ratio:.2f}x" if ratio is not None else '-'
+                self.stdout.write(f"{name:<40} {before:>10.2f} -> {after:>10.2f} ms  {change}")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0002_dataversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ledger',
+            name='MonthlyCollections',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+    ]
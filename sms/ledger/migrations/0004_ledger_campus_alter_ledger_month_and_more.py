@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 04:40
+
+import sms.campus
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0003_ledger_monthlycollections'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ledger',
+            name='campus',
+            field=models.CharField(default=sms.campus.current_campus, editable=False, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='ledger',
+            name='month',
+            field=models.DateField(),
+        ),
+        migrations.AddConstraint(
+            model_name='ledger',
+            constraint=models.UniqueConstraint(fields=('campus', 'month'), name='ledger_campus_month_uniq'),
+        ),
+    ]
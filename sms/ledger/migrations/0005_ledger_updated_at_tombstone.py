@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 04:54
+
+import django.utils.timezone
+import sms.campus
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0004_ledger_campus_alter_ledger_month_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ledger',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=50)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('campus', models.CharField(default=sms.campus.current_campus, editable=False, max_length=20)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'deleted_at'], name='tombstone_model_deleted_idx')],
+            },
+        ),
+    ]
@@ -1,11 +1,108 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from sms.campus import CampusManager, campus_database, current_campus, use_campus
+
+
+class LedgerManager(CampusManager):
+    def apply_delta(self, month, student_fees=0, teacher_pays=0, expenses=0, collections=0):
+        # Shift one month's totals in place; the row is created on first use and
+        # removed once they are all back to zero, as a full rebuild would leave it
+        if not (student_fees or teacher_pays or expenses or collections):
+            return
+        month = month.replace(day=1)
+        with transaction.atomic(using=self.db):
+            self.get_or_create(month=month)
+            self.filter(month=month).update(
+                updated_at=timezone.now(),
+                MonthlyStudentFees=F('MonthlyStudentFees') + student_fees,
+                MonthlyTeacherPays=F('MonthlyTeacherPays') + teacher_pays,
+                MonthlyExpenses=F('MonthlyExpenses') + expenses,
+                MonthlyProfit=F('MonthlyProfit') + student_fees - teacher_pays - expenses,
+                MonthlyCollections=F('MonthlyCollections') + collections,
+            )
+            if min(student_fees, teacher_pays, expenses, collections) < 0:
+                self.filter(
+                    month=month, MonthlyStudentFees=0, MonthlyTeacherPays=0, MonthlyExpenses=0, MonthlyCollections=0,
+                ).delete()
+
+
+class DataVersionManager(models.Manager):
+    def current(self, key='reports'):
+        return self.filter(key=key).values_list('version', flat=True).first() or 0
+
+    async def acurrent(self, key='reports'):
+        return await self.filter(key=key).values_list('version', flat=True).afirst() or 0
+
+    def bump(self, key='reports'):
+        if not self.filter(key=key).update(version=F('version') + 1):
+            self.get_or_create(key=key, defaults={'version': 1})
+
+
+class DataVersion(models.Model):
+    # Bumped after every committed change to fees, pays, expenses, students or the
+    # ledger; cached reports are keyed on it so every worker sees the same version
+    key = models.CharField(max_length=30, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    objects = DataVersionManager()
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+
+
+def mark_data_changed():
+    # Bump once the surrounding transaction on the campus's database commits,
+    # keeping the hot row out of it
+    campus = current_campus()
+
+    def bump():
+        with use_campus(campus):
+            DataVersion.objects.bump()
+    transaction.on_commit(bump, using=campus_database(campus))
+
+
+class TombstoneManager(CampusManager):
+    def record(self, model, ids):
+        self.bulk_create([self.model(model=model._meta.label_lower, object_id=pk) for pk in ids])
+
+
+class Tombstone(models.Model):
+    # A deleted (or archived) row, so ?since= syncs (sms.sync) can report it;
+    # pruned after settings.SYNC_TOMBSTONE_DAYS by prune_tombstones
+    model = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField()
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    objects = TombstoneManager()
+
+    class Meta:
+        indexes = [models.Index(fields=['model', 'deleted_at'], name='tombstone_model_deleted_idx')]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
 
 class Ledger(models.Model):
-    month = models.DateField(unique=True)  # Ensure that each month has only one entry
+    month = models.DateField()
     MonthlyStudentFees = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     MonthlyTeacherPays = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     MonthlyExpenses = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     MonthlyProfit = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # Fee payments received in the month (FeePayment log), as opposed to fees billed
+    MonthlyCollections = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = LedgerManager()
+
+    class Meta:
+        constraints = [
+            # One entry per campus and month
+            models.UniqueConstraint(fields=['campus', 'month'], name='ledger_campus_month_uniq'),
+        ]
 
     def __str__(self):
         return f"Ledger for {self.month.strftime('%B %Y')}"
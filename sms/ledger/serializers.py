@@ -1,7 +1,9 @@
 from rest_framework import serializers
+from sms.serializers import FastListSerializer, SparseFieldsMixin
 from .models import Ledger
 
-class LedgerSerializer (serializers.ModelSerializer):
+class LedgerSerializer (SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Ledger
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        list_serializer_class = FastListSerializer
\ No newline at end of file
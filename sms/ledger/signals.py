@@ -0,0 +1,88 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from expense.models import Expense
+from ledger.models import Ledger, Tombstone, mark_data_changed
+from sms.campus import use_campus
+from students.models import ArchivedStudentFee, Student, StudentFee
+from teachers.models import ArchivedTeacherPay, Teacher, TeacherPay
+
+# model -> (date field, amount field, Ledger.objects.apply_delta keyword)
+LEDGER_SOURCES = {
+    StudentFee: ('month', 'total_fee', 'student_fees'),
+    TeacherPay: ('month', 'pay', 'teacher_pays'),
+    Expense: ('date', 'amount', 'expenses'),
+    # Archived rows are still on the Ledger; they only leave it with their student or teacher
+    ArchivedStudentFee: ('month', 'total_fee', 'student_fees'),
+    ArchivedTeacherPay: ('month', 'pay', 'teacher_pays'),
+}
+
+
+@receiver(post_save, sender=StudentFee)
+@receiver(post_save, sender=TeacherPay)
+@receiver(post_save, sender=Expense)
+def apply_ledger_delta_on_save(sender, instance, created, **kwargs):
+    # The row's own campus ledger, whatever campus the request is in
+    with use_campus(instance.campus):
+        _apply_ledger_delta_on_save(sender, instance, created)
+
+
+def _apply_ledger_delta_on_save(sender, instance, created):
+    date_field, amount_field, column = LEDGER_SOURCES[sender]
+    new_month = getattr(instance, date_field)
+    new_amount = getattr(instance, amount_field)
+
+    if created:
+        Ledger.objects.apply_delta(new_month, **{column: new_amount})
+        return
+
+    if not instance.has_loaded(date_field, amount_field):
+        # Old values unknown (row was not loaded from the database): recount the month
+        from sms.utils import recalculate_month
+        recalculate_month(new_month)
+        return
+
+    old_month = instance.loaded_value(date_field)
+    old_amount = instance.loaded_value(amount_field)
+    if (old_month.year, old_month.month) == (new_month.year, new_month.month):
+        Ledger.objects.apply_delta(new_month, **{column: new_amount - old_amount})
+    else:
+        Ledger.objects.apply_delta(old_month, **{column: -old_amount})
+        Ledger.objects.apply_delta(new_month, **{column: new_amount})
+
+
+@receiver(post_delete, sender=StudentFee)
+@receiver(post_delete, sender=TeacherPay)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=ArchivedStudentFee)
+@receiver(post_delete, sender=ArchivedTeacherPay)
+def apply_ledger_delta_on_delete(sender, instance, **kwargs):
+    date_field, amount_field, column = LEDGER_SOURCES[sender]
+    with use_campus(instance.campus):
+        Ledger.objects.apply_delta(getattr(instance, date_field), **{column: -getattr(instance, amount_field)})
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=StudentFee)
+@receiver(post_save, sender=TeacherPay)
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=Ledger)
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=StudentFee)
+@receiver(post_delete, sender=TeacherPay)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Ledger)
+def invalidate_cached_reports(sender, **kwargs):
+    mark_data_changed()
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=StudentFee)
+@receiver(post_delete, sender=Teacher)
+@receiver(post_delete, sender=TeacherPay)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Ledger)
+def record_tombstone(sender, instance, **kwargs):
+    # For ?since= syncs (sms.sync); in the row's campus, as for the ledger
+    with use_campus(instance.campus):
+        Tombstone.objects.record(sender, [instance.pk])
@@ -1,3 +1,111 @@
+from datetime import date
+
 from django.test import TestCase
 
-# Create your tests here.
+from expense.models import Expense
+from ledger.models import Ledger
+from sms.testing import QueryBudgetMixin
+from sms.utils import calculate_monthly_profit
+from students.models import FeePayment, Student, StudentFee
+from students.utils import apply_fee_payments
+from teachers.models import Teacher, TeacherPay
+
+
+class LedgerQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def add_months(self, count):
+        start = Ledger.objects.count()
+        for i in range(start, start + count):
+            Ledger.objects.create(month=date(2020 + i // 12, i % 12 + 1, 1))
+
+    def test_ledger_list(self):
+        self.assertQueryCountFlat('/api/ledger/', self.add_months)
+
+
+class LedgerDeltaTests(TestCase):
+    def ledger(self):
+        return list(Ledger.objects.order_by('month').values_list(
+            'month', 'MonthlyStudentFees', 'MonthlyTeacherPays', 'MonthlyExpenses', 'MonthlyProfit', 'MonthlyCollections',
+        ))
+
+    def test_incremental_ledger_matches_full_recompute(self):
+        student = Student.objects.create(
+            name="Ali", grade=3, father_name="Father", contact="0300", address="Street", tuition_fee=5000,
+        )
+        fee = StudentFee.objects.create(student=student, month=date(2025, 1, 1), tuition_fee=5000)
+        fee.tuition_fee = 6000
+        fee.amount_paid = 2000
+        fee.save()
+        # Moves the whole fee from January to February
+        fee.month = date(2025, 2, 1)
+        fee.exam_fee = 500
+        fee.save()
+        StudentFee.objects.create(student=student, month=date(2025, 3, 1), tuition_fee=4000).delete()
+
+        teacher = Teacher.objects.create(name="Bilal", contact="0300", cnic="1", qualification="MSc", pay=30000)
+        pay = TeacherPay.objects.create(teacher=teacher, month=date(2025, 1, 1), pay=30000)
+        pay.pay = 32000
+        pay.save()
+        pay.month = date(2025, 3, 1)
+        pay.save()
+        TeacherPay.objects.create(teacher=teacher, month=date(2025, 2, 1), pay=1000).delete()
+
+        expense = Expense.objects.create(category='RENT', amount=100, date=date(2025, 1, 10))
+        expense.amount = 250
+        expense.save()
+        expense.date = date(2025, 2, 5)
+        expense.save()
+        Expense.objects.create(category='RENT', amount=70, date=date(2025, 3, 3)).delete()
+
+        incremental = self.ledger()
+        self.assertIn((date(2025, 2, 1), 6500, 0, 250, 6250), [row[:5] for row in incremental])
+        calculate_monthly_profit()
+        self.assertEqual(incremental, self.ledger())
+
+
+    def test_deleting_a_student_keeps_the_payment_log_and_ledger_in_step(self):
+        student = Student.objects.create(
+            name="Ali", grade=3, father_name="Father", contact="0300", address="Street", tuition_fee=5000,
+        )
+        apply_fee_payments({StudentFee.objects.get(student=student).pk: 500})
+        roll_no = student.pk
+        student.delete()
+
+        payment = FeePayment.objects.get()
+        self.assertEqual((payment.student_id, payment.roll_no, payment.amount), (None, roll_no, 500))
+        incremental = self.ledger()
+        self.assertEqual([row[5] for row in incremental], [500])
+        calculate_monthly_profit()
+        self.assertEqual(incremental, self.ledger())
+
+
+class DashboardSummaryTests(TestCase):
+    url = '/api/dashboard/summary/'
+
+    def test_summary_is_cached_until_data_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Expense.objects.create(category='RENT', amount=100, date=date.today())
+        first = self.client.get(self.url).json()
+        self.assertEqual(first['window']['expenses'], '100.00')
+
+        # Served from the cache: only the version lookup hits the database
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Expense.objects.create(category='RENT', amount=50, date=date.today())
+        second = self.client.get(self.url).json()
+        self.assertGreater(second['version'], first['version'])
+        self.assertEqual(second['lifetime']['expenses'], '150.00')
+
+    def test_months_out_of_range(self):
+        self.assertEqual(self.client.get(self.url, {'months': 0}).status_code, 400)
+
+
+class LedgerExportTests(TestCase):
+    def test_export_streams_filtered_months(self):
+        for month in (1, 2, 3):
+            Ledger.objects.create(month=date(2025, month, 1), MonthlyStudentFees=month * 100)
+        response = self.client.get('/api/ledger/export/', {'month_from': '2025-02'})
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(lines[0], 'month,MonthlyStudentFees,MonthlyTeacherPays,MonthlyExpenses,MonthlyProfit,MonthlyCollections')
+        self.assertEqual([line.split(',')[0] for line in lines[1:]], ['2025-03-01', '2025-02-01'])
@@ -1,7 +1,11 @@
 from django.urls import path
-from .views import LedgerListCreateApiView, LedgerRetrieveUpdateDestroyApiView
+from sms.asyncviews import read_view
+from .views import LedgerListCreateApiView, LedgerRetrieveUpdateDestroyApiView, DashboardSummaryApiView, LedgerExportApiView, ConsolidatedLedgerApiView
 
 urlpatterns = [
-    path('api/ledger/', LedgerListCreateApiView.as_view(), name='ledger-list'),
+    path('api/ledger/', read_view(LedgerListCreateApiView), name='ledger-list'),
+    path('api/ledger/export/', LedgerExportApiView.as_view(), name='ledger-export'),
+    path('api/ledger/consolidated/', ConsolidatedLedgerApiView.as_view(), name='ledger-consolidated'),
     path('api/ledger/<int:pk>/', LedgerRetrieveUpdateDestroyApiView.as_view(), name='ledger-detail'),
+    path('api/dashboard/summary/', read_view(DashboardSummaryApiView), name='dashboard-summary'),
 ]
\ No newline at end of file
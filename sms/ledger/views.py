@@ -1,13 +1,92 @@
-from .models import Ledger
-from rest_framework import generics
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from .models import Ledger, DataVersion
+from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from .serializers import LedgerSerializer
+from sms.exports import ExportMixin
+from sms.campus import current_campus
+from sms.filters import date_param, filter_date_range, int_param
+from sms.sync import ConditionalListMixin, make_etag, not_modified, with_etag
+from sms.utils import consolidated_ledger, dashboard_summary
+
+SUMMARY_CACHE_TIMEOUT = 24 * 60 * 60
+DEFAULT_SUMMARY_MONTHS = 12
 
 # Create your views here.
 
-class LedgerListCreateApiView (generics.ListCreateAPIView):
+class LedgerListCreateApiView (ConditionalListMixin, generics.ListCreateAPIView):
     queryset = Ledger.objects.all()
     serializer_class = LedgerSerializer
+    keyset_ordering = ('-month',)
+
+    def get_queryset(self):
+        return filter_date_range(super().get_queryset(), self.request, 'month', 'month_from', 'month_to')
+
+class LedgerExportApiView (ExportMixin, LedgerListCreateApiView):
+    export_filename = 'ledger'
+    export_fields = (
+        'month', 'MonthlyStudentFees', 'MonthlyTeacherPays', 'MonthlyExpenses', 'MonthlyProfit', 'MonthlyCollections'
+    )
 
 class LedgerRetrieveUpdateDestroyApiView (generics.RetrieveUpdateDestroyAPIView):
     queryset = Ledger.objects.all()
     serializer_class = LedgerSerializer
+
+
+class DashboardSummaryApiView (generics.GenericAPIView):
+    # Precomputed dashboard totals, cached until fees, pays, expenses or the ledger
+    # change; the cache key doubles as the ETag
+    def get(self, request, *args, **kwargs):
+        months = self.get_months(request)
+        version = DataVersion.objects.current()
+        key = self.get_cache_key(version, months)
+        etag = make_etag(key)
+        if not_modified(request, etag):
+            return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+        summary = cache.get_or_set(key, lambda: dashboard_summary(months), timeout=SUMMARY_CACHE_TIMEOUT)
+        return with_etag(Response({'version': version, **summary}), etag)
+
+    async def aget(self, request, *args, **kwargs):
+        # get() for async workers (see sms.asyncviews)
+        months = self.get_months(request)
+        version = await DataVersion.objects.acurrent()
+        key = self.get_cache_key(version, months)
+        etag = make_etag(key)
+        if not_modified(request, etag):
+            return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+        summary = await cache.aget(key)
+        if summary is None:
+            summary = await sync_to_async(dashboard_summary)(months)
+            await cache.aset(key, summary, timeout=SUMMARY_CACHE_TIMEOUT)
+        return with_etag(Response({'version': version, **summary}), etag)
+
+    def get_months(self, request):
+        months = int_param(request, 'months')
+        if months is None:
+            months = DEFAULT_SUMMARY_MONTHS
+        if not 1 <= months <= 120:
+            raise ValidationError({'months': 'Must be between 1 and 120.'})
+        return months
+
+    def get_cache_key(self, version, months):
+        return f"dashboard:summary:{current_campus()}:{version}:{months}:{date.today().isoformat()}"
+
+class ConsolidatedLedgerApiView (generics.GenericAPIView):
+    # Every campus's ledger merged per month, with the per-campus figures alongside.
+    # ?campuses=main,north to pick campuses; ?month_from=/?month_to=
+    def get(self, request, *args, **kwargs):
+        campuses = [code for code in request.query_params.get('campuses', '').split(',') if code]
+        unknown = [code for code in campuses if code not in settings.CAMPUSES]
+        if unknown:
+            raise ValidationError({'campuses': f"Unknown campus: {', '.join(unknown)}."})
+        return Response(consolidated_ledger(
+            campuses or None,
+            date_param(request, 'month_from'),
+            date_param(request, 'month_to', end_of_month=True),
+        ))
+
@@ -0,0 +1,110 @@
+# Closed academic years of fees and pays are moved out of the live tables into
+# archive tables with the same columns, so the day-to-day queries only scan the
+# current years. The Ledger, StudentAccount and BalanceCheckpoint rows already
+# count the archived rows and are left alone; reports that recount from source
+# rows read the archive too via history(), and the fee and pay lists and
+# exports merge it in (ArchiveListMixin).
+import heapq
+from datetime import date
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from rest_framework.response import Response
+
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def academic_year_start(day=None):
+    # First day of the academic year `day` falls in
+    day = day or date.today()
+    start_month = settings.ACADEMIC_YEAR_START_MONTH
+    year = day.year if day.month >= start_month else day.year - 1
+    return date(year, start_month, 1)
+
+
+def history(model, archive_model, start=None):
+    # Managers to aggregate over for rows with month >= start: the live table,
+    # plus the archive only when it holds rows that far forward
+    archived = archive_model.objects.all()
+    if start is not None:
+        archived = archived.filter(month__gte=start)
+    return [model.objects, archive_model.objects] if archived.exists() else [model.objects]
+
+
+def archive_rows(queryset, archive_model, fields, batch_size=ARCHIVE_BATCH_SIZE, before_delete=None):
+    # Copies the rows in batches of primary keys and deletes them from the live
+    # table, one transaction per batch so an interrupted run can simply be
+    # re-run. The delete is plain SQL: the delete signals would take the rows
+    # off the Ledger and StudentAccount totals, which still include them. No
+    # Tombstones either, as the lists still return the rows from the archive.
+    model = queryset.model
+    using = router.db_for_write(model)
+    connection = connections[using]
+    delete = 'DELETE FROM %s WHERE %s IN (%%s)' % (
+        connection.ops.quote_name(model._meta.db_table), connection.ops.quote_name(model._meta.pk.column),
+    )
+    archived = 0
+    while True:
+        with transaction.atomic(using=using):
+            ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            rows = model.objects.filter(pk__in=ids)
+            archive_model.objects.bulk_create(
+                [archive_model(**values) for values in rows.values('id', *fields)], batch_size=batch_size
+            )
+            if before_delete:
+                before_delete(ids)
+            with connection.cursor() as cursor:
+                cursor.execute(delete % ', '.join(['%s'] * len(ids)), ids)
+        archived += len(ids)
+    return archived
+
+
+def merge_ordered(iterables, ordering, position):
+    # Rows of several tables, each sorted by `ordering` (all ascending or all
+    # descending), as one sorted stream; position(row) gives the sort key
+    descending = {field.startswith('-') for field in ordering}
+    if len(descending) != 1:
+        raise ValueError('Merged orderings must run in one direction')
+    return heapq.merge(*iterables, key=position, reverse=descending.pop())
+
+
+class ArchiveListMixin:
+    # For the list (and export) views of a model with an archive table. The
+    # view's filters go in filter_rows() so they apply to both tables; when the
+    # archive holds filtered rows, e.g. a month of a closed year, they are
+    # merged with the live ones by keyset_ordering. archive_queryset annotates
+    # updated_at (as archived_at) so the list serializer reads either.
+    archive_queryset = None
+
+    def filter_rows(self, queryset):
+        return queryset
+
+    def get_queryset(self):
+        return self.filter_rows(super().get_queryset())
+
+    def get_history_querysets(self):
+        querysets = [self.filter_queryset(self.get_queryset())]
+        archived = self.filter_rows(self.archive_queryset.all())
+        if archived.exists():
+            querysets.append(archived)
+        return querysets
+
+    def list(self, request, *args, **kwargs):
+        querysets = self.get_history_querysets()
+        if len(querysets) == 1:
+            return super().list(request, *args, **kwargs)
+        return Response(self.list_history(querysets))
+
+    def list_history(self, querysets):
+        page = None
+        if self.paginator is not None:
+            page = self.paginator.paginate_querysets(querysets, self.request, self)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data).data
+        rows = merge_ordered(
+            [queryset.order_by(*self.keyset_ordering) for queryset in querysets], self.keyset_ordering,
+            lambda row: [getattr(row, field.lstrip('-')) for field in self.keyset_ordering],
+        )
+        return self.get_serializer(list(rows), many=True).data
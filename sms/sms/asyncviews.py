@@ -0,0 +1,106 @@
+# Async versions of the read-heavy endpoints, served when ASYNC_VIEWS is on (ASGI
+# workers, see gunicorn.conf.py). A GET fetches its rows with the async ORM, so
+# while one request waits on the database the worker's event loop serves the
+# others. Filtering, paging and serializers are the DRF view's own, so the JSON
+# is the same; other methods are handed to the DRF view in a thread.
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+
+async def render(response):
+    # A finalized DRF Response as a plain HttpResponse, which Django won't send
+    # through sync_to_async to render. JSON is rendered on the event loop; other
+    # formats (the browsable API may query) in a thread.
+    if isinstance(response.accepted_renderer, JSONRenderer):
+        response.render()
+    else:
+        await sync_to_async(response.render)()
+    rendered = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        rendered[header] = value
+    return rendered
+
+
+async def alist(view):
+    # ListModelMixin.list() with the page (or whole list) fetched asynchronously.
+    # The view's queryset must load everything its serializer reads. A list
+    # merged with its archive (sms.archive.ArchiveListMixin) is read in a thread.
+    if hasattr(view, 'get_history_querysets'):
+        querysets = await sync_to_async(view.get_history_querysets)()
+        if len(querysets) > 1:
+            return await sync_to_async(view.list_history)(querysets)
+    queryset = view.filter_queryset(view.get_queryset())
+    page = None
+    if view.paginator is not None:
+        page = await view.paginator.apaginate_queryset(queryset, view.request, view)
+    if page is not None:
+        return view.paginator.get_paginated_response(view.get_serializer(page, many=True).data).data
+    return view.get_serializer([row async for row in queryset], many=True).data
+
+
+def async_view(view_class):
+    # GETs go to the view's aget() (returning an unrendered DRF Response) if it
+    # has one, else alist(); authentication, permissions, throttles and content
+    # negotiation (APIView.initial) and error handling are the DRF view's own
+    sync_view = sync_to_async(view_class.as_view())
+
+    async def view(request, *args, **kwargs):
+        if request.method != 'GET':
+            return await sync_view(request, *args, **kwargs)
+
+        instance = view_class()
+        instance.setup(request, *args, **kwargs)
+        instance.request = instance.initialize_request(request, *args, **kwargs)
+        instance.headers = instance.default_response_headers
+        try:
+            await sync_to_async(instance.initial)(instance.request, *args, **kwargs)
+            if hasattr(instance, 'aget'):
+                response = await instance.aget(instance.request, *args, **kwargs)
+            else:
+                response = Response(await alist(instance))
+        except Exception as exc:
+            response = instance.handle_exception(exc)
+        return await render(instance.finalize_response(instance.request, response, *args, **kwargs))
+
+    return csrf_exempt(view)
+
+
+async def aiterate(chunks):
+    # A sync iterator as an async one, each chunk read on the request's sync thread
+    chunks = iter(chunks)
+    done = object()
+    while (chunk := await sync_to_async(next)(chunks, done)) is not done:
+        yield chunk
+
+
+class AsyncStreamingMiddleware:
+    # Under ASGI Django reads a sync streaming body (CSV/XLSX exports, challan
+    # PDFs and ZIPs) with sync_to_async(list), i.e. all of it into memory before
+    # sending; this hands it an async iterator instead. Does nothing under WSGI.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if response.streaming and not response.is_async:
+            response.streaming_content = aiterate(response.streaming_content)
+        return response
+
+
+def read_view(view_class):
+    # For urls.py: the async version of a read-heavy view when ASYNC_VIEWS is on
+    return async_view(view_class) if settings.ASYNC_VIEWS else view_class.as_view()
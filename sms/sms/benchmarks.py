@@ -0,0 +1,136 @@
+# Times and query-counts the hot paths against whatever data is in the database
+# (see sms.synthetic.generate_school). Results are plain dicts, written as JSON
+# by `manage.py run_benchmarks` so runs on different commits can be compared.
+import gzip
+import statistics
+import time
+from datetime import date
+from functools import cache as memoize
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ListSerializer
+
+from sms.compression import brotli
+from sms.renderers import FastJSONRenderer
+from sms.utils import calculate_monthly_profit
+from students.models import FeeGeneration, StudentFee
+from students.serializers import StudentFeeSerializer
+from students.views import StudentFeeListCreateView
+from teachers.models import GenerateTeacherPay, TeacherPay
+
+LIST_ENDPOINTS = (
+    ('students', '/api/students/'),
+    ('students_page', '/api/students/?page_size=100'),
+    ('students_sparse', '/api/students/?fields=roll_no,name,grade'),
+    ('studentfees', '/api/studentfees/'),
+    ('studentfees_page', '/api/studentfees/?page_size=100'),
+    ('studentfees_month', '/api/studentfees/?month_from={month}&month_to={month}'),
+    ('teachers', '/api/teacher/'),
+    ('teacherpay_page', '/api/teacherpay/?page_size=100'),
+    ('expenses_page', '/api/expenses/?page_size=100'),
+    ('ledger', '/api/ledger/'),
+    ('feepayments_page', '/api/feepayments/?page_size=100'),
+    ('dashboard_summary', '/api/dashboard/summary/'),
+    ('aging_report', '/api/reports/aging/?detail=false'),
+)
+# The serialize/render/compress steps of one long fee list, DRF's own way against
+# sms.serializers and sms.renderers (--students 1050 --years 4 makes about 50k fees)
+FEE_LIST_ROWS = 50000
+
+
+def measure(func, repeat=3):
+    # Wall time of each run (caches cleared first) and the queries of the last one
+    durations = []
+    for _ in range(repeat):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            func()
+            durations.append((time.perf_counter() - started) * 1000)
+    return {
+        'runs': repeat,
+        'min_ms': round(min(durations), 2),
+        'median_ms': round(statistics.median(durations), 2),
+        'max_ms': round(max(durations), 2),
+        'queries': len(queries),
+    }
+
+
+def _next_month(queryset):
+    latest = queryset.order_by('-month').values_list('month', flat=True).first() or date.today()
+    year, month = divmod(latest.month, 12)
+    return date(latest.year + year, month + 1, 1)
+
+
+def _fee_list():
+    return StudentFeeListCreateView.queryset.order_by('-month', '-id')[:FEE_LIST_ROWS]
+
+
+def _fee_list_benchmarks():
+    # The render and compress steps share the list, made on first use
+    @memoize
+    def data():
+        return StudentFeeSerializer(_fee_list(), many=True).data
+
+    @memoize
+    def body():
+        return FastJSONRenderer().render(data())
+
+    benchmarks = {
+        'fee_list_serialize_drf': lambda: ListSerializer(_fee_list(), child=StudentFeeSerializer()).data,
+        'fee_list_serialize_fast': lambda: StudentFeeSerializer(_fee_list(), many=True).data,
+        'fee_list_render_drf': lambda: JSONRenderer().render(data()),
+        'fee_list_render_fast': lambda: FastJSONRenderer().render(data()),
+        # Level 6, as Django's GZipMiddleware
+        'fee_list_gzip': lambda: gzip.compress(body(), 6, mtime=0),
+    }
+    if brotli is not None:
+        benchmarks['fee_list_brotli'] = lambda: brotli.compress(body(), quality=settings.BROTLI_QUALITY)
+    return benchmarks
+
+
+def _get(client, url):
+    response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} returned {response.status_code}")
+    # Streamed or not, read the whole body as a client would
+    return b''.join(response.streaming_content) if response.streaming else response.content
+
+
+@override_settings(JOBS_RUN_INLINE=True)
+def run_benchmarks(repeat=3, only=None):
+    # {benchmark name: measure() result}; generation benchmarks bill a new month
+    # on every run so they never hit the already-generated skip path
+    client = Client()
+    month = StudentFee.objects.order_by('-month').values_list('month', flat=True).first() or date.today()
+
+    benchmarks = {
+        'fee_generation': lambda: FeeGeneration.objects.create(month=_next_month(StudentFee.objects)),
+        'teacher_pay_generation': lambda: GenerateTeacherPay.objects.create(month=_next_month(TeacherPay.objects)),
+        'calculate_monthly_profit': calculate_monthly_profit,
+    }
+    for name, url in LIST_ENDPOINTS:
+        url = url.format(month=month.strftime('%Y-%m'))
+        benchmarks[f"GET {name}"] = lambda url=url: _get(client, url)
+    benchmarks.update(_fee_list_benchmarks())
+
+    return {
+        name: measure(func, repeat)
+        for name, func in benchmarks.items()
+        if only is None or any(part in name for part in only)
+    }
+
+
+def compare(current, previous):
+    # [(name, previous median, current median, ratio)] for benchmarks in both runs
+    rows = []
+    for name, result in current.items():
+        if name in previous:
+            before = previous[name]['median_ms']
+            rows.append((name, before, result['median_ms'], result['median_ms'] / before if before else None))
+    return rows
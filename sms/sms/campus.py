@@ -0,0 +1,147 @@
+# Campus tenancy. Every campus-owned row carries a `campus` code and the default
+# managers only see the current campus, set per request by CampusMiddleware (or
+# with use_campus() in commands and jobs). Small campuses share the default
+# database; a large one can be given its own (settings.CAMPUSES maps code ->
+# database alias) and CampusRouter sends its queries there.
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections, models
+from django.http import JsonResponse
+
+DEFAULT_CAMPUS = 'main'
+CAMPUS_HEADER = 'HTTP_X_CAMPUS'
+TENANT_APPS = {'students', 'teachers', 'expense', 'ledger', 'jobs'}
+
+_current = ContextVar('campus', default=DEFAULT_CAMPUS)
+
+
+def current_campus():
+    return _current.get()
+
+
+@contextmanager
+def use_campus(campus):
+    token = _current.set(campus)
+    try:
+        yield campus
+    finally:
+        _current.reset(token)
+
+
+def campus_database(campus=None):
+    return settings.CAMPUSES.get(campus or current_campus(), 'default')
+
+
+class CurrentCampus(models.Expression):
+    # The campus in effect when the query runs rather than when it was built, as
+    # views build their querysets once, at import
+    def __init__(self):
+        super().__init__(output_field=models.CharField())
+
+    def as_sql(self, compiler, connection):
+        return '%s', [current_campus()]
+
+
+class CampusManager(models.Manager):
+    # Default manager of campus-owned models: rows of the current campus only
+    def get_queryset(self):
+        return super().get_queryset().filter(campus=CurrentCampus())
+
+
+class CampusRouter:
+    # Campus data goes to its campus's database; auth, admin and sessions stay on default
+    def _campus_db(self, model, **hints):
+        if model._meta.app_label not in TENANT_APPS:
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        # __dict__, not getattr: a deferred campus would be loaded through this router
+        return campus_database(instance.__dict__.get('campus') if instance is not None else None)
+
+    db_for_read = _campus_db
+    db_for_write = _campus_db
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return obj1._state.db == obj2._state.db or None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Every campus database gets the full schema
+        return None
+
+
+class CampusMiddleware:
+    # X-Campus header, then ?campus=, then a "campus" cookie (for the admin)
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        campus = self.get_campus(request)
+        if campus not in settings.CAMPUSES:
+            return self.unknown_campus(campus)
+        with use_campus(campus):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        campus = self.get_campus(request)
+        if campus not in settings.CAMPUSES:
+            return self.unknown_campus(campus)
+        with use_campus(campus):
+            return await self.get_response(request)
+
+    def get_campus(self, request):
+        return (
+            request.META.get(CAMPUS_HEADER) or request.GET.get('campus') or request.COOKIES.get('campus')
+            or DEFAULT_CAMPUS
+        )
+
+    def unknown_campus(self, campus):
+        return JsonResponse({'campus': f"Unknown campus {campus!r}."}, status=400)
+
+
+def _run_campuses(func, campuses):
+    results = {}
+    for campus in campuses:
+        with use_campus(campus):
+            results[campus] = func()
+    return results
+
+
+def _run_in_thread(func, campuses):
+    try:
+        return _run_campuses(func, campuses)
+    finally:
+        connections.close_all()
+
+
+def run_per_campus(func, campuses=None, workers=None):
+    # {campus: func()} with func run once per campus, campuses in parallel threads.
+    # Campuses sharing an SQLite database run one after another (single writer).
+    campuses = list(campuses or settings.CAMPUSES)
+    groups = defaultdict(list)
+    for campus in campuses:
+        alias = campus_database(campus)
+        sqlite = connections.databases[alias]['ENGINE'].endswith('sqlite3')
+        groups[alias if sqlite else campus].append(campus)
+
+    workers = workers or len(groups)
+    if workers <= 1 or len(groups) == 1:
+        return _run_campuses(func, campuses)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sms-campus') as executor:
+        for group_results in executor.map(lambda group: _run_in_thread(func, group), groups.values()):
+            results.update(group_results)
+    return results
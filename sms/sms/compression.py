@@ -0,0 +1,60 @@
+# Response compression: brotli for clients that accept it (when the brotli
+# package is installed), else Django's gzip. A 50k-row fee list is mostly
+# repeated keys and amounts, so either shrinks it about tenfold.
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ACCEPTS_BROTLI = re.compile(r'\bbr\b')
+# Smaller bodies don't gain enough to be worth it (Django's gzip uses the same)
+MIN_LENGTH = 200
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.gzip = GZipMiddleware(get_response)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        # Compressing is CPU only, so it stays on the event loop
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if (
+            brotli is None or response.streaming or response.has_header('Content-Encoding')
+            or not ACCEPTS_BROTLI.search(request.headers.get('Accept-Encoding', ''))
+        ):
+            return self.gzip.process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < MIN_LENGTH:
+            return response
+        compressed = brotli.compress(response.content, quality=settings.BROTLI_QUALITY)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = 'br'
+        # The body is no longer byte for byte the one the ETag was made for
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,113 @@
+import csv
+import io
+import tempfile
+from datetime import date
+
+from django.http import FileResponse, StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+
+from sms.archive import merge_ordered
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+
+def _csv_chunks(header, rows, chunk_size):
+    # One write per chunk of rows rather than per row
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')  # BOM so Excel picks UTF-8
+    writer.writerow(header)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _xlsx_file(header, rows):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ValidationError({'output': 'XLSX export needs openpyxl; use output=csv.'})
+
+    # write_only keeps rows out of memory; the zip has to be finished before it
+    # can be sent, so it is spooled to a temporary file and streamed from there
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def _merged_rows(querysets, lookups, ordering, chunk_size):
+    # Each table's rows with the ordering fields read along to merge them by,
+    # then dropped
+    keys = [field.lstrip('-') for field in ordering]
+    streams = [
+        queryset.order_by(*ordering).values_list(*lookups, *keys).iterator(chunk_size=chunk_size)
+        for queryset in querysets
+    ]
+    for row in merge_ordered(streams, ordering, lambda row: row[len(lookups):]):
+        yield row[:len(lookups)]
+
+
+def export_response(queryset, fields, filename, output='csv', chunk_size=EXPORT_CHUNK_SIZE, ordering=None):
+    # fields: lookups, or (header, lookup) pairs. Rows are read with iterator(),
+    # i.e. a server-side cursor on PostgreSQL, so memory stays flat however many
+    # rows are exported. `queryset` may also be a list of querysets over tables
+    # with the same lookups (a live table and its archive), merged by `ordering`.
+    if output not in EXPORT_FORMATS:
+        raise ValidationError({'output': f"Must be one of: {', '.join(EXPORT_FORMATS)}."})
+
+    fields = [(field, field) if isinstance(field, str) else field for field in fields]
+    header = [name for name, _ in fields]
+    lookups = [lookup for _, lookup in fields]
+    if isinstance(queryset, list):
+        rows = _merged_rows(queryset, lookups, ordering, chunk_size)
+    else:
+        rows = queryset.values_list(*lookups).iterator(chunk_size=chunk_size)
+    filename = f"{filename}-{date.today().isoformat()}.{output}"
+
+    if output == 'xlsx':
+        return FileResponse(
+            _xlsx_file(header, rows),
+            as_attachment=True,
+            filename=filename,
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+    response = StreamingHttpResponse(_csv_chunks(header, rows, chunk_size), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+class ExportMixin:
+    # GET ?output=csv|xlsx on a list view: same filters as the list, every row,
+    # written out as it is read
+    http_method_names = ['get', 'head', 'options']
+    export_fields = ()
+    export_filename = 'export'
+
+    def get(self, request, *args, **kwargs):
+        ordering = getattr(self, 'keyset_ordering', None)
+        if hasattr(self, 'get_history_querysets'):
+            # With the archived rows (sms.archive.ArchiveListMixin)
+            querysets = self.get_history_querysets()
+        else:
+            querysets = [self.filter_queryset(self.get_queryset())]
+
+        if len(querysets) > 1:
+            queryset = querysets
+        else:
+            queryset = querysets[0].order_by(*ordering) if ordering else querysets[0]
+        return export_response(
+            queryset, self.export_fields, self.export_filename, request.query_params.get('output', 'csv'),
+            ordering=ordering,
+        )
@@ -0,0 +1,54 @@
+import calendar
+from datetime import date
+
+from rest_framework.exceptions import ValidationError
+
+TRUE_VALUES = {'1', 'true', 'yes'}
+FALSE_VALUES = {'0', 'false', 'no'}
+
+
+def date_param(request, name, end_of_month=False):
+    # Accepts YYYY-MM-DD or YYYY-MM; a bare month means its first (or last) day
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        if len(value) == 7:
+            parsed = date.fromisoformat(f"{value}-01")
+            if end_of_month:
+                parsed = parsed.replace(day=calendar.monthrange(parsed.year, parsed.month)[1])
+            return parsed
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: 'Use YYYY-MM or YYYY-MM-DD.'})
+
+
+def bool_param(request, name):
+    value = request.query_params.get(name)
+    if value is None or value == '':
+        return None
+    if value.lower() in TRUE_VALUES:
+        return True
+    if value.lower() in FALSE_VALUES:
+        return False
+    raise ValidationError({name: 'Use true or false.'})
+
+
+def int_param(request, name):
+    value = request.query_params.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: 'Must be an integer.'})
+
+
+def filter_date_range(queryset, request, field, from_param, to_param):
+    start = date_param(request, from_param)
+    end = date_param(request, to_param, end_of_month=True)
+    if start:
+        queryset = queryset.filter(**{f'{field}__gte': start})
+    if end:
+        queryset = queryset.filter(**{f'{field}__lte': end})
+    return queryset
@@ -0,0 +1,123 @@
+import csv
+import io
+from datetime import datetime
+from itertools import islice
+
+from django.db import transaction
+from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+
+from sms.campus import campus_database
+from sms.filters import bool_param
+
+IMPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+def _xlsx_rows(upload):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValidationError({'file': 'XLSX import needs openpyxl; upload a CSV instead.'})
+
+    # read_only streams the sheet instead of loading it all
+    workbook = load_workbook(upload, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(name).strip() if name is not None else '' for name in next(rows, ())]
+        for values in rows:
+            yield {
+                name: value.date() if isinstance(value, datetime) else value
+                for name, value in zip(header, values) if name
+            }
+    finally:
+        workbook.close()
+
+
+def _csv_rows(upload):
+    yield from csv.DictReader(io.TextIOWrapper(upload, encoding='utf-8-sig'))
+
+
+def read_rows(upload):
+    # Yields (row number, row dict) from a CSV or XLSX upload; blank cells are left
+    # out so the serializer applies the model defaults
+    rows = _xlsx_rows(upload) if upload.name.lower().endswith('.xlsx') else _csv_rows(upload)
+    for row_number, row in enumerate(rows, start=2):
+        cleaned = {
+            name: value.strip() if isinstance(value, str) else value
+            for name, value in row.items() if name
+        }
+        cleaned = {name: value for name, value in cleaned.items() if value not in ('', None)}
+        if cleaned:
+            yield row_number, cleaned
+
+
+def run_import(rows, serializer_class, save_chunk, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False):
+    # Validates rows chunk by chunk with the API serializer and hands each valid
+    # chunk to save_chunk (batched inserts). All or nothing: once a row fails the
+    # rest is only validated and the transaction is rolled back.
+    total = 0
+    created = 0
+    errors = []
+
+    with transaction.atomic(using=campus_database()):
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            total += len(chunk)
+
+            valid = []
+            for row_number, row in chunk:
+                serializer = serializer_class(data=row)
+                if serializer.is_valid():
+                    valid.append(serializer.validated_data)
+                elif len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({'row': row_number, 'errors': serializer.errors})
+                else:
+                    errors.append(None)
+
+            if not errors and not dry_run:
+                created += save_chunk(valid)
+
+        if errors or dry_run:
+            transaction.set_rollback(True)
+
+    return {
+        'rows': total,
+        'created': 0 if errors else created,
+        'error_count': len(errors),
+        'errors': [error for error in errors if error is not None],
+    }
+
+
+class ImportView(generics.GenericAPIView):
+    # POST a CSV/XLSX "file" whose header row uses the serializer's field names.
+    # ?dry_run=true validates without saving. Subclasses must define
+    # save_chunk(validated_rows), returning how many rows it created.
+    parser_classes = [MultiPartParser]
+    chunk_size = IMPORT_CHUNK_SIZE
+
+    def __init_subclass__(cls, **kwargs):
+        # Checked when the subclass is defined, so a missing hook fails at import
+        super().__init_subclass__(**kwargs)
+        if not callable(getattr(cls, 'save_chunk', None)):
+            raise TypeError(f'{cls.__name__} must define save_chunk(validated_rows)')
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'detail': 'No file given.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = run_import(
+            read_rows(upload),
+            self.get_serializer_class(),
+            self.save_chunk,
+            chunk_size=self.chunk_size,
+            dry_run=bool_param(request, 'dry_run') or False,
+        )
+        if result['error_count']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_200_OK)
@@ -0,0 +1,130 @@
+# HTTP load test for comparing server setups (see `manage.py load_test`):
+# `concurrency` clients on keep-alive connections request the read endpoints
+# round robin for `duration` seconds against a running server.
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+LOAD_PATHS = (
+    '/api/students/?page_size=100',
+    '/api/studentfees/?page_size=100',
+    '/api/ledger/',
+    '/api/dashboard/summary/',
+)
+GUNICORN = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', '{host}:{port}']
+# Server setups to compare; gunicorn.conf.py picks its worker type from SMS_SERVER
+SERVER_COMMANDS = {
+    'runserver': [sys.executable, 'manage.py', 'runserver', '--noreload', '{host}:{port}'],
+    'wsgi': GUNICORN,
+    'asgi': GUNICORN,
+}
+START_TIMEOUT = 30
+
+
+def _client(host, port, paths, deadline, timings, errors, lock):
+    connection = None
+    index = 0
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = http.client.HTTPConnection(host, port, timeout=30)
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            ok = response.status == 200
+            if response.getheader('Connection', '').lower() == 'close':
+                connection.close()
+                connection = None
+        except (OSError, http.client.HTTPException):
+            ok = False
+            if connection is not None:
+                connection.close()
+            connection = None
+        elapsed = time.perf_counter() - started
+        with lock:
+            if ok:
+                timings.append(elapsed)
+            else:
+                errors[0] += 1
+    if connection is not None:
+        connection.close()
+
+
+def run_load(base_url, paths=LOAD_PATHS, concurrency=50, duration=10):
+    parts = urlsplit(base_url)
+    timings = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    clients = [
+        threading.Thread(target=_client, args=(parts.hostname, parts.port or 80, paths, deadline, timings, errors, lock))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - started
+
+    result = {
+        'requests': len(timings),
+        'errors': errors[0],
+        'requests_per_second': round(len(timings) / elapsed, 1),
+    }
+    if len(timings) >= 2:
+        cuts = statistics.quantiles(timings, n=100)
+        result.update({
+            'p50_ms': round(cuts[49] * 1000, 1),
+            'p95_ms': round(cuts[94] * 1000, 1),
+            'p99_ms': round(cuts[98] * 1000, 1),
+        })
+    return result
+
+
+def _wait_for_port(host, port, process):
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with {process.returncode}")
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server didn't listen on {host}:{port} within {START_TIMEOUT}s")
+
+
+@contextmanager
+def serve(kind, host='127.0.0.1', port=8800, env=None):
+    # Runs one of SERVER_COMMANDS from the project directory until the block exits
+    command = [part.format(host=host, port=port) for part in SERVER_COMMANDS[kind]]
+    environ = {**os.environ, **(env or {}), 'SMS_SERVER': kind}
+    # DEBUG is off by default, so the host has to be allowed explicitly
+    environ['SMS_ALLOWED_HOSTS'] = ','.join(filter(None, [environ.get('SMS_ALLOWED_HOSTS'), host]))
+    process = subprocess.Popen(
+        command, cwd=settings.BASE_DIR, env=environ,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_for_port(host, port, process)
+        yield f"http://{host}:{port}"
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=START_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
@@ -0,0 +1,220 @@
+# Per-view request metrics: latency histogram, DB query count and time, response
+# size, plus the slowest SQL statements seen. Kept in memory per process (each
+# worker reports its own counters, as with any Prometheus client) and exposed
+# as Prometheus text by MetricsView; every request also gets a line in the
+# rotating "sms.metrics" log.
+import heapq
+import ipaddress
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import connections
+from django.http import HttpResponse
+from django.views import View
+
+logger = logging.getLogger('sms.metrics')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SLOW_QUERY_LIMIT = 20
+SQL_LABEL_LENGTH = 200
+
+
+class ViewStats:
+    __slots__ = ('count', 'buckets', 'seconds', 'queries', 'db_seconds', 'response_bytes')
+
+    def __init__(self):
+        self.count = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.seconds = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.response_bytes = 0
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        # min-heap of (seconds, sql, view): the SLOW_QUERY_LIMIT slowest statements
+        self.slow_queries = []
+
+    def observe(self, key, seconds, queries, db_seconds, response_bytes, slowest):
+        with self.lock:
+            stats = self.views.get(key)
+            if stats is None:
+                stats = self.views[key] = ViewStats()
+            stats.count += 1
+            stats.seconds += seconds
+            stats.queries += queries
+            stats.db_seconds += db_seconds
+            stats.response_bytes += response_bytes
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[index] += 1
+
+            if slowest:
+                entry = (slowest[0], slowest[1], key[0])
+                if len(self.slow_queries) < SLOW_QUERY_LIMIT:
+                    heapq.heappush(self.slow_queries, entry)
+                elif entry > self.slow_queries[0]:
+                    heapq.heapreplace(self.slow_queries, entry)
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+            self.slow_queries.clear()
+
+    def render(self):
+        with self.lock:
+            views = sorted(self.views.items())
+            slow_queries = sorted(self.slow_queries, reverse=True)
+
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family('sms_request_duration_seconds', 'histogram', 'Request latency by view.')
+        for (view, method, status), stats in views:
+            labels = f'view="{_label(view)}",method="{method}",status="{status}"'
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                lines.append(f'sms_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'sms_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f'sms_request_duration_seconds_sum{{{labels}}} {stats.seconds:.6f}')
+            lines.append(f'sms_request_duration_seconds_count{{{labels}}} {stats.count}')
+
+        for name, attr, help_text in (
+            ('sms_db_queries_total', 'queries', 'Database queries run by view.'),
+            ('sms_db_seconds_total', 'db_seconds', 'Time spent in database queries by view.'),
+            ('sms_response_bytes_total', 'response_bytes', 'Response body bytes by view, streamed bodies excluded.'),
+        ):
+            family(name, 'counter', help_text)
+            for (view, method, status), stats in views:
+                value = getattr(stats, attr)
+                value = f"{value:.6f}" if isinstance(value, float) else value
+                lines.append(f'{name}{{view="{_label(view)}",method="{method}",status="{status}"}} {value}')
+
+        family('sms_slow_query_seconds', 'gauge', f'The {SLOW_QUERY_LIMIT} slowest SQL statements seen.')
+        for seconds, sql, view in slow_queries:
+            lines.append(f'sms_slow_query_seconds{{view="{_label(view)}",sql="{_label(sql)}"}} {seconds:.6f}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+class QueryTimer:
+    # connection.execute_wrapper hook: counts and times every statement
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            seconds = time.perf_counter() - started
+            self.count += 1
+            self.seconds += seconds
+            if self.slowest is None or seconds > self.slowest[0]:
+                self.slowest = (seconds, ' '.join(sql.split())[:SQL_LABEL_LENGTH])
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        timer = QueryTimer()
+        started = time.perf_counter()
+        # Every alias, so queries on campus databases are counted too
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, timer)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        # The async ORM runs a request's queries on one thread (see ASGIHandler),
+        # so the timer goes on that thread's connections
+        timer = QueryTimer()
+        started = time.perf_counter()
+        await sync_to_async(self.wrap_connections)(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(self.unwrap_connections)(timer)
+        self.record(request, response, time.perf_counter() - started, timer)
+        return response
+
+    def wrap_connections(self, timer):
+        for alias in connections:
+            connections[alias].execute_wrappers.append(timer)
+
+    def unwrap_connections(self, timer):
+        for alias in connections:
+            connections[alias].execute_wrappers.remove(timer)
+
+    def record(self, request, response, seconds, timer):
+        match = request.resolver_match
+        # The URL name (or route) keeps the label set small, unlike the raw path
+        view = (match.view_name or match.route) if match else 'unmatched'
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(
+            (view, request.method, response.status_code), seconds, timer.count, timer.seconds, size, timer.slowest
+        )
+
+        logger.info(
+            '%s %s view=%s status=%s ms=%.1f queries=%d db_ms=%.1f bytes=%d',
+            request.method, request.path, view, response.status_code, seconds * 1000,
+            timer.count, timer.seconds * 1000, size,
+        )
+        if timer.slowest and timer.slowest[0] * 1000 >= settings.METRICS_SLOW_QUERY_MS:
+            logger.warning('slow query view=%s ms=%.1f sql=%s', view, timer.slowest[0] * 1000, timer.slowest[1])
+
+
+def _allowed(request):
+    # Staff users, or a scraper on one of settings.METRICS_ALLOWED_IPS
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_active and user.is_staff:
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network, strict=False) for network in settings.METRICS_ALLOWED_IPS)
+
+
+class MetricsView(View):
+    # Prometheus text exposition for this worker
+    def get(self, request, *args, **kwargs):
+        if not _allowed(request):
+            raise PermissionDenied
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,122 @@
+# Minimal PDF writer for text-and-lines documents (fee challans). Uses the
+# standard Helvetica fonts, so nothing is embedded and no PDF library is needed.
+# Coordinates are in millimetres from the top-left corner, like jsPDF.
+#
+# The standard fonts only have the WinAnsi (cp1252) characters: Western
+# European letters and the usual punctuation. Other letters are printed without
+# their accents (Ş -> S) where that leaves a WinAnsi character, and anything
+# else, e.g. Urdu or Arabic script, as '?'. Printing those would need an
+# embedded font.
+import unicodedata
+
+MM = 72 / 25.4
+A4_LANDSCAPE = (297, 210)
+
+FONTS = {False: b'/F1', True: b'/F2'}
+
+
+def _winansi(char):
+    try:
+        return char.encode('cp1252')
+    except UnicodeEncodeError:
+        base = unicodedata.normalize('NFKD', char).encode('ascii', 'ignore')
+        return base or b'?'
+
+
+def _escape(text):
+    text = str(text)
+    try:
+        data = text.encode('cp1252')
+    except UnicodeEncodeError:
+        data = b''.join(_winansi(char) for char in text)
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def text_width(text, size, bold=False):
+    # Rough Helvetica advance width (mm), good enough for centring labels
+    return len(str(text)) * size * (0.56 if bold else 0.5) / MM
+
+
+class Canvas:
+    def __init__(self, page_size=A4_LANDSCAPE):
+        self.width, self.height = page_size
+        self.ops = []
+
+    def _x(self, x):
+        return x * MM
+
+    def _y(self, y):
+        return (self.height - y) * MM
+
+    def text(self, x, y, text, size=8, bold=False, align='left'):
+        if align == 'center':
+            x -= text_width(text, size, bold) / 2
+        elif align == 'right':
+            x -= text_width(text, size, bold)
+        self.ops.append(
+            b'BT %s %d Tf %.2f %.2f Td (%s) Tj ET'
+            % (FONTS[bold], size, self._x(x), self._y(y), _escape(text))
+        )
+
+    def rect(self, x, y, width, height, fill=None):
+        op = b'S'
+        if fill is not None:
+            self.ops.append(b'%.3f g' % fill)
+            op = b'f'
+        self.ops.append(
+            b'%.2f %.2f %.2f %.2f re %s' % (self._x(x), self._y(y + height), width * MM, height * MM, op)
+        )
+        if fill is not None:
+            self.ops.append(b'0 g')
+
+    def line(self, x1, y1, x2, y2, dash=None):
+        if dash:
+            self.ops.append(b'[%d %d] 0 d' % dash)
+        self.ops.append(b'%.2f %.2f m %.2f %.2f l S' % (self._x(x1), self._y(y1), self._x(x2), self._y(y2)))
+        if dash:
+            self.ops.append(b'[] 0 d')
+
+    def content(self):
+        return b'\n'.join(self.ops)
+
+
+def write_pdf(pages, page_size=A4_LANDSCAPE, page_count=None):
+    # Yields the PDF in chunks so large documents can be streamed. `pages` is a
+    # sequence of content streams from Canvas.content(), or any iterable of them
+    # given with its page_count, which is then only consumed as the PDF is written.
+    if page_count is None:
+        pages = list(pages)
+        page_count = len(pages)
+    width, height = page_size[0] * MM, page_size[1] * MM
+    offsets = []
+    position = 0
+
+    def emit(number, body):
+        nonlocal position
+        offsets.append(position)
+        chunk = b'%d 0 obj\n%s\nendobj\n' % (number, body)
+        position += len(chunk)
+        return chunk
+
+    header = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+    position = len(header)
+    yield header
+
+    page_ids = [5 + 2 * index for index in range(page_count)]
+    kids = b' '.join(b'%d 0 R' % page_id for page_id in page_ids)
+    yield emit(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+    yield emit(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, page_count))
+    yield emit(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+    yield emit(4, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>')
+
+    for page_id, content in zip(page_ids, pages):
+        yield emit(page_id, (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] '
+            b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>'
+        ) % (width, height, page_id + 1))
+        yield emit(page_id + 1, b'<< /Length %d >>\nstream\n%s\nendstream' % (len(content), content))
+
+    xref = [b'xref\n0 %d\n' % (len(offsets) + 1), b'0000000000 65535 f \n']
+    xref.extend(b'%010d 00000 n \n' % offset for offset in offsets)
+    yield b''.join(xref)
+    yield b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(offsets) + 1, position)
@@ -0,0 +1,21 @@
+# JSON rendering with orjson when it is installed: several times faster than
+# the json module on long lists. The JSON is the same as DRF's JSONRenderer
+# gives, since dates, decimals and anything else orjson doesn't handle the same
+# way are passed on to DRF's encoder.
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # DRF's renderer for the empty body and for ?format=json;indent=2 style requests
+        if orjson is None or data is None or self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
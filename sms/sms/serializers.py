@@ -0,0 +1,239 @@
+# Sparse fieldsets and a fast read path for the API's list serializers.
+#
+# ?fields=roll_no,name,grade or ?exclude=address,scanned_doc on a GET picks the
+# top-level fields returned (SparseFieldsMixin). FastListSerializer, the
+# list_serializer_class of the API serializers, builds a list's dicts without
+# DRF's per-row, per-field get_attribute/to_representation calls: a queryset is
+# read with values_list() (only the columns the fields use, no model instances),
+# a page of instances with plain getattr, and a value goes through its field's
+# to_representation only where that changes it. The JSON is the same; a
+# serializer with a field it can't map to a column (method fields, many=True
+# relations, source='*') is left to DRF.
+import re
+
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db import models
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+# Serializer fields whose to_representation returns these model fields' values unchanged
+PASSTHROUGH_FIELDS = {
+    serializers.BooleanField: (models.BooleanField,),
+    serializers.CharField: (models.CharField, models.TextField),
+    serializers.ChoiceField: (models.Field,),
+    serializers.IntegerField: (models.IntegerField,),
+    serializers.ReadOnlyField: (models.Field,),
+}
+DISPLAY_SOURCE = re.compile(r'get_(\w+)_display')
+
+
+class SparseFieldsMixin:
+    # For the serializers of list views; nested serializers keep all their fields
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        top = self.root.child if isinstance(self.root, serializers.ListSerializer) else self.root
+        if request is None or request.method not in ('GET', 'HEAD') or top is not self:
+            return fields
+
+        for param, keep in (('fields', True), ('exclude', False)):
+            names = {name.strip() for name in request.query_params.get(param, '').split(',') if name.strip()}
+            if not names:
+                continue
+            unknown = names - {name for name, field in fields.items() if not field.write_only}
+            if unknown:
+                raise ValidationError({param: f"Unknown fields: {', '.join(sorted(unknown))}"})
+            fields = {name: field for name, field in fields.items() if (name in names) == keep}
+        return fields
+
+
+class Unsupported(Exception):
+    pass
+
+
+class Column:
+    # One output field: where its value is in a values_list() row (`lookup`) and
+    # on an instance (`attrs`), and how to convert each. Nested serializers have
+    # `columns` and look up their pk, to tell a missing relation.
+    def __init__(self, name, lookup, attrs, convert=None, convert_value=None, columns=None):
+        self.name = name
+        self.lookup = lookup
+        self.attrs = attrs
+        self.convert = convert
+        self.convert_value = convert if convert_value is None else convert_value
+        self.columns = columns
+        self.index = None
+
+
+def _model_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        raise Unsupported(name)
+
+
+def _to_one(model_field):
+    return model_field.is_relation and (model_field.many_to_one or model_field.one_to_one)
+
+
+def _decimal_converter(field):
+    # Decimals read from the database already have the field's scale, so they
+    # only need formatting; anything else is quantized by DRF
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if type(field) is not serializers.DecimalField or not coerce_to_string or field.localize or field.normalize_output:
+        return field.to_representation
+    places = field.decimal_places
+    if not places:
+        return field.to_representation
+
+    def convert(value):
+        text = format(value, 'f')
+        if text[-places - 1:-places] == '.':
+            return text
+        return field.to_representation(value)
+    return convert
+
+
+def _datetime_converter(field):
+    # DRF's ISO 8601 output, with the timezone looked up once per list rather than per value
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    zone = getattr(field, 'timezone', None) or field.default_timezone()
+    if type(field) is not serializers.DateTimeField or output_format != ISO_8601 or zone is None:
+        return field.to_representation
+
+    def convert(value):
+        if timezone.is_naive(value):
+            return field.to_representation(value)
+        text = value.astimezone(zone).isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    return convert
+
+
+def _leaf_converters(field, model_field):
+    # (instance converter, values() converter); None where the value is used as is
+    if isinstance(field, serializers.FileField) and isinstance(model_field, models.FileField):
+        return field.to_representation, lambda name: field.to_representation(FieldFile(None, model_field, name))
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_converter(field), None
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field), None
+    if isinstance(model_field, PASSTHROUGH_FIELDS.get(type(field), ())):
+        return None, None
+    return field.to_representation, None
+
+
+def _column(field, model, prefix):
+    if field.source == '*':
+        raise Unsupported(field.field_name)
+    *path, last = field.source_attrs
+    for name in path:
+        relation = _model_field(model, name)
+        if not _to_one(relation):
+            raise Unsupported(field.field_name)
+        model = relation.related_model
+    lookup = '__'.join(prefix + path)
+
+    display = DISPLAY_SOURCE.fullmatch(last)
+    if display and type(field) is serializers.CharField:
+        model_field = _model_field(model, display[1])
+        if not model_field.choices:
+            raise Unsupported(field.field_name)
+        # get_FOO_display() of the raw value, on both paths
+        choices = dict(model_field.flatchoices)
+        return Column(
+            field.field_name, '__'.join(filter(None, (lookup, display[1]))), path + [display[1]],
+            lambda value: str(choices.get(value, value)),
+        )
+
+    model_field = _model_field(model, last)
+    lookup = '__'.join(filter(None, (lookup, last)))
+    if isinstance(field, serializers.ModelSerializer) and _to_one(model_field):
+        columns = _columns(field, model_field.related_model, prefix + path + [last])
+        return Column(field.field_name, f'{lookup}__pk', path + [last], columns=columns)
+    if isinstance(field, serializers.PrimaryKeyRelatedField) and model_field.many_to_one and field.pk_field is None:
+        return Column(field.field_name, lookup, path + [model_field.attname])
+    if model_field.concrete and not model_field.is_relation:
+        return Column(field.field_name, lookup, path + [last], *_leaf_converters(field, model_field))
+    raise Unsupported(field.field_name)
+
+
+def _columns(serializer, model, prefix):
+    return [_column(field, model, prefix) for field in serializer.fields.values() if not field.write_only]
+
+
+def compile_columns(serializer):
+    # The Columns for a ModelSerializer's readable fields, or None if any can't be mapped
+    if not isinstance(serializer, serializers.ModelSerializer):
+        return None
+    try:
+        return _columns(serializer, serializer.Meta.model, [])
+    except Unsupported:
+        return None
+
+
+def _index(columns, lookups):
+    # values_list() returns a lookup once, however often it is asked for
+    for column in columns:
+        column.index = lookups.setdefault(column.lookup, len(lookups))
+        if column.columns is not None:
+            _index(column.columns, lookups)
+    return lookups
+
+
+def _from_row(row, columns):
+    item = {}
+    for column in columns:
+        value = row[column.index]
+        if value is None:
+            item[column.name] = None
+        elif column.columns is not None:
+            item[column.name] = _from_row(row, column.columns)
+        elif column.convert_value is None:
+            item[column.name] = value
+        else:
+            item[column.name] = column.convert_value(value)
+    return item
+
+
+def _resolve(instance, attrs):
+    # rest_framework.fields.get_attribute for model attributes
+    for attr in attrs:
+        try:
+            instance = getattr(instance, attr)
+        except ObjectDoesNotExist:
+            return None
+        if instance is None:
+            return None
+    return instance
+
+
+def _from_instance(instance, columns):
+    item = {}
+    for column in columns:
+        value = _resolve(instance, column.attrs)
+        if value is None:
+            item[column.name] = None
+        elif column.columns is not None:
+            item[column.name] = _from_instance(value, column.columns)
+        elif column.convert is None:
+            item[column.name] = value
+        else:
+            item[column.name] = column.convert(value)
+    return item
+
+
+class FastListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        columns = compile_columns(self.child)
+        if columns is None:
+            return super().to_representation(data)
+
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+        if isinstance(data, models.QuerySet) and data._result_cache is None:
+            lookups = _index(columns, {})
+            return [_from_row(row, columns) for row in data.values_list(*lookups)]
+        return [_from_instance(instance, columns) for instance in data]
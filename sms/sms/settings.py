@@ -21,12 +21,17 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-1#4j_c)n44t$8l@6*d@ar0qeim%(m37j-3q8u@q(u6&!kd)wbg'
+# SMS_SECRET_KEY in production; the fallback is only fit for development
+SECRET_KEY = os.environ.get(
+    'SMS_SECRET_KEY', 'django-insecure-1#4j_c)n44t$8l@6*d@ar0qeim%(m37j-3q8u@q(u6&!kd)wbg'
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Off unless SMS_DEBUG=1 (run_backend.bat and the dev compose service set it)
+DEBUG = os.environ.get('SMS_DEBUG', '0') == '1'
 
-ALLOWED_HOSTS = []
+# Comma-separated, e.g. SMS_ALLOWED_HOSTS="sms.example.com,10.0.0.5"
+ALLOWED_HOSTS = [host for host in os.environ.get('SMS_ALLOWED_HOSTS', '').split(',') if host]
 
 
 # Application definition
@@ -42,11 +47,18 @@ INSTALLED_APPS = [
     'teachers',
     'expense',
     'ledger',
+    'jobs',
     'rest_framework',
     'corsheaders',
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack
+    'sms.metrics.MetricsMiddleware',
+    # Next, so it compresses whatever the rest return
+    'sms.compression.CompressionMiddleware',
+    'sms.asyncviews.AsyncStreamingMiddleware',
+    'sms.campus.CampusMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,12 +92,71 @@ CORS_ALLOW_ALL_ORIGINS = True
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SMS_DB_ENGINE=postgres for multi-user installs; the default is SQLite in WAL mode,
+# which lets readers carry on while a fee payment is being written.
+DB_ENGINE = os.environ.get('SMS_DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('SMS_DB_NAME', 'sms'),
+            'USER': os.environ.get('SMS_DB_USER', 'sms'),
+            'PASSWORD': os.environ.get('SMS_DB_PASSWORD', ''),
+            'HOST': os.environ.get('SMS_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('SMS_DB_PORT', '5432'),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+    if os.environ.get('SMS_DB_POOL', '1') == '1':
+        # psycopg connection pool shared by the threads of each worker process
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.environ.get('SMS_DB_POOL_MIN', 2)),
+                'max_size': int(os.environ.get('SMS_DB_POOL_MAX', 10)),
+                'timeout': int(os.environ.get('SMS_DB_POOL_TIMEOUT', 10)),
+            },
+        }
+    else:
+        # Persistent connections, e.g. when running behind pgbouncer
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('SMS_DB_CONN_MAX_AGE', 60))
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SMS_SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                ),
+                # Take the write lock at BEGIN so concurrent writers wait instead of failing
+                'transaction_mode': 'IMMEDIATE',
+                # Seconds a writer waits for the lock (sqlite3's busy timeout; a
+                # busy_timeout PRAGMA here would override it)
+                'timeout': 20,
+            },
+        }
     }
-}
+
+# Campuses: SMS_CAMPUSES="main,north,city:city" lists the campus codes, each
+# optionally with the database alias it lives on (default: the default database).
+# Each extra alias is a copy of the default database settings with its own
+# SQLite file or PostgreSQL database name.
+CAMPUSES = {}
+for entry in os.environ.get('SMS_CAMPUSES', 'main').split(','):
+    code, _, alias = entry.strip().partition(':')
+    CAMPUSES[code] = alias or 'default'
+    if alias and alias not in DATABASES:
+        DATABASES[alias] = {
+            **DATABASES['default'],
+            'NAME': (
+                f"{DATABASES['default']['NAME']}_{alias}" if DB_ENGINE == 'postgres'
+                else BASE_DIR / f'db-{alias}.sqlite3'
+            ),
+            'OPTIONS': dict(DATABASES['default'].get('OPTIONS', {})),
+        }
+DATABASE_ROUTERS = ['sms.campus.CampusRouter']
 
 
 # Password validation
@@ -135,4 +206,87 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Additional settings if needed
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS']
-CORS_ALLOW_HEADERS = ['Content-Type', 'Authorization', 'X-CSRF-Token']
\ No newline at end of file
+CORS_ALLOW_HEADERS = ['Content-Type', 'Authorization', 'X-CSRF-Token', 'X-Campus', 'If-None-Match']
+CORS_EXPOSE_HEADERS = ['ETag', 'X-Sync-Version']
+
+REST_FRAMEWORK = {
+    # Opt-in keyset pagination: send ?page_size= or ?cursor= to page a list
+    'DEFAULT_PAGINATION_CLASS': 'sms.pagination.KeysetPagination',
+    # orjson-backed when installed; see sms.renderers
+    'DEFAULT_RENDERER_CLASSES': [
+        'sms.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# 0-11; brotli's default 11 takes far longer than the request itself on big lists
+BROTLI_QUALITY = int(os.environ.get('SMS_BROTLI_QUALITY', 5))
+
+# Shared by challan pages and report summaries. Use a file or
+# Redis cache (SMS_CACHE_BACKEND / SMS_CACHE_LOCATION) when running several workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('SMS_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('SMS_CACHE_LOCATION', 'sms'),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('SMS_CACHE_MAX_ENTRIES', 20000))},
+    }
+}
+
+# Fee challan PDFs: batches of at least CHALLAN_POOL_THRESHOLD uncached pages are
+# rendered across CHALLAN_RENDER_WORKERS processes
+CHALLAN_RENDER_WORKERS = int(os.environ.get('SMS_CHALLAN_RENDER_WORKERS', os.cpu_count() or 1))
+CHALLAN_POOL_THRESHOLD = int(os.environ.get('SMS_CHALLAN_POOL_THRESHOLD', 200))
+
+# Background jobs (fee and pay generation)
+# Runs on an in-process thread pool; `manage.py run_jobs` picks up anything left queued.
+JOBS_MAX_WORKERS = int(os.environ.get('SMS_JOBS_MAX_WORKERS', 2))
+# Run jobs synchronously inside the request, e.g. for tests or debugging
+JOBS_RUN_INLINE = os.environ.get('SMS_JOBS_RUN_INLINE', '0') == '1'
+# run_jobs requeues RUNNING jobs whose last heartbeat is older than this
+JOBS_STALE_MINUTES = int(os.environ.get('SMS_JOBS_STALE_MINUTES', 15))
+# Month the academic year starts in; archive_history moves fees and pays of
+# closed academic years out of the live tables
+ACADEMIC_YEAR_START_MONTH = int(os.environ.get('SMS_ACADEMIC_YEAR_START_MONTH', 4))
+
+# Delta syncs (sms.sync): ?since= versions reach back SYNC_OVERLAP_SECONDS to
+# cover transactions still open, and deletions are kept SYNC_TOMBSTONE_DAYS
+# (prune_tombstones); older versions get 410 Gone
+SYNC_OVERLAP_SECONDS = int(os.environ.get('SMS_SYNC_OVERLAP_SECONDS', 120))
+SYNC_TOMBSTONE_DAYS = int(os.environ.get('SMS_SYNC_TOMBSTONE_DAYS', 90))
+
+# Serve the read-heavy list endpoints and the dashboard with async views
+# (sms.asyncviews). gunicorn.conf.py turns this on for its ASGI workers.
+ASYNC_VIEWS = os.environ.get('SMS_ASYNC_VIEWS', '0') == '1'
+
+# Request metrics (sms.metrics): served at /metrics/ and logged one line per
+# request to a rotating file
+METRICS_ENABLED = os.environ.get('SMS_METRICS_ENABLED', '1') == '1'
+METRICS_SLOW_QUERY_MS = float(os.environ.get('SMS_METRICS_SLOW_QUERY_MS', 200))
+METRICS_LOG_FILE = os.environ.get('SMS_METRICS_LOG_FILE', os.path.join(BASE_DIR, 'metrics.log'))
+# /metrics/ shows raw SQL, so only staff users and these addresses or networks
+# (e.g. "127.0.0.1,10.0.0.0/8" for a Prometheus on the internal network) may read it
+METRICS_ALLOWED_IPS = [
+    network.strip() for network in os.environ.get('SMS_METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+    if network.strip()
+]
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'metrics': {'format': '%(asctime)s %(levelname)s %(message)s'},
+    },
+    'handlers': {
+        'metrics_file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': METRICS_LOG_FILE,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'formatter': 'metrics',
+        },
+    },
+    'loggers': {
+        'sms.metrics': {'handlers': ['metrics_file'], 'level': 'INFO', 'propagate': False},
+    },
+}
@@ -0,0 +1,135 @@
+# Conditional GETs and delta sync for the list endpoints. The tracked models
+# (students, fees, teachers, pays, expenses, ledger) carry an updated_at that
+# the bulk paths keep current too, and leave a Tombstone when deleted, so a
+# list's ETag costs one aggregate query and ?since= returns only the changes.
+import hashlib
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
+from rest_framework import generics, status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from ledger.models import Tombstone
+from sms.asyncviews import alist
+from sms.campus import current_campus
+
+VERSION_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+# Full lists send the version to start delta syncs from in this header
+VERSION_HEADER = 'X-Sync-Version'
+
+
+class SyncExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Deletions that old are no longer kept; fetch the full list again.'
+    default_code = 'sync_expired'
+
+
+def sync_version():
+    # Now, less SYNC_OVERLAP_SECONDS to cover transactions that were still open
+    # (so a few rows may come again in the next sync)
+    return (timezone.now() - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)).strftime(VERSION_FORMAT)
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def not_modified(request, etag):
+    # Weak comparison: compression sends the ETag back as W/"..."
+    tags = [tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))]
+    return etag in tags or '*' in tags
+
+
+def with_etag(response, etag):
+    # Browsers keep the body and revalidate it with If-None-Match on every use
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['X-Campus'])
+    return response
+
+
+class ConditionalListMixin:
+    # For list views: a strong ETag (304 when it matches If-None-Match) and
+    # ?since=<version> delta syncs. `sync_fields` are the updated_at columns the
+    # serialized rows depend on, e.g. a fee also shows its student's name.
+    sync_fields = ('updated_at',)
+
+    def list(self, request, *args, **kwargs):
+        since = self.get_since(request)
+        if since is not None:
+            return Response(self.get_delta(since))
+
+        version = sync_version()
+        queryset = self.filter_queryset(self.get_queryset())
+        # Read before the rows, so a change committed in between gets a new ETag
+        etag = self.get_etag(queryset.order_by().aggregate(**self.get_etag_aggregates()))
+        if not_modified(request, etag):
+            return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+        response = with_etag(super().list(request, *args, **kwargs), etag)
+        response[VERSION_HEADER] = version
+        return response
+
+    async def aget(self, request, *args, **kwargs):
+        # list() for async workers (see sms.asyncviews)
+        since = self.get_since(request)
+        if since is not None:
+            return Response(await sync_to_async(self.get_delta)(since))
+
+        version = sync_version()
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = self.get_etag(await queryset.order_by().aaggregate(**self.get_etag_aggregates()))
+        if not_modified(request, etag):
+            return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+        return with_etag(Response(await alist(self), headers={VERSION_HEADER: version}), etag)
+
+    def get_etag_aggregates(self):
+        # The row count catches deletes; the latest updated_at everything else
+        aggregates = {'count': Count('pk')}
+        for index, field in enumerate(self.sync_fields):
+            aggregates[f'latest_{index}'] = Max(field)
+        return aggregates
+
+    def get_etag(self, state):
+        return make_etag(self.request.get_full_path(), current_campus(), *state.values())
+
+    def get_since(self, request):
+        value = request.query_params.get('since')
+        if value is None:
+            return None
+        try:
+            since = parse_datetime(value)
+        except ValueError:
+            since = None
+        if since is None or timezone.is_naive(since):
+            raise ValidationError({'since': 'Use the version returned by the previous sync.'})
+        if since < timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+            raise SyncExpired()
+        return since
+
+    def get_delta(self, since):
+        # Rows changed and ids deleted at or after `since`, over the whole list:
+        # the list's filters are ignored so rows leaving a filter aren't missed.
+        version = sync_version()
+        queryset = generics.GenericAPIView.get_queryset(self)
+
+        changed = Q()
+        for field in self.sync_fields:
+            changed |= Q(**{f'{field}__gte': since})
+        deleted = (
+            Tombstone.objects
+            .filter(model=queryset.model._meta.label_lower, deleted_at__gte=since)
+            .order_by('object_id')
+            .values_list('object_id', flat=True)
+        )
+        return {
+            'version': version,
+            'changed': self.get_serializer(queryset.filter(changed).order_by('pk'), many=True).data,
+            'deleted': list(deleted),
+        }
@@ -0,0 +1,121 @@
+# Synthetic school data for benchmarks and local testing. Months are billed,
+# paid and paid out through the same code paths the API uses, so the derived
+# tables (pending_fee, StudentAccount, FeePayment, Ledger) come out consistent.
+import random
+from datetime import date, datetime, time as day_time
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from expense.models import Expense
+from sms.campus import campus_database
+from sms.utils import calculate_monthly_profit
+from students.models import FeeGeneration, FeePayment, Student, StudentFee
+from students.utils import apply_fee_payments, generate_monthly_fees
+from teachers.models import GenerateTeacherPay, Teacher, TeacherPay
+from teachers.utils import generate_teacher_pay, mark_pays
+
+FIRST_NAMES = (
+    'Ali', 'Ahmed', 'Hassan', 'Usman', 'Bilal', 'Hamza', 'Zain', 'Omar', 'Ayesha', 'Fatima', 'Zara', 'Hira',
+    'Sana', 'Maryam', 'Amna', 'Iqra',
+)
+LAST_NAMES = ('Khan', 'Malik', 'Sheikh', 'Butt', 'Chaudhry', 'Qureshi', 'Raza', 'Siddiqui', 'Awan', 'Mirza')
+GRADES = range(1, 11)
+EXPENSE_AMOUNTS = {
+    Expense.ExpenseCategory.RENT: (80000, 80000),
+    Expense.ExpenseCategory.UTILITY_BILLS: (15000, 40000),
+    Expense.ExpenseCategory.ACADEMIC_EXPENSES: (5000, 30000),
+    Expense.ExpenseCategory.ADMIN_GEN_EXPENSES: (2000, 15000),
+}
+BATCH_SIZE = 1000
+
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _months(start, count):
+    for index in range(count):
+        year, month = divmod(start.month - 1 + index, 12)
+        yield date(start.year + year, month + 1, 1)
+
+
+def generate_school(students=500, teachers=30, years=2, expenses_per_month=8, paid_ratio=0.85, seed=1, end=None):
+    # Creates `students` and `teachers`, then `years` of monthly fees (most paid in
+    # full, some partly, the rest carried forward), payroll and expenses ending
+    # with the month before `end` (default: this month)
+    rng = random.Random(seed)
+    end = (end or date.today()).replace(day=1)
+    first_month = date(end.year - years, end.month, 1)
+
+    with transaction.atomic(using=campus_database()):
+        Student.objects.bulk_create([
+            Student(
+                name=_name(rng),
+                father_name=_name(rng),
+                grade=rng.choice(GRADES),
+                contact=f"03{rng.randint(0, 99):02d}{rng.randint(0, 9999999):07d}",
+                address=f"House {rng.randint(1, 500)}, Street {rng.randint(1, 60)}",
+                admission_date=first_month,
+                tuition_fee=rng.choice((4500, 5000, 5500, 6000, 6500, 7500)),
+                security_fee=5000,
+            )
+            for _ in range(students)
+        ], batch_size=BATCH_SIZE)
+        Teacher.objects.bulk_create([
+            Teacher(
+                name=_name(rng),
+                contact=f"03{rng.randint(0, 99):02d}{rng.randint(0, 9999999):07d}",
+                cnic=f"{rng.randint(10000, 99999)}-{rng.randint(1000000, 9999999)}-{rng.randint(1, 9)}",
+                qualification=rng.choice(('BSc', 'MSc', 'MA', 'BEd', 'MPhil')),
+                pay=rng.randrange(30000, 90000, 5000),
+            )
+            for _ in range(teachers)
+        ], batch_size=BATCH_SIZE)
+
+    for month in _months(first_month, years * 12):
+        exam_fee = 1000 if month.month in (3, 9) else 0
+        generate_monthly_fees(FeeGeneration(month=month, exam_fee=exam_fee))
+
+        payments = {}
+        fees = StudentFee.objects.filter(period=month).values_list('id', 'total_fee')
+        for fee_id, total_fee in fees.iterator():
+            roll = rng.random()
+            if roll < paid_ratio:
+                payments[fee_id] = total_fee
+            elif roll < paid_ratio + (1 - paid_ratio) / 2:
+                payments[fee_id] = (total_fee / 2).quantize(Decimal('0.01'))
+        # Paid inside the month billed, so collections land in that month
+        paid_at = timezone.make_aware(datetime.combine(month.replace(day=10), day_time(9)))
+        for fee_ids in _chunks(list(payments), BATCH_SIZE):
+            apply_fee_payments({fee_id: payments[fee_id] for fee_id in fee_ids}, paid_at=paid_at)
+
+        generate_teacher_pay(GenerateTeacherPay(month=month))
+        mark_pays(TeacherPay.objects.filter(period=month))
+
+        categories = [rng.choice(list(EXPENSE_AMOUNTS)) for _ in range(expenses_per_month)]
+        Expense.objects.bulk_create([
+            Expense(
+                category=category,
+                amount=rng.randint(*EXPENSE_AMOUNTS[category]),
+                date=month.replace(day=rng.randint(1, 28)),
+            )
+            for category in categories
+        ])
+
+    # Expenses were bulk inserted: recount the ledger once
+    calculate_monthly_profit()
+    return {
+        'students': students,
+        'teachers': teachers,
+        'months': years * 12,
+        'fees': StudentFee.objects.count(),
+        'payments': FeePayment.objects.count(),
+        'expenses': Expense.objects.count(),
+    }
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
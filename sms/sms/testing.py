@@ -0,0 +1,21 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    # Fails when an endpoint's query count grows with the number of rows (N+1)
+    def assertQueryCountFlat(self, url, add_rows, small=3, large=12):
+        add_rows(small)
+        small_count = self.count_queries(url)
+        add_rows(large - small)
+        large_count = self.count_queries(url)
+        self.assertEqual(
+            small_count, large_count,
+            f"{url} ran {small_count} queries for {small} rows but {large_count} for {large}"
+        )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
@@ -0,0 +1,70 @@
+import json
+from datetime import date
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+from rest_framework.permissions import IsAuthenticated
+
+from ledger.views import DashboardSummaryApiView, LedgerListCreateApiView
+from sms.asyncviews import async_view
+from sms.metrics import registry
+from sms.synthetic import generate_school
+from students.views import StudentFeeListCreateView, StudentListCreateView
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        generate_school(students=5, teachers=2, years=1, end=date(2025, 4, 1))
+
+    def get_async(self, view_class, path):
+        return async_to_sync(async_view(view_class))(RequestFactory().get(path))
+
+    def test_async_views_return_what_the_drf_views_do(self):
+        for view_class, path in (
+            (StudentListCreateView, '/api/students/?page_size=2'),
+            (StudentFeeListCreateView, '/api/studentfees/?month_from=2025-01&paid=true'),
+            (LedgerListCreateApiView, '/api/ledger/'),
+            (DashboardSummaryApiView, '/api/dashboard/summary/'),
+        ):
+            with self.subTest(path=path):
+                response = self.get_async(view_class, path)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(json.loads(response.content), self.client.get(path).json())
+
+        response = self.get_async(StudentFeeListCreateView, '/api/studentfees/?paid=maybe')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), self.client.get('/api/studentfees/?paid=maybe').json())
+
+    def test_drf_checks_negotiation_and_errors_apply(self):
+        with mock.patch.object(StudentListCreateView, 'permission_classes', [IsAuthenticated]):
+            self.assertEqual(self.get_async(StudentListCreateView, '/api/students/').status_code, 403)
+
+        response = self.get_async(LedgerListCreateApiView, '/api/ledger/?format=api')
+        self.assertEqual((response.status_code, response['Content-Type']), (200, 'text/html; charset=utf-8'))
+
+        with mock.patch.object(LedgerListCreateApiView, 'aget', side_effect=Http404):
+            response = self.get_async(LedgerListCreateApiView, '/api/ledger/')
+        self.assertEqual((response.status_code, json.loads(response.content)), (404, {'detail': 'Not found.'}))
+
+    async def test_metrics_under_asgi(self):
+        registry.reset()
+        await self.async_client.get('/api/ledger/')
+        body = (await self.async_client.get('/metrics/')).content.decode()
+        self.assertIn('sms_db_queries_total{view="ledger-list",method="GET",status="200"} 2', body)
+
+    async def test_streamed_downloads_under_asgi(self):
+        # Sent chunk by chunk rather than collected into memory first
+        response = await self.async_client.get('/api/ledger/export/')
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(body.decode('utf-8-sig').splitlines()[0].split(',')[0], 'month')
+
+        response = await self.async_client.get('/api/students/export/', {'output': 'xlsx'})
+        self.assertTrue(response.is_async)
+        self.assertTrue(b''.join([chunk async for chunk in response.streaming_content]).startswith(b'PK'))
+
+        response = await self.async_client.get('/api/challans/', {'month': '2025-01'})
+        self.assertTrue(response.is_async)
+        self.assertTrue(b''.join([chunk async for chunk in response.streaming_content]).startswith(b'%PDF'))
@@ -0,0 +1,102 @@
+from datetime import date
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, override_settings
+
+from expense.models import Expense
+from jobs.models import Job
+from ledger.models import DataVersion, Ledger
+from sms.campus import run_per_campus, use_campus
+from sms.utils import calculate_monthly_profit
+from students.models import Alumni, FeeGeneration, Student, StudentFee
+from students.utils import generate_monthly_fees, withdraw_students
+from teachers.models import GenerateTeacherPay
+
+# A campus database of its own, e.g. SMS_CAMPUSES=main,city:city
+CAMPUS_ALIAS = next((alias for alias in settings.DATABASES if alias != 'default'), None)
+
+
+@override_settings(CAMPUSES={'main': 'default', 'north': 'default'})
+class CampusTests(TestCase):
+    def setUp(self):
+        Expense.objects.create(category='RENT', amount=100, date=date(2025, 1, 5))
+        with use_campus('north'):
+            Expense.objects.create(category='RENT', amount=300, date=date(2025, 1, 5))
+
+    def test_rows_and_ledger_are_scoped_to_the_campus(self):
+        response = self.client.get('/api/expenses/', HTTP_X_CAMPUS='north')
+        self.assertEqual([row['amount'] for row in response.json()], ['300.00'])
+        self.assertEqual(list(Ledger.objects.values_list('MonthlyExpenses', flat=True)), [100])
+
+        # Rebuilding every campus leaves each campus with its own figures
+        run_per_campus(calculate_monthly_profit)
+        with use_campus('north'):
+            self.assertEqual(list(Ledger.objects.values_list('MonthlyExpenses', flat=True)), [300])
+
+        self.assertEqual(self.client.get('/api/expenses/', HTTP_X_CAMPUS='south').status_code, 400)
+
+    def test_generations_jobs_and_alumni_belong_to_their_campus(self):
+        with use_campus('north'):
+            student = Student.objects.create(
+                name="Ali", grade=10, father_name="Father", contact="0300", address="Street", tuition_fee=1000,
+            )
+        call_command('generate_month', month='2025-03', stdout=StringIO())
+
+        for campus, created in (('main', 0), ('north', 1)):
+            with use_campus(campus):
+                self.assertEqual(FeeGeneration.objects.get().campus, campus)
+                self.assertEqual(GenerateTeacherPay.objects.get().campus, campus)
+                job = Job.objects.get(kind=Job.Kind.GENERATE_FEES)
+                self.assertEqual((job.campus, job.result['fees_created']), (campus, created))
+
+        with use_campus('north'):
+            withdraw_students([student.pk])
+            self.assertEqual(list(Alumni.objects.values_list('name', flat=True)), ["Ali"])
+        self.assertFalse(Alumni.objects.exists())
+
+    def test_consolidated_ledger_merges_campuses(self):
+        data = self.client.get('/api/ledger/consolidated/').json()
+        self.assertEqual(data['totals']['MonthlyExpenses'], '400.00')
+        month = data['monthly'][0]
+        self.assertEqual(month['campuses']['north']['MonthlyExpenses'], '300.00')
+
+        data = self.client.get('/api/ledger/consolidated/', {'campuses': 'north'}).json()
+        self.assertEqual(data['totals']['MonthlyExpenses'], '300.00')
+
+
+@skipUnless(CAMPUS_ALIAS, 'needs a second campus database (SMS_CAMPUSES=main,city:city)')
+@override_settings(CAMPUSES={'main': 'default', 'city': CAMPUS_ALIAS})
+class CampusDatabaseTests(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        with use_campus('city'):
+            for name in ("Ali", "Sara"):
+                Student.objects.create(
+                    name=name, grade=1, father_name="Father", contact="0300", address="Street", tuition_fee=1000,
+                )
+
+    def test_failed_batch_rolls_back_on_the_campus_database(self):
+        in_atomic = []
+
+        def fail(students):
+            in_atomic.append(connections[CAMPUS_ALIAS].in_atomic_block)
+            raise RuntimeError('disk full')
+
+        with use_campus('city'), mock.patch('students.utils.refresh_pending_fees', side_effect=fail):
+            with self.assertRaises(RuntimeError):
+                generate_monthly_fees(FeeGeneration(month=date(2025, 3, 1)))
+            self.assertFalse(StudentFee.objects.filter(month=date(2025, 3, 1)).exists())
+        self.assertEqual(in_atomic, [True])
+
+    def test_data_version_is_bumped_on_the_campus_database(self):
+        with use_campus('city'):
+            before = DataVersion.objects.current()
+            with self.captureOnCommitCallbacks(using=CAMPUS_ALIAS, execute=True) as callbacks:
+                Expense.objects.create(category='RENT', amount=100, date=date(2025, 1, 5))
+            self.assertTrue(callbacks)
+            self.assertGreater(DataVersion.objects.current(), before)
@@ -0,0 +1,30 @@
+import gzip
+from datetime import date
+from unittest import skipUnless
+
+from django.test import TestCase
+
+from sms.compression import brotli
+from sms.synthetic import generate_school
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        generate_school(students=10, teachers=2, years=1, end=date(2025, 4, 1))
+
+    def test_gzip_and_conditional_get(self):
+        plain = self.client.get('/api/studentfees/')
+        response = self.client.get('/api/studentfees/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        # The ETag is weakened by compression and still matches
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+        response = self.client.get('/api/studentfees/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    @skipUnless(brotli, 'brotli is not installed')
+    def test_brotli_preferred(self):
+        plain = self.client.get('/api/studentfees/')
+        response = self.client.get('/api/studentfees/', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), plain.content)
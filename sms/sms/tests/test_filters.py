@@ -0,0 +1,42 @@
+from datetime import date
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from expense.models import Expense
+from sms.filters import bool_param, date_param, filter_date_range, int_param
+
+
+def request(**params):
+    return Request(APIRequestFactory().get('/', params))
+
+
+class FilterParamTests(SimpleTestCase):
+    def test_date_param(self):
+        self.assertEqual(date_param(request(d='2025-02-14'), 'd'), date(2025, 2, 14))
+        self.assertEqual(date_param(request(d='2024-02'), 'd'), date(2024, 2, 1))
+        self.assertEqual(date_param(request(d='2024-02'), 'd', end_of_month=True), date(2024, 2, 29))
+        self.assertIsNone(date_param(request(d=''), 'd'))
+        with self.assertRaises(ValidationError):
+            date_param(request(d='2025-13'), 'd')
+
+    def test_bool_param(self):
+        self.assertIs(bool_param(request(b='Yes'), 'b'), True)
+        self.assertIs(bool_param(request(b='0'), 'b'), False)
+        self.assertIsNone(bool_param(request(), 'b'))
+        with self.assertRaises(ValidationError):
+            bool_param(request(b='maybe'), 'b')
+
+    def test_int_param(self):
+        self.assertEqual(int_param(request(i='7'), 'i'), 7)
+        self.assertIsNone(int_param(request(i=''), 'i'))
+        with self.assertRaises(ValidationError):
+            int_param(request(i='seven'), 'i')
+
+    def test_filter_date_range_includes_the_whole_last_month(self):
+        queryset = filter_date_range(Expense.objects.all(), request(**{'from': '2025-01', 'to': '2025-02'}), 'date', 'from', 'to')
+        where = str(queryset.query)
+        self.assertIn('2025-01-01', where)
+        self.assertIn('2025-02-28', where)
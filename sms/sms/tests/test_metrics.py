@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from ledger.models import Ledger
+from sms.metrics import registry
+
+
+class MetricsTests(TestCase):
+    def test_requests_are_recorded_per_view(self):
+        registry.reset()
+        Ledger.objects.create(month=date(2025, 1, 1))
+        self.client.get('/api/ledger/')
+        self.client.get('/api/ledger/')
+
+        body = self.client.get('/metrics/').content.decode()
+        labels = 'view="ledger-list",method="GET",status="200"'
+        self.assertIn(f'sms_request_duration_seconds_count{{{labels}}} 2', body)
+        # The ETag aggregate and the rows, twice
+        self.assertIn(f'sms_db_queries_total{{{labels}}} 4', body)
+        self.assertIn('sms_slow_query_seconds{view="ledger-list",sql="SELECT', body)
+
+    def test_metrics_are_for_staff_and_allowed_networks(self):
+        outside = {'REMOTE_ADDR': '203.0.113.5'}
+        self.assertEqual(self.client.get('/metrics/', **outside).status_code, 403)
+        with override_settings(METRICS_ALLOWED_IPS=['10.0.0.0/8', '203.0.113.0/24']):
+            self.assertEqual(self.client.get('/metrics/', **outside).status_code, 200)
+
+        self.client.force_login(User.objects.create_user('clerk', password='password'))
+        self.assertEqual(self.client.get('/metrics/', **outside).status_code, 403)
+        self.client.force_login(User.objects.create_user('admin', password='password', is_staff=True))
+        self.assertEqual(self.client.get('/metrics/', **outside).status_code, 200)
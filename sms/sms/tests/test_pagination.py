@@ -0,0 +1,42 @@
+import base64
+import json
+from datetime import date
+
+from django.test import TestCase
+
+from expense.models import Expense
+from jobs.models import Job
+
+
+def cursor(position):
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+class KeysetPaginationTests(TestCase):
+    url = '/api/expenses/'
+
+    def setUp(self):
+        for day in (1, 2, 2, 3, 4):
+            Expense.objects.create(category='RENT', amount=100, date=date(2025, 1, day))
+
+    def test_pages_cover_the_list_once(self):
+        seen = []
+        response = self.client.get(self.url, {'page_size': 2}).json()
+        while True:
+            seen += [row['id'] for row in response['results']]
+            if not response['next']:
+                break
+            response = self.client.get(response['next']).json()
+        self.assertEqual(seen, list(Expense.objects.order_by('-date', '-id').values_list('id', flat=True)))
+
+    def test_invalid_cursors_are_not_found(self):
+        for value in ('not base64!', cursor({'date': '2025-01-02'}), cursor(['2025-01-02']),
+                      cursor(['abc', 1]), cursor(['2025-01-02', 'x']), cursor([None, 1]), cursor([[], 1])):
+            response = self.client.get(self.url, {'cursor': value})
+            self.assertEqual(response.status_code, 404, value)
+            self.assertEqual(response.json(), {'detail': 'Invalid cursor'})
+
+    def test_unpaged_job_list_is_capped(self):
+        Job.objects.bulk_create(Job(kind=Job.Kind.GENERATE_FEES, object_id=i) for i in range(60))
+        self.assertEqual(len(self.client.get('/api/jobs/').json()), 50)
+        self.assertEqual(len(self.client.get('/api/jobs/', {'page_size': 100}).json()['results']), 60)
@@ -0,0 +1,79 @@
+from datetime import date
+
+from django.db.models import F
+from django.test import RequestFactory, TestCase
+from rest_framework import serializers
+from rest_framework.request import Request
+
+from expense.models import Expense
+from expense.serializers import ExpenseSerializer
+from ledger.models import Ledger
+from ledger.serializers import LedgerSerializer
+from sms.serializers import FastListSerializer
+from sms.synthetic import generate_school
+from students.models import ArchivedStudentFee, FeePayment, Student, StudentFee
+from students.serializers import FeePaymentSerializer, StudentFeeSerializer, StudentSerializer
+from students.utils import archive_fees
+from teachers.models import Teacher, TeacherPay
+from teachers.serializers import TeacherPaySerializer, TeacherSerializer
+
+
+def fast_list_serializers(base=serializers.ModelSerializer):
+    # Every serializer class whose lists go through FastListSerializer
+    found = set()
+    for cls in base.__subclasses__():
+        if getattr(getattr(cls, 'Meta', None), 'list_serializer_class', None) is FastListSerializer:
+            found.add(cls)
+        found |= fast_list_serializers(cls)
+    return found
+
+
+class FastSerializationTests(TestCase):
+    def setUp(self):
+        generate_school(students=10, teachers=2, years=1, end=date(2025, 4, 1))
+        Student.objects.create(name='No account', grade=1, father_name='F', contact='0300', address='A')
+        # A deleted student's payments stay in the log without one
+        Student.objects.filter(pk=Student.objects.order_by('pk').values('pk')[:1]).delete()
+
+    def test_fast_lists_match_drf(self):
+        cases = (
+            (StudentSerializer, Student.objects.select_related('account'), {}),
+            (StudentFeeSerializer, StudentFee.objects.select_related('student'), {}),
+            (FeePaymentSerializer, FeePayment.objects.all(), {}),
+            (TeacherSerializer, Teacher.objects.all(), {}),
+            (TeacherPaySerializer, TeacherPay.objects.select_related('teacher'), {}),
+            (ExpenseSerializer, Expense.objects.all(), {}),
+            (LedgerSerializer, Ledger.objects.all(), {}),
+            (StudentSerializer, Student.objects.select_related('account'), {'fields': 'roll_no,name,account'}),
+            (StudentFeeSerializer, StudentFee.objects.select_related('student'), {'exclude': 'student_info'}),
+        )
+        self.assertEqual({serializer_class for serializer_class, _, _ in cases}, fast_list_serializers())
+
+        for serializer_class, queryset, params in cases:
+            with self.subTest(serializer=serializer_class.__name__, **params):
+                self.assertTrue(queryset.exists())
+                context = {'request': Request(RequestFactory().get('/', params))}
+                expected = serializers.ListSerializer(
+                    queryset, child=serializer_class(context=context), context=context
+                ).data
+                # values_list() for a queryset, getattr for a page of instances
+                self.assertEqual(serializer_class(queryset, many=True, context=context).data, expected)
+                self.assertEqual(serializer_class(list(queryset), many=True, context=context).data, expected)
+
+    def test_fast_list_of_live_and_archived_fees_matches_drf(self):
+        # The fee list merges archived rows in (sms.archive.ArchiveListMixin)
+        self.assertTrue(archive_fees(date(2025, 1, 1)))
+        rows = list(StudentFee.objects.select_related('student')) + list(
+            ArchivedStudentFee.objects.select_related('student').annotate(updated_at=F('archived_at'))
+        )
+        context = {'request': Request(RequestFactory().get('/'))}
+        expected = serializers.ListSerializer(rows, child=StudentFeeSerializer(context=context), context=context).data
+        self.assertEqual(StudentFeeSerializer(rows, many=True, context=context).data, expected)
+
+    def test_sparse_fieldsets(self):
+        rows = self.client.get('/api/students/', {'fields': 'roll_no,name', 'page_size': 2}).json()['results']
+        self.assertEqual([set(row) for row in rows], [{'roll_no', 'name'}] * 2)
+        row = self.client.get('/api/expenses/', {'exclude': 'description,category_display'}).json()[0]
+        self.assertEqual(set(row), {'id', 'category', 'amount', 'date'})
+        response = self.client.get('/api/students/', {'fields': 'name,nope'})
+        self.assertEqual((response.status_code, response.json()), (400, {'fields': 'Unknown fields: nope'}))
@@ -0,0 +1,50 @@
+from datetime import date
+
+from django.test import TestCase, override_settings
+
+from expense.models import Expense
+from teachers.models import Teacher, TeacherPay
+
+
+@override_settings(SYNC_OVERLAP_SECONDS=0)
+class SyncTests(TestCase):
+    url = '/api/expenses/'
+
+    def setUp(self):
+        self.expenses = [Expense.objects.create(category='RENT', amount=100 * i, date=date(2025, 1, i)) for i in (1, 2, 3)]
+
+    def test_conditional_get(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Expense.objects.create(category='RENT', amount=50, date=date(2025, 1, 4))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, len(response.json())), (200, 4))
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_delta_sync(self):
+        version = self.client.get(self.url)['X-Sync-Version']
+        changed, unchanged, deleted = self.expenses
+        changed.amount = 150
+        changed.save()
+        deleted_id = deleted.pk
+        deleted.delete()
+        added = Expense.objects.create(category='RENT', amount=50, date=date(2025, 1, 4))
+
+        data = self.client.get(self.url, {'since': version}).json()
+        self.assertEqual([row['id'] for row in data['changed']], [changed.pk, added.pk])
+        self.assertEqual(data['deleted'], [deleted_id])
+        self.assertEqual(self.client.get(self.url, {'since': data['version']}).json()['changed'], [])
+
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': '2000-01-01T00:00:00Z'}).status_code, 410)
+
+    def test_bulk_paths_touch_rows(self):
+        teacher = Teacher.objects.create(name='T', contact='0300', cnic='00000', qualification='MSc', pay=40000)
+        pay = TeacherPay.objects.create(teacher=teacher, month=date(2025, 1, 1), pay=40000)
+        version = self.client.get('/api/teacherpay/')['X-Sync-Version']
+
+        self.client.post('/api/teacherpay/mark-paid/', {'ids': [pay.pk]}, content_type='application/json')
+        data = self.client.get('/api/teacherpay/', {'since': version}).json()
+        self.assertEqual([(row['id'], row['paid']) for row in data['changed']], [(pay.pk, True)])
@@ -0,0 +1,28 @@
+from datetime import date
+
+from django.db.models import F
+from django.test import TestCase
+
+from ledger.models import Ledger
+from sms.benchmarks import run_benchmarks
+from sms.synthetic import generate_school
+from sms.utils import calculate_monthly_profit
+from students.models import FeePayment, StudentAccount
+
+
+class SyntheticSchoolTests(TestCase):
+    def test_generated_school_is_consistent_and_benchmarkable(self):
+        counts = generate_school(students=20, teachers=3, years=1, end=date(2025, 4, 1))
+        self.assertEqual((counts['fees'], counts['expenses']), (240, 96))
+        self.assertEqual(StudentAccount.objects.verify(), [])
+        # Payments are logged in the month billed, not re-dated afterwards
+        self.assertTrue(FeePayment.objects.exists())
+        self.assertFalse(FeePayment.objects.exclude(paid_at__date__month=F('fee_month__month')).exists())
+
+        ledger = list(Ledger.objects.order_by('month').values_list())
+        calculate_monthly_profit()
+        self.assertEqual(list(Ledger.objects.order_by('month').values_list()), ledger)
+
+        results = run_benchmarks(repeat=1, only=['ledger', 'fee_generation'])
+        self.assertEqual(set(results), {'GET ledger', 'fee_generation'})
+        self.assertEqual(results['GET ledger']['queries'], 2)
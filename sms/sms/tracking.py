@@ -0,0 +1,49 @@
+from django.db import router, transaction
+from django.db.models import DEFERRED
+from django.utils import timezone
+
+
+class TrackLoadedValuesMixin:
+    # Remembers column values as loaded from the database so save/delete receivers
+    # can work out what changed without re-reading the row. Saves and deletes run in
+    # a transaction so those receivers commit or roll back together with the row.
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values) if value is not DEFERRED
+        }
+        return instance
+
+    def loaded_value(self, attname, default=None):
+        return getattr(self, '_loaded_values', {}).get(attname, default)
+
+    def has_loaded(self, *attnames):
+        loaded = getattr(self, '_loaded_values', {})
+        return all(attname in loaded for attname in attnames)
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+        }
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            return super().delete(*args, **kwargs)
+
+
+def touch(objs):
+    # Sets updated_at on rows about to be written by bulk_update, which skips
+    # auto_now; queryset.update() callers pass updated_at=timezone.now() instead
+    now = timezone.now()
+    for obj in objs:
+        obj.updated_at = now
+    return objs
@@ -18,14 +18,17 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from sms.metrics import MetricsView
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path('', include('students.urls')),
     path('', include('teachers.urls')), 
     path('', include('expense.urls')), 
     path('', include('ledger.urls')), 
+    path('', include('jobs.urls')),
 ]
 
 if settings.DEBUG:
@@ -1,79 +1,262 @@
-from django.db.models import Sum
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, DateField, F, Sum
 from django.db.models.functions import TruncMonth
-from students.models import StudentFee
-from teachers.models import TeacherPay
+from students.models import ArchivedStudentFee, FeePayment, Student, StudentFee
+from teachers.models import ArchivedTeacherPay, TeacherPay
 from expense.models import Expense
-from ledger.models import Ledger
+from ledger.models import Ledger, mark_data_changed
+from sms.archive import history
+from sms.campus import campus_database, run_per_campus
+from sms.tracking import touch
 
-def calculate_monthly_profit():
-    # 1. Calculate total student fees by month
-    student_fees = (
-        StudentFee.objects
-        .annotate(annotated_month=TruncMonth('month'))  # Renamed annotation
-        .values('annotated_month')  # Use the new name
-        .annotate(total_student_fees=Sum('total_fee'))
-    )
 
-    # 2. Calculate total teacher salaries by month
-    teacher_salaries = (
-        TeacherPay.objects
-        .annotate(annotated_month=TruncMonth('month'))  # Renamed annotation
-        .values('annotated_month')  # Use the new name
-        .annotate(total_teacher_salaries=Sum('pay'))
-        .order_by('annotated_month')  # Add ordering to fix the issue
+def _monthly_totals(queryset, date_field, amount_field):
+    # {first day of month: total} from one grouped query
+    rows = (
+        queryset
+        .annotate(annotated_month=TruncMonth(date_field, output_field=DateField()))
+        .values('annotated_month')
+        .annotate(total=Sum(amount_field))
+        .order_by()
     )
+    return {row['annotated_month']: row['total'] or 0 for row in rows}
+
+
+def _history_totals(model, archive_model, start=None, end=None, amount_field=None):
+    # _monthly_totals over the live table and, when the range reaches it, the archive
+    totals = {}
+    for source in history(model, archive_model, start):
+        queryset = source.all()
+        if start:
+            queryset = queryset.filter(month__gte=start)
+        if end:
+            queryset = queryset.filter(month__lt=end)
+        for month, total in _monthly_totals(queryset, 'month', amount_field).items():
+            totals[month] = totals.get(month, 0) + total
+    return totals
+
+
+def _month_data(month, student_fees, teacher_pays, expenses, collections):
+    total_student_fees = student_fees.get(month, 0)
+    total_teacher_salaries = teacher_pays.get(month, 0)
+    total_expenses = expenses.get(month, 0)
+    return {
+        'month': month,
+        'total_student_fees': total_student_fees,
+        'total_teacher_salaries': total_teacher_salaries,
+        'total_expenses': total_expenses,
+        'monthly_profit': total_student_fees - total_teacher_salaries - total_expenses,
+        'total_collections': collections.get(month, 0),
+    }
+
+
+def _ledger_values(month_data):
+    return {
+        'MonthlyStudentFees': month_data['total_student_fees'],
+        'MonthlyTeacherPays': month_data['total_teacher_salaries'],
+        'MonthlyExpenses': month_data['total_expenses'],
+        'MonthlyProfit': month_data['monthly_profit'],
+        'MonthlyCollections': month_data['total_collections'],
+    }
+
+
+def calculate_monthly_profit():
+    # Full rebuild of the Ledger, used to reconcile the incremental updates made by
+    # ledger.signals. Four grouped queries (plus two on the archives), merged per
+    # month in one pass.
+    student_fees = _history_totals(StudentFee, ArchivedStudentFee, amount_field='total_fee')
+    teacher_pays = _history_totals(TeacherPay, ArchivedTeacherPay, amount_field='pay')
+    expenses = _monthly_totals(Expense.objects, 'date', 'amount')
+    collections = _monthly_totals(FeePayment.objects, 'paid_at', 'amount')
+
+    months = sorted(set(student_fees) | set(teacher_pays) | set(expenses) | set(collections))
+    monthly_data = [_month_data(month, student_fees, teacher_pays, expenses, collections) for month in months]
+
+    with transaction.atomic(using=campus_database()):
+        existing = {entry.month: entry for entry in Ledger.objects.all()}
+        to_create = []
+        to_update = []
+        for month_data in monthly_data:
+            # Months that add up to nothing get no row, as with Ledger.objects.apply_delta
+            if not any(_ledger_values(month_data).values()):
+                continue
+            entry = existing.pop(month_data['month'], None)
+            if entry is None:
+                to_create.append(Ledger(month=month_data['month'], **_ledger_values(month_data)))
+            else:
+                values = _ledger_values(month_data)
+                # Unchanged months keep their updated_at, so delta syncs skip them
+                if any(getattr(entry, attr) != value for attr, value in values.items()):
+                    for attr, value in values.items():
+                        setattr(entry, attr, value)
+                    to_update.append(entry)
+
+        Ledger.objects.bulk_create(to_create)
+        Ledger.objects.bulk_update(
+            touch(to_update),
+            ['MonthlyStudentFees', 'MonthlyTeacherPays', 'MonthlyExpenses', 'MonthlyProfit', 'MonthlyCollections', 'updated_at'],
+        )
+        # Months with no fees, pays, expenses or payments left, or all zero
+        Ledger.objects.filter(pk__in=[entry.pk for entry in existing.values()]).delete()
+        mark_data_changed()
+
+    return monthly_data
 
-    # 3. Calculate total expenses by month
-    expenses = (
-        Expense.objects
-        .annotate(annotated_month=TruncMonth('date'))  # Renamed annotation
-        .values('annotated_month')  # Use the new name
-        .annotate(total_expenses=Sum('amount'))
-        .order_by('annotated_month')  # Add ordering to fix the issue
+
+def recalculate_month(month):
+    # Recount a single month from its source rows
+    start = month.replace(day=1)
+    end = date(start.year + 1, 1, 1) if start.month == 12 else start.replace(month=start.month + 1)
+
+    month_data = _month_data(
+        start,
+        _history_totals(StudentFee, ArchivedStudentFee, start, end, 'total_fee'),
+        _history_totals(TeacherPay, ArchivedTeacherPay, start, end, 'pay'),
+        _monthly_totals(Expense.objects.filter(date__gte=start, date__lt=end), 'date', 'amount'),
+        _monthly_totals(FeePayment.objects.filter(paid_at__date__gte=start, paid_at__date__lt=end), 'paid_at', 'amount'),
     )
+    values = _ledger_values(month_data)
+    if any(values.values()):
+        Ledger.objects.update_or_create(month=start, defaults=values)
+    else:
+        Ledger.objects.filter(month=start).delete()
+    return month_data
+
+
+def _money(value):
+    return f"{value or 0:.2f}"
+
 
-    # Combine all data
-    monthly_data = []
-
-    for month in student_fees:
-        # Initialize a dictionary to store the month data
-        month_data = {
-            'month': month['annotated_month'],  # Use the renamed annotation
-            'total_student_fees': month['total_student_fees'],
-            'total_teacher_salaries': 0,
-            'total_expenses': 0,
-            'monthly_profit': 0,
-        }
-
-        # Get teacher salaries for the same month
-        teacher_salary = teacher_salaries.filter(annotated_month=month['annotated_month']).first()  # Use the renamed annotation
-        if teacher_salary:
-            month_data['total_teacher_salaries'] = teacher_salary['total_teacher_salaries']
-
-        # Get expenses for the same month
-        expense = expenses.filter(annotated_month=month['annotated_month']).first()  # Use the renamed annotation
-        if expense:
-            month_data['total_expenses'] = expense['total_expenses']
-
-        # Calculate monthly profit
-        month_data['monthly_profit'] = (
-            month_data['total_student_fees'] 
-            - month_data['total_teacher_salaries'] 
-            - month_data['total_expenses']
+def _rate(collected, billed):
+    return round(float(collected / billed), 4) if billed else None
+
+
+def dashboard_summary(months=12, today=None):
+    # Everything Dashboard.js needs in one small payload: lifetime and windowed
+    # ledger totals, outstanding balance, collection rate and a per-grade breakdown
+    today = today or date.today()
+    start_index = today.year * 12 + today.month - months
+    window_start = date(start_index // 12, start_index % 12 + 1, 1)
+
+    ledger_totals = {
+        'student_fees': Sum('MonthlyStudentFees'),
+        'teacher_pays': Sum('MonthlyTeacherPays'),
+        'expenses': Sum('MonthlyExpenses'),
+        'profit': Sum('MonthlyProfit'),
+        'collections': Sum('MonthlyCollections'),
+    }
+    lifetime = Ledger.objects.aggregate(**ledger_totals)
+    monthly = list(
+        Ledger.objects.filter(month__gte=window_start).order_by('-month').values(
+            'id', 'month', 'MonthlyStudentFees', 'MonthlyTeacherPays', 'MonthlyExpenses', 'MonthlyProfit',
+            'MonthlyCollections',
         )
+    )
 
-        # Create or update the Ledger entry for the month
-        ledger_entry, created = Ledger.objects.update_or_create(
-            month=month_data['month'],
-            defaults={
-                'MonthlyStudentFees': month_data['total_student_fees'],
-                'MonthlyTeacherPays': month_data['total_teacher_salaries'],
-                'MonthlyExpenses': month_data['total_expenses'],
-                'MonthlyProfit': month_data['monthly_profit'],
-            }
+    students = {
+        row['grade']: row for row in
+        Student.objects.filter(enrolled=True).values('grade')
+        .annotate(students=Count('pk'), outstanding=Sum('pending_fee')).order_by()
+    }
+    fees = {}
+    for source in history(StudentFee, ArchivedStudentFee, window_start):
+        rows = (
+            source.filter(month__gte=window_start).values('student__grade')
+            .annotate(billed=Sum(F('total_fee') - F('pending')), collected=Sum('amount_paid')).order_by()
         )
+        for row in rows:
+            totals = fees.setdefault(row['student__grade'], {'billed': 0, 'collected': 0})
+            totals['billed'] += row['billed'] or 0
+            totals['collected'] += row['collected'] or 0
 
-        # Add the data to the result list
-        monthly_data.append(month_data)
+    grades = []
+    for grade in sorted(set(students) | set(fees)):
+        billed = fees.get(grade, {}).get('billed') or 0
+        collected = fees.get(grade, {}).get('collected') or 0
+        grades.append({
+            'grade': grade,
+            'students': students.get(grade, {}).get('students', 0),
+            'outstanding': _money(students.get(grade, {}).get('outstanding')),
+            'billed': _money(billed),
+            'collected': _money(collected),
+            'collection_rate': _rate(collected, billed),
+        })
+
+    billed = sum((fees[grade]['billed'] or 0 for grade in fees), 0)
+    collected = sum((fees[grade]['collected'] or 0 for grade in fees), 0)
+    return {
+        'lifetime': {name: _money(lifetime[name]) for name in ledger_totals},
+        'window': {
+            'months': months,
+            'from': window_start.isoformat(),
+            **{
+                name: _money(sum((row[column] for row in monthly), 0))
+                for name, column in (
+                    ('student_fees', 'MonthlyStudentFees'),
+                    ('teacher_pays', 'MonthlyTeacherPays'),
+                    ('expenses', 'MonthlyExpenses'),
+                    ('profit', 'MonthlyProfit'),
+                    ('collections', 'MonthlyCollections'),
+                )
+            },
+            'billed': _money(billed),
+            'collected': _money(collected),
+            'collection_rate': _rate(collected, billed),
+        },
+        'outstanding_balance': _money(sum((row['outstanding'] or 0 for row in students.values()), 0)),
+        'grades': grades,
+        'monthly': [
+            {**row, 'month': row['month'].isoformat(), **{
+                column: _money(row[column])
+                for column in (
+                    'MonthlyStudentFees', 'MonthlyTeacherPays', 'MonthlyExpenses', 'MonthlyProfit', 'MonthlyCollections'
+                )
+            }}
+            for row in monthly
+        ],
+    }
+
+
+LEDGER_COLUMNS = ('MonthlyStudentFees', 'MonthlyTeacherPays', 'MonthlyExpenses', 'MonthlyProfit', 'MonthlyCollections')
+
+
+def consolidated_ledger(campuses=None, start=None, end=None):
+    # All campuses' ledgers merged per month. Each campus's rows are read in its
+    # own context (and database), campuses in parallel, and summed here.
+    def campus_ledger():
+        rows = Ledger.objects.all()
+        if start:
+            rows = rows.filter(month__gte=start)
+        if end:
+            rows = rows.filter(month__lte=end)
+        return list(rows.order_by('month').values('month', *LEDGER_COLUMNS))
+
+    per_campus = run_per_campus(campus_ledger, campuses)
+
+    months = {}
+    for campus, rows in per_campus.items():
+        for row in rows:
+            entry = months.setdefault(row['month'], {'totals': dict.fromkeys(LEDGER_COLUMNS, 0), 'campuses': {}})
+            for column in LEDGER_COLUMNS:
+                entry['totals'][column] += row[column]
+            entry['campuses'][campus] = {column: _money(row[column]) for column in LEDGER_COLUMNS}
+
+    totals = dict.fromkeys(LEDGER_COLUMNS, 0)
+    monthly = []
+    for month in sorted(months):
+        entry = months[month]
+        for column in LEDGER_COLUMNS:
+            totals[column] += entry['totals'][column]
+        monthly.append({
+            'month': month.isoformat(),
+            **{column: _money(entry['totals'][column]) for column in LEDGER_COLUMNS},
+            'campuses': entry['campuses'],
+        })
+    return {
+        'campuses': list(per_campus),
+        'totals': {column: _money(totals[column]) for column in LEDGER_COLUMNS},
+        'monthly': monthly,
+    }
 
-    return monthly_data
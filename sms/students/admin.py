@@ -1,5 +1,5 @@
 from django.contrib import admin
-from students.models import Student, StudentFee, Alumni, FeeGeneration
+from students.models import ArchivedStudentFee, BalanceCheckpoint, FeePayment, Student, StudentAccount, StudentFee, Alumni, FeeGeneration
 
 # Register your models here.
 @admin.register(Student)
@@ -13,6 +13,42 @@ class StudentFeeAdmin(admin.ModelAdmin):
     list_display = ('student', 'month', 'tuition_fee', 'exam_fee', 'ac_charges', 'stationary_charges', 'security_fee', 'admission_fee','pending','total_fee','amount_paid','balance', 'paid')
     search_fields = ('student__name', 'month', 'paid')
     list_filter = ('month', 'student__grade', 'paid')
+    list_select_related = ('student',)
+
+@admin.register(ArchivedStudentFee)
+class ArchivedStudentFeeAdmin(admin.ModelAdmin):
+    list_display = ('student', 'month', 'total_fee', 'amount_paid', 'balance', 'paid', 'archived_at')
+    search_fields = ('student__name',)
+    list_select_related = ('student',)
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(StudentAccount)
+class StudentAccountAdmin(admin.ModelAdmin):
+    list_display = ('student', 'total_billed', 'total_paid', 'total_refunded', 'fee_count', 'months_in_arrears')
+    search_fields = ('student__name',)
+    list_select_related = ('student',)
+
+@admin.register(FeePayment)
+class FeePaymentAdmin(admin.ModelAdmin):
+    list_display = ('paid_at', 'roll_no', 'student', 'fee_month', 'amount', 'method')
+    list_filter = ('method',)
+    list_select_related = ('student',)
+    search_fields = ('student__name',)
+
+    # Append-only log
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(BalanceCheckpoint)
+class BalanceCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('student', 'as_of', 'billed', 'paid')
+    list_filter = ('as_of',)
+    list_select_related = ('student',)
 
 @admin.register(Alumni)
 class AlumniAdmin(admin.ModelAdmin):
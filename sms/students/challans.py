@@ -0,0 +1,106 @@
+# Fee challan layout, mirroring the one StudentFeeList.js draws with jsPDF:
+# bank, school and student copies side by side on a landscape A4 page.
+# Kept free of Django imports so pages can be rendered in worker processes.
+from datetime import date, timedelta
+
+from sms.pdf import Canvas
+
+SCHOOL_NAME = 'KNOWLEDGE WAVE'
+COPIES = ((10, 'BANK'), (105, 'SCHOOL'), (200, 'STUDENT'))
+COPY_WIDTH = 90
+DUE_AFTER_DAYS = 10
+
+FEE_ITEMS = (
+    ('pending', 'Previous Balance'),
+    ('tuition_fee', 'Tuition Fee'),
+    ('exam_fee', 'Exam Fee'),
+    ('ac_charges', 'AC Charges'),
+    ('stationary_charges', 'Stationary Charges'),
+    ('admission_fee', 'Admission Fee'),
+    ('lab_charges', 'Lab Charges'),
+    ('security_fee', 'Security (Refundable)'),
+    ('misc', 'Miscellaneous'),
+)
+
+
+def challan_context(fee):
+    # Everything printed on the challan, as plain values (also the cache hash input).
+    # Dates come from the fee month so an unchanged fee always renders the same page.
+    return {
+        'id': fee.id,
+        'name': fee.student.name,
+        'roll_no': fee.student.roll_no,
+        'grade': fee.student.grade,
+        'month': fee.month.isoformat(),
+        'items': [
+            [label, f"{getattr(fee, field):.2f}"] for field, label in FEE_ITEMS if getattr(fee, field) > 0
+        ],
+        'total_fee': f"{fee.total_fee:.2f}",
+        'description': fee.description or '',
+    }
+
+
+def render_challan_page(context):
+    month = date.fromisoformat(context['month'])
+    due_date = month + timedelta(days=DUE_AFTER_DAYS)
+    canvas = Canvas()
+
+    for x, copy_title in COPIES:
+        _draw_copy(canvas, context, x, copy_title, month, due_date)
+
+    canvas.text(292, 200, 'Knowledge Wave School Management System', size=8, align='right')
+    return canvas.content()
+
+
+def _draw_copy(canvas, context, x, copy_title, month, due_date):
+    width = COPY_WIDTH
+    top = 15
+    canvas.rect(x, top, width, 180)
+    if x < 200:
+        canvas.line(x + width + 5, top, x + width + 5, top + 180, dash=(3, 3))
+
+    y = top + 12
+    canvas.text(x + width / 2, y, SCHOOL_NAME, size=12, bold=True, align='center')
+    canvas.text(x + width / 2, y + 6, 'FEE CHALLAN', size=10, bold=True, align='center')
+    canvas.text(x + width / 2, y + 11, f"For the month of {month.strftime('%B %Y')}", size=8, bold=True, align='center')
+    canvas.text(x + 5, y + 18, f"{copy_title} COPY", size=9, bold=True)
+
+    canvas.text(x + 5, y + 26, f"Challan No: {context['id']}")
+    canvas.text(x + width - 35, y + 26, f"Issue Date: {month.strftime('%d/%m/%Y')}")
+    canvas.text(x + 5, y + 31, f"Student Name: {context['name']}")
+    canvas.text(x + width - 35, y + 31, f"Roll No: {context['roll_no']}")
+    canvas.text(x + 5, y + 36, f"Grade: {context['grade']}")
+    canvas.text(x + width - 35, y + 36, f"Due Date: {due_date.strftime('%d/%m/%Y')}")
+
+    row_y = y + 41
+    line_height = 7
+    table_width = width - 10
+    amount_x = x + width - 20
+
+    canvas.rect(x + 5, row_y, table_width, line_height, fill=0.86)
+    canvas.rect(x + 5, row_y, table_width, line_height)
+    canvas.text(x + 7, row_y + 5, 'Description', bold=True)
+    canvas.text(amount_x, row_y + 5, 'Amount', bold=True)
+    row_y += line_height
+
+    for label, amount in context['items']:
+        canvas.rect(x + 5, row_y, table_width, line_height)
+        canvas.text(x + 7, row_y + 5, label)
+        canvas.text(amount_x, row_y + 5, amount)
+        row_y += line_height
+
+    canvas.rect(x + 5, row_y, table_width, line_height)
+    canvas.text(x + 7, row_y + 5, 'Total', bold=True)
+    canvas.text(amount_x, row_y + 5, context['total_fee'], bold=True)
+    row_y += line_height + 2
+
+    description = context['description'].strip()
+    if description and description != 'na':
+        canvas.text(x + 5, row_y + 5, f"Note: {description[:60]}", size=7)
+        row_y += 10
+
+    row_y += 10
+    canvas.line(x + 5, row_y, x + 35, row_y)
+    canvas.line(x + width - 40, row_y, x + width - 5, row_y)
+    canvas.text(x + 5, row_y + 5, 'Bank Signature')
+    canvas.text(x + width - 40, row_y + 5, 'School Signature')
@@ -0,0 +1,24 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from students.utils import create_balance_checkpoints
+
+
+class Command(BaseCommand):
+    help = 'Store each student\'s billed/paid totals at a date so balances can be rebuilt quickly'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--as-of', help='YYYY-MM-DD, defaults to the end of last month')
+        parser.add_argument('--full', action='store_true', help='Recount from all history instead of the last checkpoint')
+
+    def handle(self, *args, **options):
+        if options['as_of']:
+            try:
+                as_of = date.fromisoformat(options['as_of'])
+            except ValueError:
+                raise CommandError('--as-of must be YYYY-MM-DD')
+        else:
+            as_of = date.today().replace(day=1) - timedelta(days=1)
+
+        count = create_balance_checkpoints(as_of, full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f"Stored {count} balance checkpoints as of {as_of}"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from students.models import StudentAccount
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the StudentAccount totals from StudentFee, or check them with --check'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report accounts that drifted')
+        parser.add_argument('--student', type=int, action='append', help='Limit to these roll numbers')
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = StudentAccount.objects.verify(options['student'])
+            for student_id, field, stored, expected in mismatches:
+                self.stdout.write(f"Student {student_id}: {field} is {stored}, expected {expected}")
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} account values out of step; run without --check to rebuild")
+            self.stdout.write(self.style.SUCCESS('Student accounts are consistent'))
+            return
+
+        count = StudentAccount.objects.rebuild(options['student'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} student accounts"))
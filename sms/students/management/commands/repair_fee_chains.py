@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from students.utils import FEE_BATCH_SIZE, repair_fee_chains
+
+
+class Command(BaseCommand):
+    help = 'Re-carry each fee\'s balance into the pending of the student\'s later generated fees'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only count the fees that are out of step')
+        parser.add_argument('--student', type=int, action='append', help='Limit to these roll numbers')
+        parser.add_argument('--workers', type=int, default=4, help='Threads, each repairing a batch of students')
+        parser.add_argument('--batch-size', type=int, default=FEE_BATCH_SIZE, help='Students per batch')
+
+    def handle(self, *args, **options):
+        result = repair_fee_chains(
+            options['student'], workers=options['workers'], batch_size=options['batch_size'], dry_run=options['check']
+        )
+        if options['check']:
+            if result['fees_updated']:
+                raise CommandError(
+                    f"{result['fees_updated']} fees of {result['students']} students carry a stale pending; "
+                    "run without --check to repair"
+                )
+            self.stdout.write(self.style.SUCCESS(f"Fee chains of {result['students']} students are consistent"))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Repaired {result['fees_updated']} fees across {result['students']} students"
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 04:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0013_rename_tution_fee_student_tuition_fee_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentfee',
+            index=models.Index(fields=['month', 'id'], name='studentfee_month_id_idx'),
+        ),
+    ]
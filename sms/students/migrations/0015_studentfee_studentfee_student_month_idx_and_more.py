@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 04:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0014_studentfee_studentfee_month_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentfee',
+            index=models.Index(fields=['student', 'month', 'id'], name='studentfee_student_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentfee',
+            index=models.Index(fields=['month', 'paid'], name='studentfee_month_paid_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2 on 2026-10-18 04:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+
+
+def build_accounts(apps, schema_editor):
+    Student = apps.get_model('students', 'Student')
+    StudentFee = apps.get_model('students', 'StudentFee')
+    StudentAccount = apps.get_model('students', 'StudentAccount')
+    db_alias = schema_editor.connection.alias
+
+    refund = Q(description="Security refund")
+    totals = {
+        row.pop('student_id'): row for row in
+        StudentFee.objects.using(db_alias).values('student_id').annotate(
+            total_billed=Sum(F('total_fee') - F('pending'), filter=~refund, default=0),
+            total_paid=Sum('amount_paid', filter=~refund, default=0),
+            total_refunded=Sum('amount_paid', filter=refund, default=0),
+            fee_count=Count('id'),
+            months_in_arrears=Count('id', filter=Q(paid=False) & ~refund),
+        ).order_by()
+    }
+    accounts = []
+    for student_id in Student.objects.using(db_alias).values_list('pk', flat=True).iterator():
+        row = totals.get(student_id, {})
+        row['total_refunded'] = -row.get('total_refunded', 0)
+        accounts.append(StudentAccount(student_id=student_id, **row))
+    StudentAccount.objects.using(db_alias).bulk_create(accounts, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0015_studentfee_studentfee_student_month_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentAccount',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='account', serialize=False, to='students.student')),
+                ('total_billed', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_refunded', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('fee_count', models.IntegerField(default=0)),
+                ('months_in_arrears', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(build_accounts, migrations.RunPython.noop),
+    ]
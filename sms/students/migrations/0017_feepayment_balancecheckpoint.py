@@ -0,0 +1,77 @@
+# Generated by Django 5.2 on 2026-10-18 04:26
+
+from collections import defaultdict
+from datetime import datetime, time
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def log_existing_payments(apps, schema_editor):
+    # Fees paid before the log existed get one opening payment each, dated to
+    # the fee month, and those amounts are rolled into Ledger.MonthlyCollections
+    StudentFee = apps.get_model('students', 'StudentFee')
+    FeePayment = apps.get_model('students', 'FeePayment')
+    Ledger = apps.get_model('ledger', 'Ledger')
+    db_alias = schema_editor.connection.alias
+
+    payments = []
+    collections = defaultdict(int)
+    fees = StudentFee.objects.using(db_alias).exclude(amount_paid=0).values_list('id', 'student_id', 'month', 'amount_paid', 'description')
+    for fee_id, student_id, month, amount_paid, description in fees.iterator():
+        payments.append(FeePayment(
+            fee_id=fee_id,
+            student_id=student_id,
+            fee_month=month,
+            amount=amount_paid,
+            method='REFUND' if description == "Security refund" else 'OPENING',
+            paid_at=django.utils.timezone.make_aware(datetime.combine(month, time.min)),
+        ))
+        collections[month.replace(day=1)] += amount_paid
+    FeePayment.objects.using(db_alias).bulk_create(payments, batch_size=500)
+
+    for month, amount in collections.items():
+        Ledger.objects.using(db_alias).get_or_create(month=month)
+        Ledger.objects.using(db_alias).filter(month=month).update(MonthlyCollections=F('MonthlyCollections') + amount)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0003_ledger_monthlycollections'),
+        ('students', '0016_studentaccount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField()),
+                ('billed', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_checkpoints', to='students.student')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('student', 'as_of'), name='balancecheckpoint_student_as_of_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FeePayment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fee_month', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('method', models.CharField(choices=[('CASH', 'Cash'), ('BANK', 'Bank deposit'), ('ONLINE', 'Online transfer'), ('CHEQUE', 'Cheque'), ('REFUND', 'Security refund'), ('OPENING', 'Paid before the payment log')], default='CASH', max_length=10)),
+                ('paid_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fee', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payments', to='students.studentfee')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='students.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'paid_at'], name='feepayment_student_paid_idx'), models.Index(fields=['paid_at', 'id'], name='feepayment_paid_at_id_idx')],
+            },
+        ),
+        migrations.RunPython(log_existing_payments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 04:29
+
+from django.db import migrations, models
+
+
+def set_generated_periods(apps, schema_editor):
+    # Fees created by an earlier FeeGeneration get its period; where a month was
+    # generated twice only the first fee per student is tagged, the duplicates
+    # are left untagged for review
+    FeeGeneration = apps.get_model('students', 'FeeGeneration')
+    StudentFee = apps.get_model('students', 'StudentFee')
+    db_alias = schema_editor.connection.alias
+
+    months = set(FeeGeneration.objects.using(db_alias).values_list('month', flat=True))
+    generated = (
+        StudentFee.objects.using(db_alias).filter(month__in=months, admission_fee=0, security_fee=0)
+        .order_by('id').values_list('id', 'student_id', 'month')
+    )
+    seen = set()
+    tagged = []
+    for fee_id, student_id, month in generated.iterator():
+        period = month.replace(day=1)
+        if (student_id, period) not in seen:
+            seen.add((student_id, period))
+            tagged.append(StudentFee(id=fee_id, period=period))
+    StudentFee.objects.using(db_alias).bulk_update(tagged, ['period'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0017_feepayment_balancecheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentfee',
+            name='period',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(set_generated_periods, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='studentfee',
+            constraint=models.UniqueConstraint(fields=('student', 'period'), name='studentfee_student_period_uniq'),
+        ),
+    ]
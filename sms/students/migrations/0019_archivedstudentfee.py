@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 04:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0018_generation_period'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedStudentFee',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('month', models.DateField()),
+                ('tuition_fee', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('exam_fee', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('ac_charges', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('stationary_charges', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('admission_fee', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('lab_charges', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('security_fee', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('misc', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('description', models.TextField(blank=True, max_length=100, null=True)),
+                ('pending', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('total_fee', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('amount_paid', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('paid', models.BooleanField(default=False)),
+                ('period', models.DateField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_fees', to='students.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month', 'id'], name='archivedfee_month_id_idx'), models.Index(fields=['student', 'month'], name='archivedfee_student_month_idx')],
+            },
+        ),
+    ]
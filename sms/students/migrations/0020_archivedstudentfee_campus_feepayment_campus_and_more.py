@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 04:40
+
+import sms.campus
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0019_archivedstudentfee'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedstudentfee',
+            name='campus',
+            field=models.CharField(default=sms.campus.current_campus, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='feepayment',
+            name='campus',
+            field=models.CharField(default=sms.campus.current_campus, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='campus',
+            field=models.CharField(default=sms.campus.current_campus, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='studentfee',
+            name='campus',
+            field=models.CharField(default=sms.campus.current_campus, editable=False, max_length=20),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 05:51
+
+import sms.campus
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0021_student_updated_at_studentaccount_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumni',
+            name='campus',
+            field=models.CharField(default=sms.campus.current_campus, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='feegeneration',
+            name='campus',
+            field=models.CharField(default=sms.campus.current_campus, editable=False, max_length=20),
+        ),
+    ]
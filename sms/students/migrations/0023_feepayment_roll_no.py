@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 06:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_roll_nos(apps, schema_editor):
+    FeePayment = apps.get_model('students', 'FeePayment')
+    FeePayment.objects.using(schema_editor.connection.alias).update(roll_no=F('student_id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0022_alumni_campus_feegeneration_campus'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feepayment',
+            name='roll_no',
+            field=models.IntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(copy_roll_nos, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='feepayment',
+            name='roll_no',
+            field=models.IntegerField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='feepayment',
+            name='student',
+            field=models.ForeignKey(
+                null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payments',
+                to='students.student',
+            ),
+        ),
+    ]
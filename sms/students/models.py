@@ -1,8 +1,14 @@
-from django.db import models
-from django.db.models.signals import post_save
+from collections import defaultdict
+
+from django.db import models, router, transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.db.models import Sum
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
 from datetime import date
+from ledger.models import Ledger
+from sms.campus import CampusManager, current_campus
+from sms.tracking import TrackLoadedValuesMixin, touch
 
 
 class Alumni(models.Model):
@@ -15,12 +21,18 @@ class Alumni(models.Model):
     admission_date = models.DateField(null=True, blank=True)
     address = models.TextField()
     graduated_on = models.DateField(auto_now_add=True)
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+
+    objects = CampusManager()
 
     def __str__(self):
         return f"{self.name} (Roll no: {self.roll_no})"
 
 
-class Student(models.Model):
+SECURITY_REFUND = "Security refund"
+
+
+class Student(TrackLoadedValuesMixin, models.Model):
     roll_no = models.AutoField(primary_key=True)
     name = models.CharField(max_length=50)
     grade = models.IntegerField()
@@ -35,38 +47,38 @@ class Student(models.Model):
     pending_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     scanned_doc = models.FileField(upload_to='scanned_docs/', null=True, blank=True)
     enrolled = models.BooleanField(default=True)
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = CampusManager()
 
     def __str__(self):
         return f"{self.name} (Roll no: {self.roll_no})"
 
+    def is_leaving(self, update_fields=None):
+        # enrolled -> unenrolled, worked out from the values loaded with the row
+        if self._state.adding or 'enrolled' in self.get_deferred_fields():
+            return False
+        if update_fields is not None and 'enrolled' not in update_fields:
+            return False
+        if self.enrolled:
+            return False
+        if self.has_loaded('enrolled'):
+            return self.loaded_value('enrolled')
+        # Instance built by hand rather than loaded: fall back to the stored value
+        return bool(Student.objects.filter(pk=self.pk).values_list('enrolled', flat=True).first())
+
     def save(self, *args, **kwargs):
-        is_refund = False
-        if self.pk:
-            old = Student.objects.get(pk=self.pk)
-            is_refund = old.enrolled and not self.enrolled
+        is_refund = self.is_leaving(kwargs.get('update_fields'))
 
         super().save(*args, **kwargs)
 
         if is_refund:
-            if not StudentFee.objects.filter(student=self, description="Security refund").exists():
-                StudentFee.objects.create(
-                    student=self,
-                    tuition_fee=0,
-                    exam_fee=0,
-                    ac_charges=0,
-                    stationary_charges=0,
-                    admission_fee=0,
-                    lab_charges=0,
-                    security_fee=-self.security_fee,
-                    misc=0,
-                    amount_paid=-self.security_fee,
-                    balance=0,
-                    description="Security refund",
-                    paid=True
-                )
+            if not StudentFee.objects.filter(student=self, description=SECURITY_REFUND).exists():
+                StudentFee.security_refund(self).save()
 
 
-class StudentFee(models.Model):
+class StudentFee(TrackLoadedValuesMixin, models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     month = models.DateField(default=date.today)
     tuition_fee = models.DecimalField(max_digits=10, decimal_places=2, default=6500)
@@ -83,11 +95,53 @@ class StudentFee(models.Model):
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     balance = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     paid = models.BooleanField(default=False)
+    # First day of the billing month for fees made by FeeGeneration; null for
+    # admission, refund and hand-made fees. One generated fee per student and month.
+    period = models.DateField(null=True, blank=True, editable=False)
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = CampusManager()
+
+    # Set by the API before save; recorded on the FeePayment log
+    payment_method = None
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order for fee lists
+            models.Index(fields=['month', 'id'], name='studentfee_month_id_idx'),
+            # Latest fee per student (pending_fee refresh)
+            models.Index(fields=['student', 'month', 'id'], name='studentfee_student_month_idx'),
+            # Month range + paid filters
+            models.Index(fields=['month', 'paid'], name='studentfee_month_paid_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'period'], name='studentfee_student_period_uniq'),
+        ]
 
     def __str__(self):
         return f"{self.student.name} - {self.month.strftime('%B %Y')}"
 
-    def save(self, *args, **kwargs):
+    @classmethod
+    def security_refund(cls, student):
+        # Pays the security deposit back when a student leaves
+        return cls(
+            student=student,
+            tuition_fee=0,
+            exam_fee=0,
+            ac_charges=0,
+            stationary_charges=0,
+            admission_fee=0,
+            lab_charges=0,
+            security_fee=-student.security_fee,
+            misc=0,
+            amount_paid=-student.security_fee,
+            balance=0,
+            description=SECURITY_REFUND,
+            paid=True
+        )
+
+    def compute_totals(self):
         # 1. Compute total fee including carried pending
         self.total_fee = (
             self.tuition_fee + self.exam_fee + self.ac_charges + self.stationary_charges +
@@ -102,13 +156,304 @@ class StudentFee(models.Model):
         else:
             self.paid = False
 
+    def chain_moves(self):
+        # How this save changes the chain of later fees: None when neither the
+        # balance nor the month changed, 'balance' when only the balance did,
+        # else 'month' (a new or moved fee, or values not loaded to compare)
+        if self._state.adding:
+            return 'month'
+        if not self.has_loaded('month', 'balance'):
+            return 'month'
+        old_month, old_balance = self.loaded_value('month'), self.loaded_value('balance')
+        if old_month != self.month:
+            return 'month'
+        return None if old_balance == self.balance else 'balance'
+
+    def chain_start(self, moves, old_month):
+        # (month, id) the re-chain scans from, its first fee being the correct
+        # start: this fee for a balance change, else the fee before the earlier of
+        # its old and new months (None: the student's whole chain)
+        if moves == 'balance':
+            return (self.month, self.id)
+        fees = StudentFee.objects.filter(student_id=self.student_id, month__lt=min(self.month, old_month))
+        return fees.order_by('-month', '-id').values_list('month', 'id').first()
+
+    def save(self, *args, **kwargs):
+        self.compute_totals()
+        moves = self.chain_moves()
+        old_month = self.loaded_value('month', self.month)
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+
+        # One transaction, so the fee, pending_fee and the later fees change together
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+            # 3. Update total pending fee for the student
+            latest_fee = StudentFee.objects.filter(student=self.student).order_by('-month', '-id').first()
+
+            if latest_fee:
+                Student.objects.filter(pk=self.student.pk).exclude(pending_fee=latest_fee.balance).update(
+                    pending_fee=latest_fee.balance, updated_at=timezone.now()
+                )
+
+            # 4. Carry the new balance into the student's later generated fees
+            if moves is not None:
+                from students.utils import rechain_fees
+                rechain_fees({self.student_id: self.chain_start(moves, old_month)})
+
+
+class ArchivedStudentFee(models.Model):
+    # StudentFee rows of closed academic years, moved here by archive_history
+    # with their ids kept. Read-only history.
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='archived_fees')
+    month = models.DateField()
+    tuition_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    exam_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    ac_charges = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    stationary_charges = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    admission_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    lab_charges = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    security_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    misc = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    description = models.TextField(max_length=100, null=True, blank=True)
+    pending = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    total_fee = models.DecimalField(max_digits=10, decimal_places=2)
+    amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    balance = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    paid = models.BooleanField(default=False)
+    period = models.DateField(null=True, blank=True)
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = CampusManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['month', 'id'], name='archivedfee_month_id_idx'),
+            models.Index(fields=['student', 'month'], name='archivedfee_student_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} - {self.month.strftime('%B %Y')} (archived)"
+
+
+# Columns copied into the archive, besides the id
+ARCHIVED_FEE_FIELDS = (
+    'student_id', 'month', 'tuition_fee', 'exam_fee', 'ac_charges', 'stationary_charges', 'admission_fee',
+    'lab_charges', 'security_fee', 'misc', 'description', 'pending', 'total_fee', 'amount_paid', 'balance',
+    'paid', 'period', 'campus',
+)
+
+
+ACCOUNT_FIELDS = ('total_billed', 'total_paid', 'total_refunded', 'fee_count', 'months_in_arrears')
+ACCOUNT_SOURCE_FIELDS = ('student_id', 'total_fee', 'pending', 'amount_paid', 'paid', 'description')
+ACCOUNT_BATCH_SIZE = 500
+
+
+class StudentAccountManager(models.Manager):
+    def apply_deltas(self, deltas, create=True):
+        # deltas: {student id: {account field: amount}}, applied with one locked
+        # read and batched writes
+        deltas = {student_id: delta for student_id, delta in deltas.items() if any(delta.values())}
+        if not deltas:
+            return
+
+        with transaction.atomic(using=self.db):
+            accounts = self.select_for_update().in_bulk(list(deltas))
+            missing = [self.model(student_id=student_id) for student_id in deltas if student_id not in accounts]
+            if not create:
+                missing = []
+            for account in [*accounts.values(), *missing]:
+                for field, amount in deltas[account.student_id].items():
+                    setattr(account, field, getattr(account, field) + amount)
+            self.bulk_update(touch(accounts.values()), (*ACCOUNT_FIELDS, 'updated_at'), batch_size=ACCOUNT_BATCH_SIZE)
+            self.bulk_create(missing, batch_size=ACCOUNT_BATCH_SIZE)
+
+    def apply_fee_changes(self, changes, create=True):
+        # changes: (before, after) pairs of fee values, None for a fee that
+        # didn't exist before or is gone after
+        deltas = defaultdict(lambda: defaultdict(int))
+        for before, after in changes:
+            for values, sign in ((before, -1), (after, 1)):
+                if values is not None:
+                    for field, amount in self.model.fee_totals(values).items():
+                        deltas[values['student_id']][field] += sign * amount
+        self.apply_deltas(deltas, create=create)
+
+    def expected(self, student_ids=None):
+        # Account totals recomputed from StudentFee (and its archive) with one
+        # grouped query per table
+        from sms.archive import history
+
+        students = Student.objects.all()
+        if student_ids is not None:
+            students = students.filter(pk__in=student_ids)
+
+        refund = Q(description=SECURITY_REFUND)
+        totals = defaultdict(lambda: dict.fromkeys(ACCOUNT_FIELDS, 0))
+        for source in history(StudentFee, ArchivedStudentFee):
+            fees = source.all() if student_ids is None else source.filter(student_id__in=student_ids)
+            rows = fees.values('student_id').annotate(
+                total_billed=Sum(F('total_fee') - F('pending'), filter=~refund, default=0),
+                total_paid=Sum('amount_paid', filter=~refund, default=0),
+                total_refunded=Sum('amount_paid', filter=refund, default=0),
+                fee_count=Count('id'),
+                months_in_arrears=Count('id', filter=Q(paid=False) & ~refund),
+            ).order_by()
+            for row in rows:
+                total = totals[row.pop('student_id')]
+                for field, amount in row.items():
+                    total[field] += amount
+
+        expected = {}
+        for student_id in students.values_list('pk', flat=True).iterator():
+            row = dict(totals.get(student_id, dict.fromkeys(ACCOUNT_FIELDS, 0)))
+            row['total_refunded'] = -row['total_refunded']
+            expected[student_id] = row
+        return expected
+
+    def rebuild(self, student_ids=None):
+        accounts = [self.model(student_id=student_id, **row) for student_id, row in self.expected(student_ids).items()]
+        self.bulk_create(
+            accounts,
+            batch_size=ACCOUNT_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['student'],
+            update_fields=(*ACCOUNT_FIELDS, 'updated_at'),
+        )
+        return len(accounts)
+
+    def verify(self, student_ids=None):
+        # [(student id, field, stored, expected)] for every account that drifted
+        stored = self.all() if student_ids is None else self.filter(student_id__in=student_ids)
+        stored = {row.pop('student_id'): row for row in stored.values('student_id', *ACCOUNT_FIELDS)}
+        mismatches = []
+        for student_id, expected in self.expected(student_ids).items():
+            account = stored.get(student_id, dict.fromkeys(ACCOUNT_FIELDS))
+            for field in ACCOUNT_FIELDS:
+                if account[field] != expected[field]:
+                    mismatches.append((student_id, field, account[field], expected[field]))
+        return mismatches
+
+
+class StudentAccount(models.Model):
+    # Lifetime fee totals per student, kept in step with StudentFee by the
+    # receivers below and by the bulk paths in students.utils. The current
+    # balance stays on Student.pending_fee.
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, related_name='account')
+    total_billed = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_refunded = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    fee_count = models.IntegerField(default=0)
+    months_in_arrears = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = StudentAccountManager()
+
+    def __str__(self):
+        return f"Account of student {self.student_id}"
+
+    @staticmethod
+    def source_values(fee):
+        return {name: getattr(fee, name) for name in ACCOUNT_SOURCE_FIELDS}
+
+    @staticmethod
+    def fee_totals(values):
+        # What one fee row adds to its student's account; carried-forward
+        # pending is not billed again
+        if values['description'] == SECURITY_REFUND:
+            return {'total_refunded': -values['amount_paid'], 'fee_count': 1}
+        return {
+            'total_billed': values['total_fee'] - values['pending'],
+            'total_paid': values['amount_paid'],
+            'fee_count': 1,
+            'months_in_arrears': 0 if values['paid'] else 1,
+        }
+
+
+class FeePaymentManager(CampusManager):
+    def record(self, payments, batch_size=ACCOUNT_BATCH_SIZE):
+        # Insert-only: one row per change to a fee's amount_paid. Cash received
+        # is rolled up into Ledger.MonthlyCollections by payment date.
+        payments = [payment for payment in payments if payment.amount]
+        with transaction.atomic(using=self.db):
+            self.bulk_create(payments, batch_size=batch_size)
+            collections = defaultdict(int)
+            for payment in payments:
+                collections[timezone.localdate(payment.paid_at).replace(day=1)] += payment.amount
+            for month, amount in collections.items():
+                Ledger.objects.apply_delta(month, collections=amount)
+        return payments
+
+
+class FeePayment(models.Model):
+    class Method(models.TextChoices):
+        CASH = 'CASH', 'Cash'
+        BANK = 'BANK', 'Bank deposit'
+        ONLINE = 'ONLINE', 'Online transfer'
+        CHEQUE = 'CHEQUE', 'Cheque'
+        REFUND = 'REFUND', 'Security refund'
+        OPENING = 'OPENING', 'Paid before the payment log'
+
+    fee = models.ForeignKey(StudentFee, on_delete=models.SET_NULL, null=True, related_name='payments')
+    # Append-only: a deleted student's payments stay in the log (and in the
+    # ledger's collections), still identified by roll_no
+    student = models.ForeignKey(Student, on_delete=models.SET_NULL, null=True, related_name='payments')
+    roll_no = models.IntegerField(editable=False)
+    fee_month = models.DateField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    method = models.CharField(max_length=10, choices=Method.choices, default=Method.CASH)
+    paid_at = models.DateTimeField(default=timezone.now)
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+
+    objects = FeePaymentManager()
+
+    class Meta:
+        indexes = [
+            # Balance reconstruction: a student's payments after a checkpoint
+            models.Index(fields=['student', 'paid_at'], name='feepayment_student_paid_idx'),
+            models.Index(fields=['paid_at', 'id'], name='feepayment_paid_at_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.amount} from student {self.roll_no} on {self.paid_at:%d %b %Y}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("FeePayment rows are append-only; record a correcting payment instead")
         super().save(*args, **kwargs)
 
-        # 3. Update total pending fee for the student
-        latest_fee = StudentFee.objects.filter(student=self.student).order_by('-month', '-id').first()
+    @classmethod
+    def for_fee(cls, fee, amount, method=None, paid_at=None):
+        if method is None:
+            method = cls.Method.REFUND if fee.description == SECURITY_REFUND else cls.Method.CASH
+        return cls(
+            fee=fee, student_id=fee.student_id, roll_no=fee.student_id, fee_month=fee.month, amount=amount, method=method,
+            paid_at=paid_at or timezone.now(), campus=fee.campus
+        )
+
+
+class BalanceCheckpoint(models.Model):
+    # A student's running totals at the end of `as_of`: billed is the fees charged
+    # (less carried-forward pending) for months up to as_of, paid the FeePayment
+    # total up to as_of. Balances at later dates only need the rows after it.
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='balance_checkpoints')
+    as_of = models.DateField()
+    billed = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
 
-        if latest_fee:
-            Student.objects.filter(pk=self.student.pk).update(pending_fee=latest_fee.balance)
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'as_of'], name='balancecheckpoint_student_as_of_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Student {self.student_id} as of {self.as_of}"
+
+    @property
+    def balance(self):
+        return self.billed - self.paid
 
 
 class FeeGeneration(models.Model):
@@ -118,6 +463,10 @@ class FeeGeneration(models.Model):
     ac_charges = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     stationary_charges = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     lab_charges = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # Campus the fees were generated for; its job runs in that campus
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+
+    objects = CampusManager()
 
     def __str__(self):
         return f"Fee Generated for: {self.month.strftime('%B %Y')}"
@@ -143,18 +492,37 @@ def create_student_fee(sender, instance, created, **kwargs):
 @receiver(post_save, sender=FeeGeneration)
 def generate_fees_for_students(sender, instance, created, **kwargs):
     if created:
-        students = Student.objects.filter(enrolled=True)
-
-        for student in students:
-            StudentFee.objects.create(
-                student=student,
-                month=instance.month,
-                tuition_fee=student.tuition_fee,
-                pending=student.pending_fee,
-                exam_fee=instance.exam_fee,
-                ac_charges=instance.ac_charges,
-                stationary_charges=instance.stationary_charges,
-                admission_fee=0,
-                lab_charges=instance.lab_charges,
-                security_fee=0
-            )
+        from jobs.models import Job
+        from jobs.queue import enqueue
+        instance.job = enqueue(Job.Kind.GENERATE_FEES, instance.pk)
+
+
+# Signals: keep StudentAccount in step with single fee saves and deletes
+@receiver(post_save, sender=StudentFee)
+def update_student_account_on_save(sender, instance, created, **kwargs):
+    if created:
+        StudentAccount.objects.apply_fee_changes([(None, StudentAccount.source_values(instance))])
+    elif instance.has_loaded(*ACCOUNT_SOURCE_FIELDS):
+        before = {name: instance.loaded_value(name) for name in ACCOUNT_SOURCE_FIELDS}
+        StudentAccount.objects.apply_fee_changes([(before, StudentAccount.source_values(instance))])
+    else:
+        # Saved without a loaded row (partial load or hand-built instance): recount
+        StudentAccount.objects.rebuild([instance.student_id])
+
+
+@receiver(post_delete, sender=StudentFee)
+def update_student_account_on_delete(sender, instance, **kwargs):
+    # create=False: the student itself may be going (cascade)
+    StudentAccount.objects.apply_fee_changes([(StudentAccount.source_values(instance), None)], create=False)
+
+
+# Signal: log every change to amount_paid made through StudentFee.save
+@receiver(post_save, sender=StudentFee)
+def log_fee_payment(sender, instance, created, **kwargs):
+    if created:
+        before = 0
+    elif instance.has_loaded('amount_paid'):
+        before = instance.loaded_value('amount_paid')
+    else:
+        before = FeePayment.objects.filter(fee=instance).aggregate(total=Sum('amount', default=0))['total']
+    FeePayment.objects.record([FeePayment.for_fee(instance, instance.amount_paid - before, instance.payment_method)])
@@ -1,17 +1,37 @@
 from rest_framework import serializers
-from students.models import Student, StudentFee, FeeGeneration
+from sms.serializers import FastListSerializer, SparseFieldsMixin
+from students.models import ArchivedStudentFee, FeePayment, Student, StudentAccount, StudentFee, FeeGeneration
+
+class StudentAccountSerializer (serializers.ModelSerializer):
+    class Meta:
+        model = StudentAccount
+        exclude = ['student']
+
+class StudentSerializer (SparseFieldsMixin, serializers.ModelSerializer):
+    account = StudentAccountSerializer(read_only=True)
 
-class StudentSerializer (serializers.ModelSerializer):
     class Meta:
         model = Student
         fields = '__all__'
+        list_serializer_class = FastListSerializer
 
 class FeeGenSerializer (serializers.ModelSerializer):
     class Meta:
         model = FeeGeneration
         fields = '__all__'
 
-class StudentFeeUpdateSerializer (serializers.ModelSerializer):
+class PaymentMethodMixin(serializers.Serializer):
+    # How a change to amount_paid was paid; stored on the FeePayment log
+    payment_method = serializers.ChoiceField(choices=FeePayment.Method.choices, write_only=True, required=False)
+
+    def create(self, validated_data):
+        payment_method = validated_data.pop('payment_method', None)
+        instance = self.Meta.model(**validated_data)
+        instance.payment_method = payment_method
+        instance.save()
+        return instance
+
+class StudentFeeUpdateSerializer (PaymentMethodMixin, serializers.ModelSerializer):
     class Meta:
         model = StudentFee
         fields = '__all__'
@@ -21,7 +41,7 @@ class StudentInfoSerializer(serializers.ModelSerializer):
         model = Student
         fields = ['roll_no', 'name', 'grade']
 
-class StudentFeeSerializer(serializers.ModelSerializer):
+class StudentFeeSerializer(SparseFieldsMixin, PaymentMethodMixin, serializers.ModelSerializer):
     student_info = StudentInfoSerializer(source='student')
     student = serializers.PrimaryKeyRelatedField(queryset=Student.objects.all(), write_only=True)
 
@@ -30,9 +50,10 @@ class StudentFeeSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'student', 'student_info', 'month', 'tuition_fee', 'exam_fee', 'ac_charges',
             'stationary_charges', 'admission_fee', 'lab_charges', 'security_fee', 'misc', 'description',
-            'pending', 'total_fee', 'amount_paid', 'balance', 'paid'  
+            'pending', 'total_fee', 'amount_paid', 'balance', 'paid', 'payment_method', 'updated_at'
         ]
-        read_only_fields = ['total_fee', 'balance']  
+        read_only_fields = ['total_fee', 'balance']
+        list_serializer_class = FastListSerializer
 
     def update(self, instance, validated_data):
         # Extract and update nested student info
@@ -51,4 +72,25 @@ class StudentFeeSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
 
-        return instance
\ No newline at end of file
+        return instance
+
+class FeePaymentEntrySerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    amount_paid = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    method = serializers.ChoiceField(choices=FeePayment.Method.choices, required=False)
+
+class FeePaymentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = FeePayment
+        fields = '__all__'
+        list_serializer_class = FastListSerializer
+
+class StudentWithdrawSerializer(serializers.Serializer):
+    roll_nos = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    graduate = serializers.BooleanField(default=True)
+
+class ArchivedStudentFeeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedStudentFee
+        fields = '__all__'
+
@@ -1,3 +1,444 @@
+import csv
+import io
+import zipfile
+from datetime import date, datetime, timezone
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
 from django.test import TestCase
 
-# Create your tests here.
+from ledger.models import Ledger
+from sms.imports import ImportView
+from sms.testing import QueryBudgetMixin
+from sms.utils import calculate_monthly_profit
+from students.challans import render_challan_page
+from students.models import (
+    SECURITY_REFUND, Alumni, ArchivedStudentFee, FeeGeneration, FeePayment, Student, StudentAccount, StudentFee,
+)
+from students.utils import (
+    FeesNotFound, apply_fee_payments, archive_fees, balance_as_of, create_balance_checkpoints, generate_monthly_fees,
+    repair_fee_chains,
+)
+
+
+class StudentQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def add_students(self, count):
+        for i in range(count):
+            student = Student.objects.create(
+                name=f"Student {i}", grade=i % 10, father_name="Father", contact="0300", address="Street",
+                tuition_fee=5000,
+            )
+            StudentFee.objects.create(student=student, month=date(2025, 1, 1), tuition_fee=5000)
+
+    def test_student_fee_list(self):
+        self.assertQueryCountFlat('/api/studentfees/', self.add_students)
+
+    def test_student_fee_list_paginated(self):
+        self.assertQueryCountFlat('/api/studentfees/?page_size=50&grade=1', self.add_students)
+
+    def test_student_list(self):
+        self.assertQueryCountFlat('/api/students/', self.add_students)
+
+    def test_student_fee_admin_changelist(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.assertQueryCountFlat('/admin/students/studentfee/', self.add_students)
+
+
+class StudentWithdrawTests(TestCase):
+    def create_students(self, count):
+        return [
+            Student.objects.create(
+                name=f"Student {i}", grade=5, father_name="Father", contact="0300", address="Street",
+                tuition_fee=5000, security_fee=2000,
+            )
+            for i in range(count)
+        ]
+
+    def test_save_without_enrolment_change_skips_refund_checks(self):
+        student = Student.objects.get(pk=self.create_students(1)[0].pk)
+        student.name = "Renamed"
+        with self.assertNumQueries(3):  # savepoint, UPDATE, release
+            student.save()
+
+    def test_single_unenrol_creates_refund(self):
+        student = Student.objects.get(pk=self.create_students(1)[0].pk)
+        student.enrolled = False
+        student.save()
+        refund = StudentFee.objects.get(student=student, description=SECURITY_REFUND)
+        self.assertEqual(refund.total_fee, -2000)
+
+    def test_bulk_withdraw_matches_single_unenrol(self):
+        students = self.create_students(5)
+        single = Student.objects.get(pk=students[0].pk)
+        single.enrolled = False
+        single.save()
+
+        response = self.client.post(
+            '/api/students/withdraw/', {'roll_nos': [s.pk for s in students]}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.json()['withdrawn']), [s.pk for s in students[1:]])
+        self.assertFalse(Student.objects.filter(enrolled=True).exists())
+        self.assertEqual(StudentFee.objects.filter(description=SECURITY_REFUND).count(), 5)
+        self.assertEqual(Alumni.objects.count(), 4)
+        self.assertEqual(
+            Ledger.objects.get().MonthlyStudentFees,
+            StudentFee.objects.aggregate(total=Sum('total_fee'))['total'],
+        )
+        self.assertEqual(
+            set(Student.objects.values_list('pending_fee', flat=True)), {0}
+        )
+
+
+class StudentImportExportTests(TestCase):
+    header = 'name,grade,father_name,contact,address,tuition_fee,security_fee\n'
+
+    def upload(self, body):
+        return self.client.post('/api/students/import/', {'file': SimpleUploadedFile('students.csv', body.encode())})
+
+    def test_import_creates_students_and_first_fees(self):
+        response = self.upload(self.header + 'Ali,3,Father,0300,Street,5000,1000\nSara,4,Father,0300,Street,6000,0\n')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 2)
+        ali = Student.objects.get(name='Ali')
+        self.assertEqual(ali.pending_fee, 6000)
+        self.assertEqual(StudentFee.objects.get(student=ali).total_fee, 6000)
+        self.assertEqual(Ledger.objects.get().MonthlyStudentFees, 12000)
+
+    def test_import_with_bad_row_saves_nothing(self):
+        response = self.upload(self.header + 'Ali,3,Father,0300,Street,5000,1000\nSara,four,Father,0300,Street,6000,0\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0]['row'], 3)
+        self.assertFalse(Student.objects.exists())
+
+    def test_export_round_trips(self):
+        self.upload(self.header + 'Ali,3,Father,0300,Street,5000,1000\n')
+        response = self.client.get('/api/students/export/', {'grade': 3})
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].endswith(',Ali,3,Father,0300,,,Street,5000.00,1000.00,0.00,6000.00,True,6000.00,0.00,0.00,1'))
+
+    def test_import_view_without_save_chunk_fails_when_defined(self):
+        with self.assertRaises(TypeError):
+            type('BrokenImportView', (ImportView,), {})
+
+
+class FeeAgingReportTests(TestCase):
+    def test_balance_is_aged_newest_charges_first(self):
+        student = Student.objects.create(
+            name="Ali", grade=3, father_name="Father", contact="0300", address="Street", tuition_fee=1000,
+        )
+        StudentFee.objects.filter(student=student).update(month=date(2025, 1, 1))
+        pending = 1000
+        for month in (2, 3, 4, 5, 6):
+            # 2500 paid in April clears January, February and half of March
+            fee = StudentFee.objects.create(
+                student=student, month=date(2025, month, 1), tuition_fee=1000, pending=pending,
+                amount_paid=2500 if month == 4 else 0,
+            )
+            pending = fee.balance
+
+        response = self.client.get('/api/reports/aging/', {'as_of': '2025-06-15', 'grade': 3})
+        row = response.json()['students'][0]
+        self.assertEqual(row['outstanding'], '3500.00')
+        self.assertEqual(
+            (row['0_30'], row['31_60'], row['61_90'], row['over_90']), ('1000.00', '1000.00', '1000.00', '500.00')
+        )
+        self.assertEqual(response.json()['totals']['over_90'], '500.00')
+
+
+class StudentAccountTests(TestCase):
+    def test_account_follows_fee_changes(self):
+        student = Student.objects.create(
+            name="Ali", grade=3, father_name="Father", contact="0300", address="Street",
+            tuition_fee=5000, security_fee=1000,
+        )
+        fee = StudentFee.objects.create(student=student, month=date(2025, 2, 1), tuition_fee=5000, pending=6000)
+        apply_fee_payments({fee.pk: 4000})
+        StudentFee.objects.get(student=student, month=date(2025, 2, 1)).delete()
+        student.enrolled = False
+        student.save()
+
+        account = StudentAccount.objects.get(student=student)
+        self.assertEqual(
+            (account.total_billed, account.total_paid, account.total_refunded, account.fee_count, account.months_in_arrears),
+            (6000, 0, 1000, 2, 1),
+        )
+        self.assertEqual(StudentAccount.objects.verify(), [])
+
+
+class FeePaymentLogTests(TestCase):
+    def test_payments_are_logged_and_balance_rebuilt_from_checkpoint(self):
+        student = Student.objects.create(
+            name="Ali", grade=3, father_name="Father", contact="0300", address="Street", tuition_fee=5000,
+        )
+        fee = StudentFee.objects.get(student=student)
+        StudentFee.objects.filter(pk=fee.pk).update(month=date(2025, 1, 1))
+        apply_fee_payments({fee.pk: 2000})
+        FeePayment.objects.filter(fee=fee).update(paid_at=datetime(2025, 1, 10, tzinfo=timezone.utc))
+        create_balance_checkpoints(date(2025, 1, 31))
+
+        fee = StudentFee.objects.get(pk=fee.pk)
+        fee.amount_paid = 4500
+        fee.payment_method = FeePayment.Method.BANK
+        fee.save()
+
+        self.assertEqual(
+            list(FeePayment.objects.order_by('id').values_list('amount', 'method')),
+            [(2000, 'CASH'), (2500, 'BANK')],
+        )
+        self.assertEqual(balance_as_of(student, date(2025, 1, 31))['balance'], '3000.00')
+        today = balance_as_of(student, date.today())
+        self.assertEqual((today['checkpoint'], today['balance']), ('2025-01-31', '500.00'))
+
+
+class BulkFeePaymentTests(TestCase):
+    url = '/api/feepayments/bulk/'
+
+    def setUp(self):
+        self.fees = []
+        for name in ("Ali", "Sara"):
+            student = Student.objects.create(
+                name=name, grade=3, father_name="Father", contact="0300", address="Street", tuition_fee=5000,
+            )
+            self.fees.append(StudentFee.objects.get(student=student))
+
+    def assertNothingApplied(self, response):
+        self.assertEqual((response.status_code, response.json()['applied']), (400, 0))
+        self.assertFalse(FeePayment.objects.exists())
+        self.assertEqual(set(StudentFee.objects.values_list('amount_paid', flat=True)), {0})
+
+    def test_json_payments(self):
+        first, second = self.fees
+        response = self.client.post(self.url, [
+            {'id': first.pk, 'amount_paid': '5000', 'method': 'BANK'},
+            {'id': second.pk, 'amount_paid': '2000'},
+        ], content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual((results[0]['paid'], results[0]['balance']), (True, '0.00'))
+        self.assertEqual((results[1]['paid'], results[1]['balance']), (True, '3000.00'))
+        self.assertEqual(
+            list(FeePayment.objects.order_by('fee_id').values_list('amount', 'method')), [(5000, 'BANK'), (2000, 'CASH')]
+        )
+        self.assertEqual(Student.objects.get(pk=second.student_id).pending_fee, 3000)
+
+    def test_csv_payments(self):
+        body = f'id,amount_paid,method\n{self.fees[0].pk},1500,ONLINE\n'
+        response = self.client.post(self.url, {'file': SimpleUploadedFile('payments.csv', body.encode())})
+        self.assertEqual((response.status_code, response.json()['applied']), (200, 1))
+        self.assertEqual(StudentFee.objects.get(pk=self.fees[0].pk).amount_paid, 1500)
+
+    def test_one_bad_row_rejects_all(self):
+        response = self.client.post(self.url, {'payments': [
+            {'id': self.fees[0].pk, 'amount_paid': '5000'},
+            {'id': self.fees[1].pk, 'amount_paid': '-1'},
+        ]}, content_type='application/json')
+        self.assertNothingApplied(response)
+        self.assertEqual([result['row'] for result in response.json()['results'] if 'errors' in result], [2])
+
+    def test_duplicate_ids_are_rejected(self):
+        fee = self.fees[0]
+        response = self.client.post(self.url, [
+            {'id': fee.pk, 'amount_paid': '1000'}, {'id': fee.pk, 'amount_paid': '2000'},
+        ], content_type='application/json')
+        self.assertNothingApplied(response)
+        self.assertEqual(response.json()['results'][1]['errors'], {'id': ['Duplicate fee id.']})
+
+    def test_missing_fee_is_a_row_error(self):
+        missing = self.fees[1].pk
+        self.fees[1].delete()
+        response = self.client.post(self.url, [
+            {'id': self.fees[0].pk, 'amount_paid': '1000'}, {'id': missing, 'amount_paid': '1000'},
+        ], content_type='application/json')
+        self.assertNothingApplied(response)
+        self.assertEqual(response.json()['results'][1]['errors'], {'id': ['Fee not found.']})
+        with self.assertRaises(FeesNotFound):
+            apply_fee_payments({self.fees[0].pk: 1000, missing: 1000})
+
+
+class FeeChallanTests(TestCase):
+    url = '/api/challans/'
+
+    def setUp(self):
+        cache.clear()
+        for name in ("Ali Raza", "Zoë Şahin علی", "Sara"):
+            Student.objects.create(
+                name=name, grade=3, father_name="Father", contact="0300", address="Street", tuition_fee=5000,
+            )
+        self.ids = ','.join(str(pk) for pk in StudentFee.objects.order_by('id').values_list('pk', flat=True))
+
+    def download(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_single_pdf(self):
+        fee = StudentFee.objects.get(student__name="Ali Raza")
+        pdf = self.download(ids=fee.pk)
+        self.assertTrue(pdf.startswith(b'%PDF-1.4'))
+        self.assertIn(b'/Count 1', pdf)
+        self.assertIn(b'(Student Name: Ali Raza)', pdf)
+        self.assertTrue(pdf.endswith(b'%%EOF\n'))
+
+    def test_names_outside_winansi(self):
+        # Accents the standard fonts lack are dropped; other scripts print as '?'
+        pdf = self.download(ids=StudentFee.objects.get(student__name__startswith="Zo").pk)
+        self.assertIn(b'(Student Name: Zo\xeb Sahin ???)', pdf)
+
+    def test_zip_of_challans(self):
+        archive = zipfile.ZipFile(io.BytesIO(self.download(ids=self.ids, output='zip')))
+        names = archive.namelist()
+        self.assertEqual(len(names), 3)
+        self.assertTrue(all(name.startswith('Fee_Challan_') and name.endswith('.pdf') for name in names))
+        self.assertTrue(all(archive.read(name).startswith(b'%PDF') for name in names))
+
+    @mock.patch('students.utils.render_challan_page', wraps=render_challan_page)
+    def test_pages_are_rendered_lazily_and_cached(self, render):
+        response = self.client.get(self.url, {'ids': self.ids})
+        self.assertEqual(render.call_count, 0)
+        first = b''.join(response.streaming_content)
+        self.assertEqual((render.call_count, first.count(b'/Type /Page ')), (3, 3))
+
+        self.assertEqual(self.download(ids=self.ids), first)
+        self.assertEqual(render.call_count, 3)
+
+        StudentFee.objects.filter(student__name="Sara").update(exam_fee=500)
+        self.download(ids=self.ids)
+        self.assertEqual(render.call_count, 4)
+
+
+class FeeGenerationIdempotencyTests(TestCase):
+    def test_repeated_generation_only_bills_missing_students(self):
+        for i in range(3):
+            Student.objects.create(
+                name=f"Student {i}", grade=1, father_name="Father", contact="0300", address="Street", tuition_fee=1000,
+            )
+        generate_monthly_fees(FeeGeneration(month=date(2025, 3, 1)))
+        Student.objects.create(name="Late", grade=1, father_name="Father", contact="0300", address="Street")
+
+        result = generate_monthly_fees(FeeGeneration(month=date(2025, 3, 15)))
+        self.assertEqual((result['fees_created'], result['fees_skipped']), (1, 3))
+        self.assertEqual(StudentFee.objects.filter(period=date(2025, 3, 1)).count(), 4)
+
+        fee = StudentFee.objects.filter(period=date(2025, 3, 1)).first()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            StudentFee.objects.bulk_create([StudentFee(student_id=fee.student_id, period=fee.period, total_fee=0)])
+
+
+class FeeArchiveTests(TestCase):
+    def test_archived_fees_still_count_in_reports(self):
+        student = Student.objects.create(
+            name="Ali", grade=3, father_name="Father", contact="0300", address="Street", tuition_fee=5000,
+        )
+        old = [
+            StudentFee.objects.create(student=student, month=date(2023, month, 1), tuition_fee=5000)
+            for month in (5, 6, 7)
+        ]
+        apply_fee_payments({old[0].pk: 5000, old[1].pk: 5000})
+        ledger = list(Ledger.objects.order_by('month').values_list('month', 'MonthlyStudentFees'))
+        balance = balance_as_of(student, date.today())
+
+        # July still has a balance on it and stays with the latest fee
+        self.assertEqual(archive_fees(date(2024, 4, 1)), 2)
+        self.assertEqual(ArchivedStudentFee.objects.count(), 2)
+        self.assertEqual(StudentFee.objects.filter(student=student).count(), 2)
+        self.assertTrue(StudentFee.objects.filter(pk=old[2].pk).exists())
+        self.assertFalse(FeePayment.objects.filter(fee__isnull=False, fee_month__year=2023).exists())
+
+        calculate_monthly_profit()
+        self.assertEqual(list(Ledger.objects.order_by('month').values_list('month', 'MonthlyStudentFees')), ledger)
+        self.assertEqual(StudentAccount.objects.verify(), [])
+        self.assertEqual(balance_as_of(student, date.today()), balance)
+        # The student's latest fee carries the balance and is never archived
+        self.assertEqual(archive_fees(date.today()), 0)
+
+
+    def test_lists_and_exports_include_archived_fees(self):
+        student = Student.objects.create(
+            name="Ali", grade=3, father_name="Father", contact="0300", address="Street", tuition_fee=5000,
+        )
+        old = [
+            StudentFee.objects.create(student=student, month=date(2023, month, 1), tuition_fee=5000)
+            for month in (5, 6, 7)
+        ]
+        apply_fee_payments({old[0].pk: 5000, old[1].pk: 5000})
+        archive_fees(date(2024, 4, 1))
+        expected = [old[2].pk, old[1].pk, old[0].pk]
+        params = {'month_from': '2023-05', 'month_to': '2023-12'}
+
+        data = self.client.get('/api/studentfees/', params).json()
+        self.assertEqual([row['id'] for row in data], expected)
+        self.assertEqual(data[1]['student_info']['name'], "Ali")
+        first = self.client.get('/api/studentfees/', {**params, 'page_size': 2}).json()
+        second = self.client.get(first['next']).json()
+        self.assertEqual([row['id'] for row in first['results'] + second['results']], expected)
+        self.assertIsNone(second['next'])
+
+        response = self.client.get('/api/studentfees/export/', params)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8-sig'))))
+        self.assertEqual([int(row[0]) for row in rows[1:]], expected)
+
+
+class FeeChainTests(TestCase):
+    def setUp(self):
+        self.student = Student.objects.create(
+            name="Ali", grade=3, father_name="Father", contact="0300", address="Street", tuition_fee=1000,
+        )
+        StudentFee.objects.filter(student=self.student).update(month=date(2024, 12, 1))
+        calculate_monthly_profit()
+        for month in (1, 2, 3):
+            generate_monthly_fees(FeeGeneration(month=date(2025, month, 1)))
+        self.fees = list(StudentFee.objects.filter(student=self.student).order_by('month'))
+
+    def chain(self):
+        return list(
+            StudentFee.objects.filter(student=self.student).order_by('month')
+            .values_list('pending', 'total_fee', 'balance')
+        )
+
+    def test_correcting_an_old_fee_rechains_later_months(self):
+        response = self.client.patch(
+            f'/api/feeupdate/{self.fees[1].pk}/', {'amount_paid': 2000}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.chain(), [(0, 1000, 1000), (1000, 2000, 0), (0, 1000, 1000), (1000, 2000, 2000)])
+        self.assertEqual(Student.objects.get(pk=self.student.pk).pending_fee, 2000)
+
+        ledger = list(Ledger.objects.order_by('month').values_list('month', 'MonthlyStudentFees'))
+        calculate_monthly_profit()
+        self.assertEqual(list(Ledger.objects.order_by('month').values_list('month', 'MonthlyStudentFees')), ledger)
+        self.assertEqual(StudentAccount.objects.verify(), [])
+
+    def test_moving_a_fee_later_rechains_from_its_old_place(self):
+        fee = StudentFee.objects.get(pk=self.fees[1].pk)
+        fee.amount_paid = 500
+        fee.month = date(2025, 4, 1)
+        fee.save()
+        self.assertEqual(repair_fee_chains(dry_run=True)['fees_updated'], 0)
+        self.assertEqual(
+            Student.objects.get(pk=self.student.pk).pending_fee, StudentFee.objects.get(pk=fee.pk).balance
+        )
+
+    def test_failed_rechain_rolls_back_the_save(self):
+        fee = StudentFee.objects.get(pk=self.fees[1].pk)
+        fee.amount_paid = 2000
+        pending_fee = Student.objects.get(pk=self.student.pk).pending_fee
+        with mock.patch('students.utils.rechain_fees', side_effect=RuntimeError('crash')):
+            with self.assertRaises(RuntimeError):
+                fee.save()
+        self.assertEqual(StudentFee.objects.get(pk=fee.pk).amount_paid, 0)
+        self.assertEqual(Student.objects.get(pk=self.student.pk).pending_fee, pending_fee)
+
+    def test_repair_fixes_stale_chains(self):
+        # A correction made behind the models' back
+        StudentFee.objects.filter(pk=self.fees[0].pk).update(amount_paid=1000, balance=0, paid=True)
+        self.assertEqual(repair_fee_chains(dry_run=True), {'students': 1, 'fees_updated': 3})
+        repair_fee_chains()
+        self.assertEqual(self.chain(), [(0, 1000, 0), (0, 1000, 1000), (1000, 2000, 2000), (2000, 3000, 3000)])
+        self.assertEqual(repair_fee_chains(dry_run=True)['fees_updated'], 0)
+
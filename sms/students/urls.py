@@ -1,11 +1,22 @@
 from django.urls import path
-from .views import StudentFeeListCreateView, StudentFeeRetrieveUpdateDestroyView, FeeGenListCreateView,StudentListCreateView, StudentRetrieveUpdateDestroyView, FeeUpdateRetrieveUpdateDestroyView
+from sms.asyncviews import read_view
+from .views import StudentFeeListCreateView, StudentFeeRetrieveUpdateDestroyView, FeeGenListCreateView,StudentListCreateView, StudentRetrieveUpdateDestroyView, FeeUpdateRetrieveUpdateDestroyView, BulkFeePaymentView, FeeChallanView, StudentWithdrawView, StudentImportView, StudentExportView, StudentFeeExportView, FeeAgingReportView, FeePaymentListView, StudentBalanceView, ArchivedStudentFeeListView
 
 urlpatterns = [
-    path('api/studentfees/', StudentFeeListCreateView.as_view(), name='studentfee-list'),
+    path('api/studentfees/', read_view(StudentFeeListCreateView), name='studentfee-list'),
+    path('api/studentfees/archived/', ArchivedStudentFeeListView.as_view(), name='studentfee-archived'),
+    path('api/studentfees/export/', StudentFeeExportView.as_view(), name='studentfee-export'),
     path('api/studentfees/<int:pk>/', StudentFeeRetrieveUpdateDestroyView.as_view(), name='studentfee-detail'),
-    path('api/students/', StudentListCreateView.as_view(), name='studend-list'),
+    path('api/students/', read_view(StudentListCreateView), name='studend-list'),
+    path('api/students/import/', StudentImportView.as_view(), name='student-import'),
+    path('api/students/export/', StudentExportView.as_view(), name='student-export'),
+    path('api/students/withdraw/', StudentWithdrawView.as_view(), name='student-withdraw'),
     path('api/students/<int:pk>/', StudentRetrieveUpdateDestroyView.as_view(), name='student-detail'),
     path('api/feeupdate/<int:pk>/', FeeUpdateRetrieveUpdateDestroyView.as_view(), name='fee-detail'),
-    path('api/feegen/', FeeGenListCreateView.as_view(), name='fee-gen')
+    path('api/feegen/', FeeGenListCreateView.as_view(), name='fee-gen'),
+    path('api/students/<int:pk>/balance/', StudentBalanceView.as_view(), name='student-balance'),
+    path('api/feepayments/', FeePaymentListView.as_view(), name='fee-payments'),
+    path('api/feepayments/bulk/', BulkFeePaymentView.as_view(), name='fee-payments-bulk'),
+    path('api/reports/aging/', FeeAgingReportView.as_view(), name='fee-aging-report'),
+    path('api/challans/', FeeChallanView.as_view(), name='fee-challans'),
 ]
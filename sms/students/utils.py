@@ -0,0 +1,595 @@
+import hashlib
+import json
+import multiprocessing
+import threading
+import time
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import repeat
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Exists, F, FilteredRelation, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ledger.models import Ledger, mark_data_changed
+from sms.archive import archive_rows, history
+from sms.campus import campus_database, current_campus, use_campus
+from sms.pdf import write_pdf
+from sms.tracking import touch
+from students.challans import challan_context, render_challan_page
+from students.models import (
+    ARCHIVED_FEE_FIELDS, SECURITY_REFUND, Alumni, ArchivedStudentFee, BalanceCheckpoint, FeePayment, Student,
+    StudentAccount, StudentFee, FeeGeneration,
+)
+
+FEE_BATCH_SIZE = 500
+CHALLAN_CACHE_TIMEOUT = 30 * 24 * 60 * 60
+# Pages rendered per step of a streamed challan download
+CHALLAN_CHUNK_SIZE = 500
+
+_challan_pool = None
+_challan_pool_lock = threading.Lock()
+
+
+def refresh_pending_fees(students):
+    # Copy each student's latest fee balance into pending_fee with one UPDATE,
+    # touching only the students whose balance moved
+    latest_balance = Coalesce(Subquery(
+        StudentFee.objects
+        .filter(student=OuterRef('pk'))
+        .order_by('-month', '-id')
+        .values('balance')[:1]
+    ), F('pending_fee'))
+    return students.exclude(pending_fee=latest_balance).update(pending_fee=latest_balance, updated_at=timezone.now())
+
+
+# What compute_totals and the account/ledger deltas need
+CHAIN_FIELDS = (
+    'id', 'student_id', 'month', 'period', 'tuition_fee', 'exam_fee', 'ac_charges', 'stationary_charges',
+    'admission_fee', 'lab_charges', 'security_fee', 'misc', 'description', 'pending', 'total_fee', 'amount_paid',
+    'balance', 'paid',
+)
+
+
+def rechain_fees(starts, batch_size=FEE_BATCH_SIZE, dry_run=False):
+    # starts: {student id: (month, fee id) to re-chain after, or None for the whole
+    # chain}. Generated fees carry the previous fee's balance in `pending`, so a
+    # corrected fee changes every later generated fee of that student. One ordered
+    # scan per batch of students recomputes pending -> total_fee -> balance in
+    # memory and writes only the rows that changed, with batched UPDATEs plus the
+    # matching ledger, account and pending_fee updates. dry_run only counts.
+    student_ids = list(starts)
+    changed = 0
+    for start in range(0, len(student_ids), batch_size):
+        chunk = student_ids[start:start + batch_size]
+        chunk_starts = [starts[student_id] for student_id in chunk]
+        fees = StudentFee.objects.filter(student_id__in=chunk).order_by('student_id', 'month', 'id')
+        if None not in chunk_starts:
+            fees = fees.filter(month__gte=min(month for month, _ in chunk_starts))
+
+        with transaction.atomic(using=campus_database()):
+            to_update = []
+            account_changes = []
+            ledger_deltas = defaultdict(Decimal)
+            previous = {}
+            for fee in fees.select_for_update().only(*CHAIN_FIELDS):
+                begin = starts[fee.student_id]
+                if begin is not None and (fee.month, fee.id) < begin:
+                    continue
+                carried = previous.get(fee.student_id)
+                previous[fee.student_id] = fee.balance
+                # Only generated fees carry the balance forward; the first fee in
+                # the scan is the already-correct start of the chain
+                if fee.period is None or carried is None or fee.pending == carried:
+                    continue
+                before = StudentAccount.source_values(fee)
+                fee.pending = carried
+                fee.compute_totals()
+                previous[fee.student_id] = fee.balance
+                ledger_deltas[fee.month.replace(day=1)] += fee.total_fee - before['total_fee']
+                account_changes.append((before, StudentAccount.source_values(fee)))
+                to_update.append(fee)
+
+            changed += len(to_update)
+            if dry_run or not to_update:
+                continue
+            StudentFee.objects.bulk_update(
+                touch(to_update), ['pending', 'total_fee', 'balance', 'paid', 'updated_at'], batch_size=batch_size
+            )
+            refresh_pending_fees(Student.objects.filter(pk__in={fee.student_id for fee in to_update}))
+            StudentAccount.objects.apply_fee_changes(account_changes)
+            # Months in order, so concurrent chunks lock ledger rows in the same order
+            for month in sorted(ledger_deltas):
+                Ledger.objects.apply_delta(month, student_fees=ledger_deltas[month])
+            mark_data_changed()
+    return changed
+
+
+def _rechain_in_worker(campus, starts, batch_size, dry_run):
+    # Pool threads don't inherit the caller's campus
+    try:
+        with use_campus(campus):
+            return rechain_fees(starts, batch_size=batch_size, dry_run=dry_run)
+    finally:
+        connections.close_all()
+
+
+def repair_fee_chains(student_ids=None, workers=1, batch_size=FEE_BATCH_SIZE, dry_run=False):
+    # Re-chains every student's fees from their first one, a batch of students
+    # per task across `workers` threads (one connection each). Batches touch
+    # disjoint students, so they only meet on the Ledger month rows. SQLite
+    # allows a single writer, so it always runs in one thread there.
+    students = StudentFee.objects.values_list('student_id', flat=True).distinct().order_by('student_id')
+    if student_ids is not None:
+        students = students.filter(student_id__in=student_ids)
+    students = list(students)
+    chunks = [
+        dict.fromkeys(students[start:start + batch_size]) for start in range(0, len(students), batch_size)
+    ]
+
+    if workers <= 1 or connections[campus_database()].vendor == 'sqlite':
+        changed = sum(rechain_fees(chunk, batch_size=batch_size, dry_run=dry_run) for chunk in chunks)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sms-rechain') as executor:
+            changed = sum(executor.map(
+                _rechain_in_worker, repeat(current_campus()), chunks, repeat(batch_size), repeat(dry_run)
+            ))
+    return {'students': len(students), 'fees_updated': changed}
+
+
+class FeesNotFound(Exception):
+    def __init__(self, ids):
+        super().__init__(f"Fees not found: {sorted(ids)}")
+        self.ids = ids
+
+
+def apply_fee_payments(payments, batch_size=FEE_BATCH_SIZE, methods=None, paid_at=None):
+    # payments: {fee id: amount_paid}, methods: {fee id: FeePayment.Method};
+    # paid_at dates the logged payments (default: now).
+    # Recomputes totals in memory, then writes every fee with batched UPDATEs and
+    # refreshes pending_fee for the affected students. Raises FeesNotFound, with
+    # nothing written, if any fee doesn't exist once locked.
+    methods = methods or {}
+    with transaction.atomic(using=campus_database()):
+        fees = StudentFee.objects.select_for_update().in_bulk(list(payments))
+        missing = set(payments) - set(fees)
+        if missing:
+            raise FeesNotFound(missing)
+
+        ledger_deltas = defaultdict(Decimal)
+        account_changes = []
+        logged = []
+        for fee_id, amount_paid in payments.items():
+            fee = fees[fee_id]
+            before = StudentAccount.source_values(fee)
+            fee.amount_paid = amount_paid
+            fee.compute_totals()
+            ledger_deltas[fee.month.replace(day=1)] += fee.total_fee - before['total_fee']
+            account_changes.append((before, StudentAccount.source_values(fee)))
+            logged.append(FeePayment.for_fee(fee, amount_paid - before['amount_paid'], methods.get(fee_id), paid_at))
+
+        StudentFee.objects.bulk_update(
+            touch(fees.values()), ['amount_paid', 'total_fee', 'balance', 'paid', 'updated_at'], batch_size=batch_size
+        )
+        refresh_pending_fees(Student.objects.filter(pk__in={fee.student_id for fee in fees.values()}))
+        StudentAccount.objects.apply_fee_changes(account_changes)
+        FeePayment.objects.record(logged, batch_size=batch_size)
+        for month, delta in ledger_deltas.items():
+            Ledger.objects.apply_delta(month, student_fees=delta)
+        # Later months carried the old balances forward
+        starts = {}
+        for fee in fees.values():
+            starts[fee.student_id] = min(starts.get(fee.student_id, (fee.month, fee.id)), (fee.month, fee.id))
+        rechain_fees(starts, batch_size=batch_size)
+        mark_data_changed()
+
+    return fees
+
+
+def generate_monthly_fees(fee_generation, batch_size=FEE_BATCH_SIZE, progress=None):
+    # Idempotent per (student, period): students that already have this month's
+    # generated fee are skipped, so repeating a generation, or re-submitting one
+    # that was interrupted, only inserts the missing rows. Each batch commits on
+    # its own together with its pending_fee, account and ledger updates.
+    started = time.perf_counter()
+    period = fee_generation.month.replace(day=1)
+
+    billed = set(StudentFee.objects.filter(period=period).values_list('student_id', flat=True))
+    enrolled = list(Student.objects.filter(enrolled=True).order_by('roll_no').values_list('roll_no', flat=True))
+    to_bill = [roll_no for roll_no in enrolled if roll_no not in billed]
+
+    created = updated = 0
+    for start in range(0, len(to_bill), batch_size):
+        with transaction.atomic(using=campus_database()):
+            students = Student.objects.filter(pk__in=to_bill[start:start + batch_size], enrolled=True)
+
+            fees = []
+            rows = students.select_for_update().values_list('roll_no', 'tuition_fee', 'pending_fee')
+            for roll_no, tuition_fee, pending_fee in rows:
+                fee = StudentFee(
+                    student_id=roll_no,
+                    month=fee_generation.month,
+                    period=period,
+                    tuition_fee=tuition_fee,
+                    pending=pending_fee,
+                    exam_fee=fee_generation.exam_fee,
+                    ac_charges=fee_generation.ac_charges,
+                    stationary_charges=fee_generation.stationary_charges,
+                    admission_fee=0,
+                    lab_charges=fee_generation.lab_charges,
+                    security_fee=0
+                )
+                fee.compute_totals()
+                fees.append(fee)
+
+            # A concurrent run for the same period fails here on the unique
+            # (student, period) constraint rather than billing twice
+            StudentFee.objects.bulk_create(fees)
+            updated += refresh_pending_fees(students)
+            # bulk_create skips the account and ledger signals, so apply them here
+            StudentAccount.objects.apply_fee_changes((None, StudentAccount.source_values(fee)) for fee in fees)
+            Ledger.objects.apply_delta(fee_generation.month, student_fees=sum(fee.total_fee for fee in fees))
+            mark_data_changed()
+
+        created += len(fees)
+        if progress:
+            progress(min(start + batch_size, len(to_bill)), len(to_bill))
+
+    return {
+        'fees_created': created,
+        'fees_skipped': len(enrolled) - len(to_bill),
+        'students_updated': updated,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def generate_fees_job(serial, progress=None):
+    return generate_monthly_fees(FeeGeneration.objects.get(pk=serial), progress=progress)
+
+
+def withdraw_students(roll_nos, graduate=True, batch_size=FEE_BATCH_SIZE):
+    # Set-based version of Student.save's enrolled -> unenrolled path: security
+    # refunds, unenrolment and (for graduates) Alumni rows in a few statements
+    with transaction.atomic(using=campus_database()):
+        students = list(Student.objects.select_for_update().filter(pk__in=roll_nos, enrolled=True))
+        leaving = [student.pk for student in students]
+
+        refunded = set(
+            StudentFee.objects.filter(student_id__in=leaving, description=SECURITY_REFUND)
+            .values_list('student_id', flat=True)
+        )
+        refunds = []
+        for student in students:
+            if student.pk not in refunded:
+                fee = StudentFee.security_refund(student)
+                fee.compute_totals()
+                refunds.append(fee)
+        StudentFee.objects.bulk_create(refunds, batch_size=batch_size)
+        StudentAccount.objects.apply_fee_changes((None, StudentAccount.source_values(fee)) for fee in refunds)
+        FeePayment.objects.record([FeePayment.for_fee(fee, fee.amount_paid) for fee in refunds], batch_size=batch_size)
+
+        Student.objects.filter(pk__in=leaving).update(enrolled=False, updated_at=timezone.now())
+        refresh_pending_fees(Student.objects.filter(pk__in=leaving))
+
+        if graduate:
+            Alumni.objects.bulk_create([
+                Alumni(
+                    roll_no=student.roll_no,
+                    name=student.name,
+                    grade=student.grade,
+                    father_name=student.father_name,
+                    contact=student.contact,
+                    DOB=student.DOB,
+                    admission_date=student.admission_date,
+                    address=student.address,
+                )
+                for student in students
+            ], batch_size=batch_size, ignore_conflicts=True)
+
+        ledger_deltas = defaultdict(Decimal)
+        for fee in refunds:
+            ledger_deltas[fee.month.replace(day=1)] += fee.total_fee
+        for month, delta in ledger_deltas.items():
+            Ledger.objects.apply_delta(month, student_fees=delta)
+        mark_data_changed()
+
+    return {
+        'withdrawn': leaving,
+        'refunds_created': len(refunds),
+        'graduated': len(leaving) if graduate else 0,
+    }
+
+
+def import_students(rows, batch_size=FEE_BATCH_SIZE):
+    # rows: validated StudentSerializer data. Does what create_student_fee and
+    # StudentFee.save do per POST (first fee, pending_fee, ledger) in batched inserts
+    students = []
+    fees = []
+    for data in rows:
+        student = Student(**data)
+        fee = StudentFee(
+            tuition_fee=student.tuition_fee,
+            admission_fee=student.admission_fee,
+            security_fee=student.security_fee,
+            exam_fee=0,
+            ac_charges=0,
+            stationary_charges=0,
+            misc=0
+        )
+        fee.compute_totals()
+        student.pending_fee = fee.balance
+        students.append(student)
+        fees.append(fee)
+
+    with transaction.atomic(using=campus_database()):
+        Student.objects.bulk_create(students, batch_size=batch_size)
+        for student, fee in zip(students, fees):
+            fee.student = student
+        StudentFee.objects.bulk_create(fees, batch_size=batch_size)
+        StudentAccount.objects.apply_fee_changes((None, StudentAccount.source_values(fee)) for fee in fees)
+
+        if fees:
+            Ledger.objects.apply_delta(fees[0].month, student_fees=sum(fee.total_fee for fee in fees))
+        mark_data_changed()
+
+    return len(students)
+
+
+def _day_end(day):
+    # Payments are timestamped; compare against the next local midnight so the
+    # (student, paid_at) index is used
+    return timezone.make_aware(datetime.combine(day + timedelta(days=1), datetime.min.time()))
+
+
+def _billed(student, as_of, after=None):
+    # Fees for months in (after, as_of], archived ones included when needed
+    start = after + timedelta(days=1) if after else None
+    billed = Decimal(0)
+    for source in history(StudentFee, ArchivedStudentFee, start):
+        fees = source.filter(student=student, month__lte=as_of)
+        if start:
+            fees = fees.filter(month__gte=start)
+        billed += fees.aggregate(total=Sum(F('total_fee') - F('pending'), default=0))['total']
+    return billed
+
+
+def _paid(payments):
+    return payments.aggregate(total=Sum('amount', default=0))['total']
+
+
+def balance_as_of(student, as_of):
+    # billed - paid at the end of `as_of`, from the nearest earlier checkpoint plus
+    # the fees and payments after it. Negative means the student is in credit.
+    # Unlike pending_fee this does not clamp overpayments to zero.
+    checkpoint = (
+        BalanceCheckpoint.objects.filter(student=student, as_of__lte=as_of).order_by('-as_of').first()
+    )
+    payments = FeePayment.objects.filter(student=student, paid_at__lt=_day_end(as_of))
+    billed = paid = Decimal(0)
+    if checkpoint:
+        payments = payments.filter(paid_at__gte=_day_end(checkpoint.as_of))
+        billed, paid = checkpoint.billed, checkpoint.paid
+
+    billed += _billed(student, as_of, checkpoint.as_of if checkpoint else None)
+    paid += _paid(payments)
+    return {
+        'student': student.pk,
+        'as_of': as_of.isoformat(),
+        'checkpoint': checkpoint.as_of.isoformat() if checkpoint else None,
+        'billed': f"{billed:.2f}",
+        'paid': f"{paid:.2f}",
+        'balance': f"{billed - paid:.2f}",
+    }
+
+
+def create_balance_checkpoints(as_of, full=False, batch_size=FEE_BATCH_SIZE):
+    # One checkpoint per student at the end of `as_of`, rolled forward from the
+    # previous checkpoint date with two grouped queries (or from scratch with full)
+    previous = None
+    if not full:
+        previous = (
+            BalanceCheckpoint.objects.filter(student__campus=current_campus(), as_of__lt=as_of).order_by('-as_of')
+            .values_list('as_of', flat=True).first()
+        )
+
+    payments = FeePayment.objects.filter(paid_at__lt=_day_end(as_of))
+    start = {}
+    if previous:
+        payments = payments.filter(paid_at__gte=_day_end(previous))
+        start = {
+            student_id: (billed, paid) for student_id, billed, paid in
+            BalanceCheckpoint.objects.filter(as_of=previous).values_list('student_id', 'billed', 'paid')
+        }
+
+    billed = defaultdict(int)
+    for source in history(StudentFee, ArchivedStudentFee, previous and previous + timedelta(days=1)):
+        fees = source.filter(month__lte=as_of)
+        if previous:
+            fees = fees.filter(month__gt=previous)
+        rows = fees.values('student_id').annotate(total=Sum(F('total_fee') - F('pending'))).order_by()
+        for student_id, total in rows.values_list('student_id', 'total'):
+            billed[student_id] += total or 0
+    paid = dict(
+        payments.values('student_id').annotate(total=Sum('amount')).order_by().values_list('student_id', 'total')
+    )
+
+    checkpoints = []
+    for student_id in Student.objects.values_list('pk', flat=True).iterator():
+        start_billed, start_paid = start.get(student_id, (0, 0))
+        checkpoints.append(BalanceCheckpoint(
+            student_id=student_id,
+            as_of=as_of,
+            billed=start_billed + billed.get(student_id, 0),
+            paid=start_paid + (paid.get(student_id) or 0),
+        ))
+    BalanceCheckpoint.objects.bulk_create(
+        checkpoints,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['student', 'as_of'],
+        update_fields=['billed', 'paid'],
+    )
+    return len(checkpoints)
+
+
+def archive_fees(before, batch_size=FEE_BATCH_SIZE, dry_run=False):
+    # Moves settled fees for months before `before` (a closed academic year's
+    # start) to the archive. A student's latest fee carries their current
+    # balance and stays, as does any fee with a balance left on it.
+    later_fee = StudentFee.objects.filter(student=OuterRef('student')).filter(
+        Q(month__gt=OuterRef('month')) | Q(month=OuterRef('month'), id__gt=OuterRef('id'))
+    )
+    fees = StudentFee.objects.filter(Exists(later_fee), month__lt=before).exclude(balance__gt=0)
+    if dry_run:
+        return fees.count()
+
+    def detach_payments(fee_ids):
+        # The payment log keeps student and fee_month
+        FeePayment.objects.filter(fee_id__in=fee_ids).update(fee=None)
+
+    archived = archive_rows(fees, ArchivedStudentFee, ARCHIVED_FEE_FIELDS, batch_size, detach_payments)
+    if archived:
+        mark_data_changed()
+    return archived
+
+
+AGING_BUCKETS = ('0_30', '31_60', '61_90', 'over_90')
+
+
+def aging_report(as_of=None, grade=None, detail=True):
+    # Ages each student's outstanding balance (pending_fee, which carries every
+    # unpaid month forward). Payments clear the oldest charges first, so the
+    # balance is made up of the newest charges: fill 0-30, 31-60 and 61-90 with
+    # the fee charged in those windows and put whatever is left in 90+.
+    # Only the last 90 days of fees are joined, so history length doesn't matter.
+    as_of = as_of or date.today()
+    cutoffs = [as_of - timedelta(days=days) for days in (30, 60, 90)]
+    charge = F('recent__total_fee') - F('recent__pending')
+
+    students = (
+        Student.objects.filter(pending_fee__gt=0)
+        .annotate(recent=FilteredRelation('studentfee', condition=Q(studentfee__month__gt=cutoffs[2])))
+        .values('roll_no', 'name', 'grade', 'pending_fee')
+        .annotate(
+            charged_0_30=Sum(charge, filter=Q(recent__month__gt=cutoffs[0])),
+            charged_31_60=Sum(charge, filter=Q(recent__month__gt=cutoffs[1], recent__month__lte=cutoffs[0])),
+            charged_61_90=Sum(charge, filter=Q(recent__month__lte=cutoffs[1])),
+        )
+        .order_by('-pending_fee', 'roll_no')
+    )
+    if grade is not None:
+        students = students.filter(grade=grade)
+
+    totals = dict.fromkeys(AGING_BUCKETS + ('outstanding',), Decimal(0))
+    rows = []
+    for student in students.iterator(chunk_size=FEE_BATCH_SIZE):
+        remaining = student['pending_fee']
+        buckets = {}
+        for bucket in AGING_BUCKETS[:3]:
+            buckets[bucket] = min(remaining, max(student[f'charged_{bucket}'] or 0, 0))
+            remaining -= buckets[bucket]
+        buckets['over_90'] = remaining
+
+        for bucket, amount in buckets.items():
+            totals[bucket] += amount
+        totals['outstanding'] += student['pending_fee']
+        if detail:
+            rows.append({
+                'roll_no': student['roll_no'],
+                'name': student['name'],
+                'grade': student['grade'],
+                'outstanding': f"{student['pending_fee']:.2f}",
+                **{bucket: f"{amount:.2f}" for bucket, amount in buckets.items()},
+            })
+
+    report = {
+        'as_of': as_of.isoformat(),
+        'totals': {bucket: f"{amount:.2f}" for bucket, amount in totals.items()},
+    }
+    if detail:
+        report['students'] = rows
+    return report
+
+
+def _get_challan_pool():
+    global _challan_pool
+    with _challan_pool_lock:
+        if _challan_pool is None:
+            # spawn, not fork: the web server process is multi-threaded
+            _challan_pool = ProcessPoolExecutor(
+                max_workers=settings.CHALLAN_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+    return _challan_pool
+
+
+def _render_challan_pages(contexts):
+    workers = settings.CHALLAN_RENDER_WORKERS
+    if workers <= 1 or len(contexts) < settings.CHALLAN_POOL_THRESHOLD:
+        return [render_challan_page(context) for context in contexts]
+    chunksize = max(1, len(contexts) // (workers * 4))
+    return list(_get_challan_pool().map(render_challan_page, contexts, chunksize=chunksize))
+
+
+def _cached_challan_pages(fees):
+    # One PDF page per fee, cached by fee id + a hash of everything printed on it,
+    # so only new or changed fees are rendered
+    contexts = [challan_context(fee) for fee in fees]
+    keys = [
+        f"challan:{context['id']}:{hashlib.sha256(json.dumps(context, sort_keys=True).encode()).hexdigest()[:20]}"
+        for context in contexts
+    ]
+    pages = cache.get_many(keys)
+
+    missing = [(key, context) for key, context in zip(keys, contexts) if key not in pages]
+    if missing:
+        rendered = dict(zip(
+            [key for key, _ in missing],
+            _render_challan_pages([context for _, context in missing]),
+        ))
+        cache.set_many(rendered, timeout=CHALLAN_CACHE_TIMEOUT)
+        pages.update(rendered)
+
+    return [pages[key] for key in keys]
+
+
+def challan_pages(fees, chunk_size=CHALLAN_CHUNK_SIZE):
+    # Yields the fees' pages, rendering (or reading from the cache) one chunk at
+    # a time as the response is streamed, so the first bytes go out after one chunk
+    for start in range(0, len(fees), chunk_size):
+        yield from _cached_challan_pages(fees[start:start + chunk_size])
+
+
+class _ZipStream:
+    # Write-only file object; zipfile falls back to streaming mode for it
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_challan_zip(fees, pages):
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for fee, page in zip(fees, pages):
+            name = '_'.join(fee.student.name.split())
+            archive.writestr(f"Fee_Challan_{name}_{fee.id}.pdf", b''.join(write_pdf([page])))
+            yield stream.pop()
+    yield stream.pop()
+
@@ -1,29 +1,323 @@
-from rest_framework import  generics
-from .models import Student, StudentFee, FeeGeneration
-from .serializers import StudentFeeSerializer, StudentSerializer, StudentFeeUpdateSerializer, FeeGenSerializer
+import csv
+import io
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from rest_framework import  generics, status
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.response import Response
+from jobs.serializers import JobSerializer
+from sms.campus import current_campus
+from sms.archive import ArchiveListMixin
+from sms.exports import ExportMixin
+from sms.filters import bool_param, date_param, filter_date_range, int_param
+from sms.imports import ImportView
+from sms.pdf import write_pdf
+from sms.sync import ConditionalListMixin
+from ledger.models import DataVersion
+from .models import ArchivedStudentFee, FeePayment, Student, StudentFee, FeeGeneration
+from .serializers import StudentFeeSerializer, StudentSerializer, StudentFeeUpdateSerializer, FeeGenSerializer, FeePaymentEntrySerializer, StudentWithdrawSerializer, FeePaymentSerializer, ArchivedStudentFeeSerializer
+from .utils import FeesNotFound, aging_report, apply_fee_payments, balance_as_of, challan_pages, import_students, stream_challan_zip, withdraw_students
+
+AGING_CACHE_TIMEOUT = 24 * 60 * 60
+
 # Create your views here.
 
-class StudentFeeListCreateView (generics.ListCreateAPIView):
-    queryset = StudentFee.objects.all()
+class StudentFeeListCreateView (ConditionalListMixin, ArchiveListMixin, generics.ListCreateAPIView):
+    # Join the student and load only the columns the serializer returns
+    queryset = StudentFee.objects.select_related('student').only(
+        *[field for field in StudentFeeSerializer.Meta.fields if field not in ('student_info', 'payment_method')],
+        'student__roll_no', 'student__name', 'student__grade'
+    )
+    archive_queryset = ArchivedStudentFee.objects.select_related('student').annotate(updated_at=F('archived_at'))
     serializer_class = StudentFeeSerializer
+    keyset_ordering = ('-month', '-id')
+    sync_fields = ('updated_at', 'student__updated_at')
+
+    def filter_rows(self, queryset):
+        queryset = filter_date_range(queryset, self.request, 'month', 'month_from', 'month_to')
+
+        paid = bool_param(self.request, 'paid')
+        if paid is not None:
+            queryset = queryset.filter(paid=paid)
+
+        grade = int_param(self.request, 'grade')
+        if grade is not None:
+            queryset = queryset.filter(student__grade=grade)
+
+        student = int_param(self.request, 'student')
+        if student is not None:
+            queryset = queryset.filter(student_id=student)
+
+        name = self.request.query_params.get('name')
+        if name:
+            queryset = queryset.filter(student__name__istartswith=name)
+
+        return queryset
+
+class StudentFeeExportView(ExportMixin, StudentFeeListCreateView):
+    # Same filters as the fee list, plus ?month=YYYY-MM for a single month
+    export_filename = 'fees'
+    export_fields = (
+        'id', ('roll_no', 'student__roll_no'), ('name', 'student__name'), ('grade', 'student__grade'), 'month',
+        'tuition_fee', 'exam_fee', 'ac_charges', 'stationary_charges', 'admission_fee', 'lab_charges',
+        'security_fee', 'misc', 'pending', 'total_fee', 'amount_paid', 'balance', 'paid', 'description',
+    )
+
+    def filter_rows(self, queryset):
+        return filter_date_range(super().filter_rows(queryset), self.request, 'month', 'month', 'month')
+
+class ArchivedStudentFeeListView(generics.ListAPIView):
+    # Fees of closed academic years (read-only); ?month_from=/?month_to=, ?student=
+    queryset = ArchivedStudentFee.objects.all()
+    serializer_class = ArchivedStudentFeeSerializer
+    keyset_ordering = ('-month', '-id')
+
+    def get_queryset(self):
+        queryset = filter_date_range(super().get_queryset(), self.request, 'month', 'month_from', 'month_to')
+        student = int_param(self.request, 'student')
+        if student is not None:
+            queryset = queryset.filter(student_id=student)
+        return queryset
 
 class StudentFeeRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = StudentFee.objects.all()
+    queryset = StudentFee.objects.select_related('student')
     serializer_class = StudentFeeSerializer
 
 
-class StudentListCreateView (generics.ListCreateAPIView):
-    queryset = Student.objects.all()
+class StudentListCreateView (ConditionalListMixin, generics.ListCreateAPIView):
+    queryset = Student.objects.select_related('account')
     serializer_class = StudentSerializer
+    keyset_ordering = ('roll_no',)
+    sync_fields = ('updated_at', 'account__updated_at')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        grade = int_param(self.request, 'grade')
+        if grade is not None:
+            queryset = queryset.filter(grade=grade)
+
+        enrolled = bool_param(self.request, 'enrolled')
+        if enrolled is not None:
+            queryset = queryset.filter(enrolled=enrolled)
+
+        name = self.request.query_params.get('name')
+        if name:
+            queryset = queryset.filter(name__istartswith=name)
+
+        return queryset
+
+class StudentImportView(ImportView):
+    serializer_class = StudentSerializer
+
+    def save_chunk(self, validated_rows):
+        return import_students(validated_rows)
+
+class StudentExportView(ExportMixin, StudentListCreateView):
+    export_filename = 'students'
+    export_fields = (
+        'roll_no', 'name', 'grade', 'father_name', 'contact', 'DOB', 'admission_date', 'address',
+        'tuition_fee', 'security_fee', 'admission_fee', 'pending_fee', 'enrolled',
+        ('total_billed', 'account__total_billed'), ('total_paid', 'account__total_paid'),
+        ('total_refunded', 'account__total_refunded'), ('months_in_arrears', 'account__months_in_arrears'),
+    )
 
 class StudentRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Student.objects.all()
+    queryset = Student.objects.select_related('account')
     serializer_class = StudentSerializer
 
 class FeeUpdateRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = StudentFee.objects.all()
+    queryset = StudentFee.objects.select_related('student')
     serializer_class = StudentFeeUpdateSerializer
 
 class FeeGenListCreateView (generics.ListCreateAPIView):
     queryset = FeeGeneration.objects.all()
-    serializer_class = FeeGenSerializer
\ No newline at end of file
+    serializer_class = FeeGenSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        fee_generation = serializer.save()
+
+        # Fees are generated by a background job; poll /api/jobs/<id>/ for progress
+        data = dict(serializer.data)
+        data['job'] = JobSerializer(fee_generation.job).data
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+
+class BulkFeePaymentView(generics.GenericAPIView):
+    # Post many payments at once: JSON [{"id": 1, "amount_paid": "6500", "method": "BANK"}, ...]
+    # or a CSV upload ("file") with id,amount_paid[,method] columns. Nothing is applied
+    # unless every row is valid.
+    serializer_class = FeePaymentEntrySerializer
+    parser_classes = [JSONParser, MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        rows = self.get_rows(request)
+        if not rows:
+            return Response({'detail': 'No payments given.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        payments = {}
+        methods = {}
+        for row_number, row in enumerate(rows, start=1):
+            serializer = self.get_serializer(data=row)
+            if not serializer.is_valid():
+                results.append({'row': row_number, 'id': row.get('id'), 'errors': serializer.errors})
+                continue
+            fee_id = serializer.validated_data['id']
+            if fee_id in payments:
+                results.append({'row': row_number, 'id': fee_id, 'errors': {'id': ['Duplicate fee id.']}})
+                continue
+            payments[fee_id] = serializer.validated_data['amount_paid']
+            if 'method' in serializer.validated_data:
+                methods[fee_id] = serializer.validated_data['method']
+            results.append({'row': row_number, 'id': fee_id})
+
+        if any('errors' in result for result in results):
+            return Response({'applied': 0, 'results': results}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Fees are checked for existence under the same lock that applies the payments
+        try:
+            fees = apply_fee_payments(payments, methods=methods)
+        except FeesNotFound as exc:
+            for result in results:
+                if result['id'] in exc.ids:
+                    result['errors'] = {'id': ['Fee not found.']}
+            return Response({'applied': 0, 'results': results}, status=status.HTTP_400_BAD_REQUEST)
+        for result in results:
+            fee = fees[result['id']]
+            result.update({
+                'student': fee.student_id,
+                'amount_paid': str(fee.amount_paid),
+                'total_fee': str(fee.total_fee),
+                'balance': str(fee.balance),
+                'paid': fee.paid,
+            })
+        return Response({'applied': len(fees), 'results': results})
+
+    def get_rows(self, request):
+        upload = request.FILES.get('file')
+        if upload:
+            return list(csv.DictReader(io.TextIOWrapper(upload, encoding='utf-8-sig')))
+        data = request.data
+        if isinstance(data, dict):
+            data = data.get('payments', [])
+        return [row for row in data if isinstance(row, dict)] if isinstance(data, list) else []
+
+
+class FeePaymentListView(generics.ListAPIView):
+    # The append-only payment log; ?student=, ?fee=, ?paid_from=/?paid_to= (dates)
+    queryset = FeePayment.objects.order_by('-paid_at', '-id')
+    serializer_class = FeePaymentSerializer
+    keyset_ordering = ('-paid_at', '-id')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for param in ('student', 'fee'):
+            value = int_param(self.request, param)
+            if value is not None:
+                queryset = queryset.filter(**{f'{param}_id': value})
+
+        paid_from = date_param(self.request, 'paid_from')
+        if paid_from:
+            queryset = queryset.filter(paid_at__date__gte=paid_from)
+        paid_to = date_param(self.request, 'paid_to', end_of_month=True)
+        if paid_to:
+            queryset = queryset.filter(paid_at__date__lte=paid_to)
+        return queryset
+
+class StudentBalanceView(generics.GenericAPIView):
+    # GET ?as_of=YYYY-MM-DD (default today): billed, paid and balance at that date,
+    # rebuilt from the nearest BalanceCheckpoint and the payment log
+    queryset = Student.objects.all()
+
+    def get(self, request, *args, **kwargs):
+        as_of = date_param(request, 'as_of') or date.today()
+        return Response(balance_as_of(self.get_object(), as_of))
+
+class StudentWithdrawView(generics.GenericAPIView):
+    # {"roll_nos": [...], "graduate": true}: unenrol many students at once, refund
+    # their security deposits and (when graduating) copy them into Alumni.
+    # Students that are already unenrolled are skipped.
+    serializer_class = StudentWithdrawSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = withdraw_students(
+            set(serializer.validated_data['roll_nos']),
+            graduate=serializer.validated_data['graduate'],
+        )
+        return Response(result)
+
+
+class FeeChallanView(generics.GenericAPIView):
+    # GET ?month=YYYY-MM&grade=&ids=1,2,3 -> one multi-page PDF, or ?output=zip
+    # for a ZIP with one PDF per fee. Large id selections can be POSTed as
+    # {"ids": [...], "output": "zip"}.
+    queryset = StudentFee.objects.select_related('student').only(
+        *[field for field in StudentFeeSerializer.Meta.fields if field not in ('student_info', 'payment_method', 'paid', 'amount_paid', 'balance')],
+        'student__roll_no', 'student__name', 'student__grade'
+    )
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        if not any(params.get(name) for name in ('month', 'grade', 'ids')):
+            return Response({'detail': 'Select fees with month, grade or ids.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        fees = filter_date_range(self.get_queryset(), request, 'month', 'month', 'month')
+        grade = int_param(request, 'grade')
+        if grade is not None:
+            fees = fees.filter(student__grade=grade)
+        if params.get('ids'):
+            try:
+                ids = [int(fee_id) for fee_id in params['ids'].split(',') if fee_id.strip()]
+            except ValueError:
+                return Response({'ids': ['Use comma separated fee ids.']}, status=status.HTTP_400_BAD_REQUEST)
+            fees = fees.filter(pk__in=ids)
+
+        return self.render_challans(fees, params.get('output'))
+
+    def post(self, request, *args, **kwargs):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not ids:
+            return Response({'ids': ['Give a list of fee ids.']}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = [int(fee_id) for fee_id in ids]
+        except (TypeError, ValueError):
+            return Response({'ids': ['Give a list of fee ids.']}, status=status.HTTP_400_BAD_REQUEST)
+        return self.render_challans(self.get_queryset().filter(pk__in=ids), request.data.get('output'))
+
+    def render_challans(self, fees, output):
+        fees = list(fees.order_by('student__grade', 'student__roll_no', 'month', 'id'))
+        if not fees:
+            return Response({'detail': 'No fees match the selection.'}, status=status.HTTP_404_NOT_FOUND)
+
+        # Pages are rendered chunk by chunk while the response streams
+        pages = challan_pages(fees)
+        if output == 'zip':
+            response = StreamingHttpResponse(stream_challan_zip(fees, pages), content_type='application/zip')
+            response['Content-Disposition'] = 'attachment; filename="fee_challans.zip"'
+        else:
+            response = StreamingHttpResponse(write_pdf(pages, page_count=len(fees)), content_type='application/pdf')
+            response['Content-Disposition'] = 'attachment; filename="fee_challans.pdf"'
+        return response
+
+
+class FeeAgingReportView(generics.GenericAPIView):
+    # Outstanding balances bucketed by age (0-30, 31-60, 61-90, 90+ days).
+    # ?grade=, ?as_of=YYYY-MM-DD, ?detail=false for the totals only. Cached until
+    # fee data changes.
+    def get(self, request, *args, **kwargs):
+        as_of = date_param(request, 'as_of') or date.today()
+        grade = int_param(request, 'grade')
+        detail = bool_param(request, 'detail')
+        detail = True if detail is None else detail
+
+        key = f"reports:aging:{current_campus()}:{DataVersion.objects.current()}:{as_of.isoformat()}:{grade}:{int(detail)}"
+        report = cache.get_or_set(key, lambda: aging_report(as_of, grade, detail), timeout=AGING_CACHE_TIMEOUT)
+        return Response(report)
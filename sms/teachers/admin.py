@@ -1,5 +1,5 @@
 from django.contrib import admin
-from teachers.models import Teacher, TeacherPay, GenerateTeacherPay
+from teachers.models import ArchivedTeacherPay, Teacher, TeacherPay, GenerateTeacherPay
 
 # Register your models here.
 @admin.register(Teacher)
@@ -12,6 +12,16 @@ class TeacherAdmin(admin.ModelAdmin):
 class TeacherPayAdmin(admin.ModelAdmin):
     list_display = ("teacher", "month", "pay", "paid")
     list_filter = ("paid", "month")
+    list_select_related = ("teacher",)
+
+
+@admin.register(ArchivedTeacherPay)
+class ArchivedTeacherPayAdmin(admin.ModelAdmin):
+    list_display = ("teacher", "month", "pay", "archived_at")
+    list_select_related = ("teacher",)
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(GenerateTeacherPay)
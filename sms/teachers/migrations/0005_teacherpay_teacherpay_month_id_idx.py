@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 04:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teachers', '0004_alter_teacher_teacher_doc'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='teacherpay',
+            index=models.Index(fields=['month', 'id'], name='teacherpay_month_id_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 04:29
+
+from django.db import migrations, models
+
+
+def set_generated_periods(apps, schema_editor):
+    # Pays created by an earlier GenerateTeacherPay get its period; duplicates
+    # from generating a month twice are left untagged for review
+    GenerateTeacherPay = apps.get_model('teachers', 'GenerateTeacherPay')
+    TeacherPay = apps.get_model('teachers', 'TeacherPay')
+    db_alias = schema_editor.connection.alias
+
+    months = set(GenerateTeacherPay.objects.using(db_alias).values_list('month', flat=True))
+    seen = set()
+    tagged = []
+    for pay_id, teacher_id, month in TeacherPay.objects.using(db_alias).filter(month__in=months).order_by('id').values_list('id', 'teacher_id', 'month'):
+        period = month.replace(day=1)
+        if (teacher_id, period) not in seen:
+            seen.add((teacher_id, period))
+            tagged.append(TeacherPay(id=pay_id, period=period))
+    TeacherPay.objects.using(db_alias).bulk_update(tagged, ['period'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teachers', '0005_teacherpay_teacherpay_month_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacherpay',
+            name='period',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(set_generated_periods, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='teacherpay',
+            constraint=models.UniqueConstraint(fields=('teacher', 'period'), name='teacherpay_teacher_period_uniq'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 04:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teachers', '0006_generation_period'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTeacherPay',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('month', models.DateField()),
+                ('pay', models.IntegerField(default=0)),
+                ('paid', models.BooleanField(default=False)),
+                ('period', models.DateField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_pays', to='teachers.teacher')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month', 'id'], name='archivedpay_month_id_idx')],
+            },
+        ),
+    ]
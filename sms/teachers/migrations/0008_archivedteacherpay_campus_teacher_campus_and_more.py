@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 04:40
+
+import sms.campus
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teachers', '0007_archivedteacherpay'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedteacherpay',
+            name='campus',
+            field=models.CharField(default=sms.campus.current_campus, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='campus',
+            field=models.CharField(default=sms.campus.current_campus, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='teacherpay',
+            name='campus',
+            field=models.CharField(default=sms.campus.current_campus, editable=False, max_length=20),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 05:51
+
+import sms.campus
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teachers', '0009_teacher_updated_at_teacherpay_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generateteacherpay',
+            name='campus',
+            field=models.CharField(default=sms.campus.current_campus, editable=False, max_length=20),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from sms.campus import CampusManager, current_campus
+from sms.tracking import TrackLoadedValuesMixin
 
 class Teacher(models.Model):
     name = models.CharField(max_length=50)
@@ -11,23 +13,72 @@ class Teacher(models.Model):
     joining_date = models.DateField(auto_now_add=True)
     enrolled = models.BooleanField(default=True)
     teacher_doc = models.FileField(upload_to='scanned_docs_teachers/', null=True, blank=True)
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = CampusManager()
 
     def __str__(self):
         return f"Mr. {self.name}"
 
 
-class TeacherPay(models.Model):
+class TeacherPay(TrackLoadedValuesMixin, models.Model):
     teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE)
     month = models.DateField()
     pay = models.IntegerField(default=0)
     paid = models.BooleanField(default=False)
+    # First day of the month for pays made by GenerateTeacherPay; null for
+    # hand-made pays. One generated pay per teacher and month.
+    period = models.DateField(null=True, blank=True, editable=False)
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = CampusManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['month', 'id'], name='teacherpay_month_id_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['teacher', 'period'], name='teacherpay_teacher_period_uniq'),
+        ]
 
     def __str__(self):
         return f"{self.teacher.name} - {self.month}"
 
 
+class ArchivedTeacherPay(models.Model):
+    # Paid TeacherPay rows of closed academic years, moved here by
+    # archive_history with their ids kept. Read-only history.
+    id = models.BigIntegerField(primary_key=True)
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name='archived_pays')
+    month = models.DateField()
+    pay = models.IntegerField(default=0)
+    paid = models.BooleanField(default=False)
+    period = models.DateField(null=True, blank=True)
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = CampusManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['month', 'id'], name='archivedpay_month_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.teacher_id} - {self.month} (archived)"
+
+
+ARCHIVED_PAY_FIELDS = ('teacher_id', 'month', 'pay', 'paid', 'period', 'campus')
+
+
 class GenerateTeacherPay(models.Model):
     month = models.DateField()
+    # Campus the pays were generated for; its job runs in that campus
+    campus = models.CharField(max_length=20, default=current_campus, editable=False)
+
+    objects = CampusManager()
 
     def __str__(self):
         return f"Pay for month: {self.month}"
@@ -36,11 +87,7 @@ class GenerateTeacherPay(models.Model):
 @receiver(post_save, sender=GenerateTeacherPay)
 def generate_pay_for_teachers(sender, instance, created, **kwargs):
     if created:
-        active_teachers = Teacher.objects.filter(enrolled=True)
-        for teacher in active_teachers:
-            TeacherPay.objects.create(
-                teacher=teacher,
-                pay=teacher.pay,
-                month=instance.month
-            )
+        from jobs.models import Job
+        from jobs.queue import enqueue
+        instance.job = enqueue(Job.Kind.GENERATE_TEACHER_PAY, instance.pk)
 
@@ -1,17 +1,38 @@
-from .models import Teacher, TeacherPay, GenerateTeacherPay
+from .models import ArchivedTeacherPay, Teacher, TeacherPay, GenerateTeacherPay
 from rest_framework import serializers
+from sms.serializers import FastListSerializer, SparseFieldsMixin
 
-class TeacherSerializer (serializers.ModelSerializer):
+class TeacherSerializer (SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Teacher
         fields = '__all__'
+        list_serializer_class = FastListSerializer
+
+class TeacherPaySerializer (SparseFieldsMixin, serializers.ModelSerializer):
+    teacher_name = serializers.CharField(source='teacher.name', read_only=True)
 
-class TeacherPaySerializer (serializers.ModelSerializer):
     class Meta:
         model = TeacherPay
         fields = '__all__'
+        list_serializer_class = FastListSerializer
 
 class GenTeachersPaySerializer (serializers.ModelSerializer):
     class Meta:
         model = GenerateTeacherPay
         fields = '__all__'
+
+class TeacherPayMarkSerializer (serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    month = serializers.DateField(input_formats=['%Y-%m', 'iso-8601'], required=False)
+    paid = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('month' in attrs):
+            raise serializers.ValidationError('Give either ids or month.')
+        return attrs
+
+class ArchivedTeacherPaySerializer (serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedTeacherPay
+        fields = '__all__'
+
@@ -1,3 +1,62 @@
+from datetime import date
+
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from ledger.models import Ledger
+from sms.testing import QueryBudgetMixin
+from teachers.models import GenerateTeacherPay, Teacher, TeacherPay
+from teachers.utils import generate_teacher_pay
+
+
+class TeacherQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def add_teachers(self, count):
+        for i in range(count):
+            teacher = Teacher.objects.create(name=f"Teacher {i}", contact="0300", cnic="00000", qualification="MSc", pay=40000)
+            TeacherPay.objects.create(teacher=teacher, month=date(2025, 1, 1), pay=teacher.pay)
+
+    def test_teacher_list(self):
+        self.assertQueryCountFlat('/api/teacher/', self.add_teachers)
+
+    def test_teacher_pay_list(self):
+        self.assertQueryCountFlat('/api/teacherpay/', self.add_teachers)
+
+    def test_teacher_pay_admin_changelist(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.assertQueryCountFlat('/admin/teachers/teacherpay/', self.add_teachers)
+
+
+class TeacherPayrollTests(TestCase):
+    def setUp(self):
+        for i in range(3):
+            Teacher.objects.create(name=f"Teacher {i}", contact="0300", cnic="00000", qualification="MSc", pay=40000)
+
+    def test_generation_is_batched_and_posts_to_ledger(self):
+        with self.assertNumQueries(12):
+            result = generate_teacher_pay(GenerateTeacherPay(month=date(2025, 3, 1)))
+        self.assertEqual(result['pays_created'], 3)
+        self.assertEqual(Ledger.objects.get(month=date(2025, 3, 1)).MonthlyTeacherPays, 120000)
+
+        result = generate_teacher_pay(GenerateTeacherPay(month=date(2025, 3, 20)))
+        self.assertEqual((result['pays_created'], result['pays_skipped']), (0, 3))
+
+        # Only enrolled teachers who already had the month count as skipped
+        Teacher.objects.filter(pk=Teacher.objects.order_by('pk').values('pk')[:1]).update(enrolled=False)
+        Teacher.objects.create(name="New", contact="0300", cnic="00000", qualification="MSc", pay=40000)
+        result = generate_teacher_pay(GenerateTeacherPay(month=date(2025, 3, 1)))
+        self.assertEqual((result['pays_created'], result['pays_skipped']), (1, 2))
+
+    def test_mark_paid_by_month_and_ids(self):
+        generate_teacher_pay(GenerateTeacherPay(month=date(2025, 3, 1)))
+        response = self.client.post('/api/teacherpay/mark-paid/', {'month': '2025-03'}, content_type='application/json')
+        self.assertEqual(response.json(), {'updated': 3})
+
+        pay = TeacherPay.objects.first()
+        response = self.client.post(
+            '/api/teacherpay/mark-paid/', {'ids': [pay.pk], 'paid': False}, content_type='application/json'
+        )
+        self.assertEqual(response.json(), {'updated': 1})
+        self.assertEqual(TeacherPay.objects.filter(paid=True).count(), 2)
+
+        response = self.client.post('/api/teacherpay/mark-paid/', {}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -1,9 +1,14 @@
 from django.urls import path
-from .views import TeacherApiView, TeacherPayApiView, GenTeacherPayApiView, TeacherRetrieveUpdateDestroyApiView, TeacherPayRetrieveUpdateDestroyApiView, GenTeacherPayRetrieveUpdateDelete
+from .views import TeacherApiView, TeacherPayApiView, GenTeacherPayApiView, TeacherRetrieveUpdateDestroyApiView, TeacherPayRetrieveUpdateDestroyApiView, GenTeacherPayRetrieveUpdateDelete, TeacherImportView, TeacherExportView, TeacherPayExportView, TeacherPayMarkApiView, ArchivedTeacherPayApiView
 
 urlpatterns = [
     path("api/teacher/", TeacherApiView.as_view(), name="teacher-list" ),
+    path("api/teacher/import/", TeacherImportView.as_view(), name="teacher-import" ),
+    path("api/teacher/export/", TeacherExportView.as_view(), name="teacher-export" ),
     path("api/teacherpay/", TeacherPayApiView.as_view(), name="teacher-pay-list" ),
+    path("api/teacherpay/archived/", ArchivedTeacherPayApiView.as_view(), name="teacher-pay-archived" ),
+    path("api/teacherpay/mark-paid/", TeacherPayMarkApiView.as_view(), name="teacher-pay-mark-paid" ),
+    path("api/teacherpay/export/", TeacherPayExportView.as_view(), name="teacher-pay-export" ),
     path("api/genteacherpay/", GenTeacherPayApiView.as_view(), name="gen-teacher-pay-list" ),
     path("api/teacher/<int:pk>/", TeacherRetrieveUpdateDestroyApiView.as_view(), name="teacher-detail" ),
     path("api/teacherpay/<int:pk>/", TeacherPayRetrieveUpdateDestroyApiView.as_view(), name="teacher-pay-detail" ),
@@ -0,0 +1,71 @@
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from ledger.models import Ledger, mark_data_changed
+from sms.archive import archive_rows
+from sms.campus import campus_database
+from teachers.models import ARCHIVED_PAY_FIELDS, ArchivedTeacherPay, Teacher, TeacherPay, GenerateTeacherPay
+
+PAY_BATCH_SIZE = 500
+
+
+def generate_teacher_pay(pay_generation, progress=None):
+    # One batched insert for the month's payroll, with the ledger updated in the
+    # same transaction. Idempotent per (teacher, period): teachers already paid
+    # for the month are skipped, so re-submitting only adds what's missing.
+    started = time.perf_counter()
+    period = pay_generation.month.replace(day=1)
+
+    with transaction.atomic(using=campus_database()):
+        paid = set(TeacherPay.objects.filter(period=period).values_list('teacher_id', flat=True))
+        enrolled = list(Teacher.objects.filter(enrolled=True).values_list('id', 'pay'))
+        pays = [
+            TeacherPay(teacher_id=teacher_id, pay=pay, month=pay_generation.month, period=period)
+            for teacher_id, pay in enrolled if teacher_id not in paid
+        ]
+        TeacherPay.objects.bulk_create(pays, batch_size=PAY_BATCH_SIZE)
+        # bulk_create skips the ledger signals
+        Ledger.objects.apply_delta(pay_generation.month, teacher_pays=sum(pay.pay for pay in pays))
+        mark_data_changed()
+
+    if progress:
+        progress(len(pays), len(pays))
+
+    return {
+        'pays_created': len(pays),
+        # Enrolled teachers who already had the month; a teacher who has left since isn't counted
+        'pays_skipped': len(enrolled) - len(pays),
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def mark_pays(pays, paid=True):
+    # One UPDATE for any number of pays; amounts are unchanged, so the ledger is too
+    with transaction.atomic(using=campus_database()):
+        updated = pays.exclude(paid=paid).update(paid=paid, updated_at=timezone.now())
+        mark_data_changed()
+    return updated
+
+
+def archive_pays(before, batch_size=PAY_BATCH_SIZE, dry_run=False):
+    # Paid pays for months before `before` move to the archive; unpaid ones stay
+    pays = TeacherPay.objects.filter(month__lt=before, paid=True)
+    if dry_run:
+        return pays.count()
+
+    archived = archive_rows(pays, ArchivedTeacherPay, ARCHIVED_PAY_FIELDS, batch_size)
+    if archived:
+        mark_data_changed()
+    return archived
+
+
+def generate_pay_job(pk, progress=None):
+    return generate_teacher_pay(GenerateTeacherPay.objects.get(pk=pk), progress=progress)
+
+
+def import_teachers(rows, batch_size=PAY_BATCH_SIZE):
+    # rows: validated TeacherSerializer data
+    teachers = Teacher.objects.bulk_create([Teacher(**data) for data in rows], batch_size=batch_size)
+    return len(teachers)
@@ -1,27 +1,108 @@
+from django.db.models import F
 from django.shortcuts import render
-from rest_framework import generics
-from .serializers import TeacherSerializer, TeacherPaySerializer, GenTeachersPaySerializer
-from .models import Teacher, TeacherPay, GenerateTeacherPay
+from rest_framework import generics, status
+from rest_framework.response import Response
+from jobs.serializers import JobSerializer
+from sms.archive import ArchiveListMixin
+from sms.exports import ExportMixin
+from sms.filters import bool_param, filter_date_range, int_param
+from sms.imports import ImportView
+from sms.sync import ConditionalListMixin
+from .serializers import TeacherSerializer, TeacherPaySerializer, GenTeachersPaySerializer, TeacherPayMarkSerializer, ArchivedTeacherPaySerializer
+from .models import ArchivedTeacherPay, Teacher, TeacherPay, GenerateTeacherPay
+from .utils import import_teachers, mark_pays
 
 # Create your views here.
-class TeacherApiView (generics.ListCreateAPIView):
+class TeacherApiView (ConditionalListMixin, generics.ListCreateAPIView):
     queryset = Teacher.objects.all()
     serializer_class = TeacherSerializer
 
-class TeacherPayApiView (generics.ListCreateAPIView):
-    queryset = TeacherPay.objects.all()
+class TeacherImportView (ImportView):
+    serializer_class = TeacherSerializer
+
+    def save_chunk(self, validated_rows):
+        return import_teachers(validated_rows)
+
+class TeacherExportView (ExportMixin, TeacherApiView):
+    export_filename = 'teachers'
+    keyset_ordering = ('id',)
+    export_fields = ('id', 'name', 'contact', 'cnic', 'qualification', 'pay', 'joining_date', 'enrolled')
+
+class TeacherPayApiView (ConditionalListMixin, ArchiveListMixin, generics.ListCreateAPIView):
+    queryset = TeacherPay.objects.select_related('teacher').only(
+        'id', 'teacher', 'month', 'period', 'pay', 'paid', 'campus', 'updated_at', 'teacher__id', 'teacher__name'
+    )
+    archive_queryset = ArchivedTeacherPay.objects.select_related('teacher').annotate(updated_at=F('archived_at'))
     serializer_class = TeacherPaySerializer
+    keyset_ordering = ('-month', '-id')
+    sync_fields = ('updated_at', 'teacher__updated_at')
+
+    def filter_rows(self, queryset):
+        queryset = filter_date_range(queryset, self.request, 'month', 'month_from', 'month_to')
+
+        paid = bool_param(self.request, 'paid')
+        if paid is not None:
+            queryset = queryset.filter(paid=paid)
+
+        teacher = int_param(self.request, 'teacher')
+        if teacher is not None:
+            queryset = queryset.filter(teacher_id=teacher)
+
+        return queryset
+
+class ArchivedTeacherPayApiView (generics.ListAPIView):
+    # Paid pays of closed academic years (read-only); ?month_from=/?month_to=, ?teacher=
+    queryset = ArchivedTeacherPay.objects.all()
+    serializer_class = ArchivedTeacherPaySerializer
+    keyset_ordering = ('-month', '-id')
+
+    def get_queryset(self):
+        queryset = filter_date_range(super().get_queryset(), self.request, 'month', 'month_from', 'month_to')
+        teacher = int_param(self.request, 'teacher')
+        if teacher is not None:
+            queryset = queryset.filter(teacher_id=teacher)
+        return queryset
+
+class TeacherPayExportView (ExportMixin, TeacherPayApiView):
+    export_filename = 'teacher-pays'
+    export_fields = ('id', ('teacher', 'teacher_id'), ('teacher_name', 'teacher__name'), 'month', 'pay', 'paid')
+
+class TeacherPayMarkApiView (generics.GenericAPIView):
+    # {"month": "2025-03"} or {"ids": [1, 2]}, optionally "paid": false to undo;
+    # applied with a single UPDATE
+    serializer_class = TeacherPayMarkSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if 'ids' in data:
+            pays = TeacherPay.objects.filter(pk__in=data['ids'])
+        else:
+            pays = TeacherPay.objects.filter(month__year=data['month'].year, month__month=data['month'].month)
+        return Response({'updated': mark_pays(pays, paid=data['paid'])})
 
 class GenTeacherPayApiView (generics.ListCreateAPIView):
     queryset = GenerateTeacherPay.objects.all()
     serializer_class = GenTeachersPaySerializer
 
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        pay_generation = serializer.save()
+
+        # Pays are generated by a background job; poll /api/jobs/<id>/ for progress
+        data = dict(serializer.data)
+        data['job'] = JobSerializer(pay_generation.job).data
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
 class TeacherRetrieveUpdateDestroyApiView (generics.RetrieveUpdateDestroyAPIView):
     queryset = Teacher.objects.all()
     serializer_class = TeacherSerializer
 
 class TeacherPayRetrieveUpdateDestroyApiView (generics.RetrieveUpdateDestroyAPIView):
-    queryset = TeacherPay.objects.all()
+    queryset = TeacherPay.objects.select_related('teacher')
     serializer_class = TeacherPaySerializer
 
 class GenTeacherPayRetrieveUpdateDelete (generics.RetrieveUpdateDestroyAPIView):
@@ -6,6 +6,7 @@ import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, Responsi
 const Dashboard = () => {
   const [ledgerData, setLedgerData] = useState(null);
   const [allLedgerData, setAllLedgerData] = useState([]);
+  const [lifetime, setLifetime] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [chartTimeframe, setChartTimeframe] = useState('3');
@@ -14,25 +15,30 @@ const Dashboard = () => {
     // Fetch ledger data when component mounts
     const fetchLedgerData = async () => {
       try {
-        const response = await ledgerService.getAllLedgers();
+        // Cached server-side summary; `monthly` holds the last 12 ledger months
+        const response = await ledgerService.getDashboardSummary({ months: 12 });
         
-        const data = response.data;
-        
-        if (!data || data.length === 0) {
+        if (!response.data) {
           throw new Error('No data received from server');
         }
         
+        // A school without ledger months yet gets an empty chart, not an error
+        const data = response.data.monthly || [];
+        
         // Sort data by date (most recent first)
         const sortedData = [...data].sort((a, b) => {
           return new Date(b.month) - new Date(a.month);
         });
         
         // Set the most recent month as current ledger data
-        setLedgerData(sortedData[0]);
+        setLedgerData(sortedData[0] || null);
         
         // Set all ledger data for the chart
         setAllLedgerData(sortedData);
         
+        // All-time totals over every ledger month, not just the charted ones
+        setLifetime(response.data.lifetime);
+        
         setError(null);
       } catch (error) {
         console.error('Error fetching ledger data:', error);
@@ -77,6 +83,12 @@ const Dashboard = () => {
           
           setLedgerData(fallbackData[0]);
           setAllLedgerData(fallbackData);
+          setLifetime({
+            student_fees: fallbackData.reduce((sum, item) => sum + parseFloat(item.MonthlyStudentFees), 0),
+            teacher_pays: fallbackData.reduce((sum, item) => sum + parseFloat(item.MonthlyTeacherPays), 0),
+            expenses: fallbackData.reduce((sum, item) => sum + parseFloat(item.MonthlyExpenses), 0),
+            profit: fallbackData.reduce((sum, item) => sum + parseFloat(item.MonthlyProfit), 0)
+          });
           
           // Clear error when using fallback data
           setError(null);
@@ -320,7 +332,7 @@ const Dashboard = () => {
       )}
 
       {/* Total Metrics Row */}
-      {!loading && allLedgerData.length > 0 && (
+      {!loading && lifetime && (
         <Row className="g-3 mb-4">
           <Col xs={12}>
             <Card className="shadow-sm border-0 bg-light">
@@ -335,9 +347,7 @@ const Dashboard = () => {
                       <div>
                         <h6 className="text-muted mb-0">Total Revenue</h6>
                         <h4 className="mb-0">
-                          {formatCurrency(
-                            allLedgerData.reduce((sum, item) => sum + parseFloat(item.MonthlyStudentFees), 0)
-                          )}
+                          {formatCurrency(parseFloat(lifetime.student_fees) || 0)}
                         </h4>
                       </div>
                     </div>
@@ -351,9 +361,7 @@ const Dashboard = () => {
                       <div>
                         <h6 className="text-muted mb-0">Total Teacher Pay</h6>
                         <h4 className="mb-0">
-                          {formatCurrency(
-                            allLedgerData.reduce((sum, item) => sum + parseFloat(item.MonthlyTeacherPays), 0)
-                          )}
+                          {formatCurrency(parseFloat(lifetime.teacher_pays) || 0)}
                         </h4>
                       </div>
                     </div>
@@ -367,9 +375,7 @@ const Dashboard = () => {
                       <div>
                         <h6 className="text-muted mb-0">Total Expenses</h6>
                         <h4 className="mb-0">
-                          {formatCurrency(
-                            allLedgerData.reduce((sum, item) => sum + parseFloat(item.MonthlyExpenses), 0)
-                          )}
+                          {formatCurrency(parseFloat(lifetime.expenses) || 0)}
                         </h4>
                       </div>
                     </div>
@@ -383,9 +389,7 @@ const Dashboard = () => {
                       <div>
                         <h6 className="text-muted mb-0">Total Profit</h6>
                         <h4 className="mb-0">
-                          {formatCurrency(
-                            allLedgerData.reduce((sum, item) => sum + parseFloat(item.MonthlyProfit), 0)
-                          )}
+                          {formatCurrency(parseFloat(lifetime.profit) || 0)}
                         </h4>
                       </div>
                     </div>
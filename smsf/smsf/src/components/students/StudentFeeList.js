@@ -1,41 +1,88 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import { useLocation } from 'react-router-dom'; // Add this import
 import studentService from '../../services/studentService';
 import { jsPDF } from 'jspdf';
 
+const PAGE_SIZE = 100;
+const GRADES = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10];
+
 const StudentFeeList = () => {
   const location = useLocation(); // Add this line
   const [fees, setFees] = useState([]);
-  const [filteredFees, setFilteredFees] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
   const [selectedFees, setSelectedFees] = useState([]);
   const [selectAll, setSelectAll] = useState(false);
   
-  // Filter states
+  // Filter states; sent to the API, which filters and pages on its indexes
   const [statusFilter, setStatusFilter] = useState('all');
-  const [monthFilter, setMonthFilter] = useState('all');
+  const [monthFilter, setMonthFilter] = useState('');
+  const [gradeFilter, setGradeFilter] = useState('all');
   const [searchTerm, setSearchTerm] = useState('');
+  const [search, setSearch] = useState('');
+
+  // Wait for typing to pause before searching
+  useEffect(() => {
+    const timer = setTimeout(() => setSearch(searchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
+  // Query params for the current filters: a roll no is looked up as the
+  // student, anything else as a name prefix
+  const filterParams = useCallback(() => {
+    const params = { page_size: PAGE_SIZE };
+    if (statusFilter !== 'all') params.paid = statusFilter === 'paid';
+    if (monthFilter) {
+      params.month_from = monthFilter;
+      params.month_to = monthFilter;
+    }
+    if (gradeFilter !== 'all') params.grade = gradeFilter;
+    if (/^\d+$/.test(search)) params.student = search;
+    else if (search) params.name = search;
+    return params;
+  }, [statusFilter, monthFilter, gradeFilter, search]);
+
+  const cursorOf = (next) => (next ? new URL(next).searchParams.get('cursor') : null);
 
-  // Function to fetch fees data
-  const fetchFees = async () => {
+  // Function to fetch the first page of fees for the current filters
+  const fetchFees = useCallback(async () => {
     try {
       setLoading(true);
-      const response = await studentService.getAllStudentFees();
-      setFees(response.data);
-      setFilteredFees(response.data);
+      const response = await studentService.getAllStudentFees(filterParams());
+      setFees(response.data.results);
+      setNextCursor(cursorOf(response.data.next));
       setLoading(false);
-      console.log('Fees data refreshed:', response.data.length, 'records');
     } catch (err) {
       setError('Failed to fetch student fees');
       setLoading(false);
       console.error('Error fetching student fees:', err);
     }
+  }, [filterParams]);
+
+  // Function to append the next page
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await studentService.getAllStudentFees({ ...filterParams(), cursor: nextCursor });
+      setFees((current) => [...current, ...response.data.results]);
+      setNextCursor(cursorOf(response.data.next));
+    } catch (err) {
+      setError('Failed to fetch student fees');
+      console.error('Error fetching student fees:', err);
+    } finally {
+      setLoadingMore(false);
+    }
   };
 
+  // Initial load, and again whenever a filter changes
   useEffect(() => {
     fetchFees();
-  }, []); // Initial load
+    // Reset selections when filters change
+    setSelectedFees([]);
+    setSelectAll(false);
+  }, [fetchFees]);
 
   // Add this new useEffect to detect URL changes and refresh parameter
   useEffect(() => {
@@ -60,53 +107,12 @@ const StudentFeeList = () => {
     }
   }, [location.state]);
 
-  // Get unique months from fees for filter dropdown
-  const getUniqueMonths = () => {
-    const monthsSet = new Set();
-    fees.forEach(fee => {
-      const monthYear = formatDate(fee.month);
-      monthsSet.add(monthYear);
-    });
-    return Array.from(monthsSet);
-  };
-
-  // Apply filters whenever filter states change
-  useEffect(() => {
-    let result = fees;
-    
-    // Apply status filter
-    if (statusFilter !== 'all') {
-      const isPaid = statusFilter === 'paid';
-      result = result.filter(fee => fee.paid === isPaid);
-    }
-    
-    // Apply month filter
-    if (monthFilter !== 'all') {
-      result = result.filter(fee => formatDate(fee.month) === monthFilter);
-    }
-    
-    // Apply search filter
-    if (searchTerm.trim() !== '') {
-      const term = searchTerm.toLowerCase();
-      result = result.filter(fee => 
-        fee.student_info.name.toLowerCase().includes(term) ||
-        String(fee.student_info.roll_no).toLowerCase().includes(term) ||
-        String(fee.student_info.grade).toLowerCase().includes(term)
-      );
-    }
-    
-    setFilteredFees(result);
-    // Reset selections when filters change
-    setSelectedFees([]);
-    setSelectAll(false);
-  }, [fees, statusFilter, monthFilter, searchTerm]);
-
   // Handle select all checkbox
   const handleSelectAll = (e) => {
     setSelectAll(e.target.checked);
     if (e.target.checked) {
-      // Select all currently filtered fees
-      setSelectedFees(filteredFees.map(fee => fee.id));
+      // Select all loaded fees
+      setSelectedFees(fees.map(fee => fee.id));
     } else {
       // Deselect all
       setSelectedFees([]);
@@ -121,7 +127,7 @@ const StudentFeeList = () => {
     } else {
       setSelectedFees([...selectedFees, id]);
       // Check if all are selected
-      if (selectedFees.length + 1 === filteredFees.length) {
+      if (selectedFees.length + 1 === fees.length) {
         setSelectAll(true);
       }
     }
@@ -141,7 +147,6 @@ const StudentFeeList = () => {
         
         // Update state to remove the deleted record
         setFees(fees.filter(fee => fee.id !== feeId));
-        setFilteredFees(filteredFees.filter(fee => fee.id !== feeId));
         
         // Also remove from selected fees if present
         if (selectedFees.includes(feeId)) {
@@ -314,19 +319,24 @@ const StudentFeeList = () => {
   };
 
   // Function to generate multiple fee challans
-  const generateMultipleChallans = () => {
+  const generateMultipleChallans = async () => {
     if (selectedFees.length === 0) {
       setError('Please select at least one student');
       return;
     }
 
-    const selectedFeeRecords = fees.filter(fee => selectedFees.includes(fee.id));
-    
-    if (window.confirm(`Are you sure you want to generate ${selectedFeeRecords.length} fee challan(s)?`)) {
+    if (window.confirm(`Are you sure you want to generate ${selectedFees.length} fee challan(s)?`)) {
       try {
-        selectedFeeRecords.forEach(fee => {
-          generateFeeChallan(fee);
-        });
+        // Rendered server-side into a single PDF so large selections don't block the tab
+        const response = await studentService.downloadChallans(selectedFees);
+        const url = window.URL.createObjectURL(new Blob([response.data], { type: 'application/pdf' }));
+        const link = document.createElement('a');
+        link.href = url;
+        link.setAttribute('download', 'Fee_Challans.pdf');
+        document.body.appendChild(link);
+        link.click();
+        link.remove();
+        window.URL.revokeObjectURL(url);
       } catch (err) {
         setError('Failed to generate multiple fee challans');
         console.error('Error generating multiple fee challans:', err);
@@ -354,9 +364,9 @@ const StudentFeeList = () => {
 
   // Calculate total fees paid and pending - updated for new model structure
   const calculateStats = () => {
-    const totalFees = filteredFees.reduce((sum, fee) => sum + parseFloat(fee.total_fee), 0);
-    const totalPaid = filteredFees.reduce((sum, fee) => sum + parseFloat(fee.amount_paid), 0);
-    const totalBalance = filteredFees.reduce((sum, fee) => sum + parseFloat(fee.balance), 0);
+    const totalFees = fees.reduce((sum, fee) => sum + parseFloat(fee.total_fee), 0);
+    const totalPaid = fees.reduce((sum, fee) => sum + parseFloat(fee.amount_paid), 0);
+    const totalBalance = fees.reduce((sum, fee) => sum + parseFloat(fee.balance), 0);
     
     return { totalFees, totalPaid, totalBalance };
   };
@@ -364,15 +374,14 @@ const StudentFeeList = () => {
   // Clear all filters
   const clearFilters = () => {
     setStatusFilter('all');
-    setMonthFilter('all');
+    setMonthFilter('');
+    setGradeFilter('all');
     setSearchTerm('');
   };
 
-  if (loading) return <div className="text-center mt-5"><div className="spinner-border" role="status"></div></div>;
   if (error) return <div className="alert alert-danger mt-3">{error}</div>;
 
   const { totalFees, totalPaid, totalBalance } = calculateStats();
-  const uniqueMonths = getUniqueMonths();
 
   return (
     <div className="container-fluid mt-4">
@@ -441,25 +450,34 @@ const StudentFeeList = () => {
                 <option value="unpaid">Unpaid</option>
               </select>
             </div>
-            <div className="col-md-3">
+            <div className="col-md-2">
               <label className="form-label">Month</label>
-              <select 
-                className="form-select" 
+              <input 
+                type="month" 
+                className="form-control" 
                 value={monthFilter} 
                 onChange={(e) => setMonthFilter(e.target.value)}
+              />
+            </div>
+            <div className="col-md-2">
+              <label className="form-label">Grade</label>
+              <select 
+                className="form-select" 
+                value={gradeFilter} 
+                onChange={(e) => setGradeFilter(e.target.value)}
               >
-                <option value="all">All Months</option>
-                {uniqueMonths.map((month, index) => (
-                  <option key={index} value={month}>{month}</option>
+                <option value="all">All Grades</option>
+                {GRADES.map((grade) => (
+                  <option key={grade} value={grade}>{grade}</option>
                 ))}
               </select>
             </div>
-            <div className="col-md-4">
+            <div className="col-md-3">
               <label className="form-label">Search Student</label>
               <input 
                 type="text" 
                 className="form-control" 
-                placeholder="Search by name, roll no, grade..." 
+                placeholder="Name or roll no..." 
                 value={searchTerm}
                 onChange={(e) => setSearchTerm(e.target.value)}
               />
@@ -476,7 +494,9 @@ const StudentFeeList = () => {
         </div>
       </div>
       
-      {filteredFees.length === 0 ? (
+      {loading ? (
+        <div className="text-center mt-5"><div className="spinner-border" role="status"></div></div>
+      ) : fees.length === 0 ? (
         <div className="alert alert-info">No fee records found</div>
       ) : (
         <div className="table-responsive">
@@ -519,7 +539,7 @@ const StudentFeeList = () => {
               </tr>
             </thead>
             <tbody>
-              {filteredFees.map((fee) => (
+              {fees.map((fee) => (
                 <tr key={fee.id} className={parseFloat(fee.balance) > 0 ? 'table-warning' : ''}>
                   <td>
                     <div className="form-check">
@@ -591,6 +611,13 @@ const StudentFeeList = () => {
               ))}
             </tbody>
           </table>
+          {nextCursor && (
+            <div className="text-center mb-4">
+              <button className="btn btn-outline-primary" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -10,6 +10,11 @@ const api = axios.create({
 // Add request interceptor for handling tokens or other auth
 api.interceptors.request.use(
   (config) => {
+    // Campus whose data to read and write (defaults to "main" on the server)
+    const campus = localStorage.getItem('campus');
+    if (campus) {
+      config.headers['X-Campus'] = campus;
+    }
     // You can add logic here to include auth tokens from localStorage
     // const token = localStorage.getItem('token');
     // if (token) {
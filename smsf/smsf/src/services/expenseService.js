@@ -2,9 +2,14 @@ import api from './api';
 
 // Expense API services
 const expenseService = {
-  // Get all expenses
-  getAllExpenses: () => {
-    return api.get('/api/expenses/');
+  // Get all expenses (optional filters / keyset paging: category, date_from, date_to, page_size, cursor; since: version from X-Sync-Version for a delta sync; fields / exclude: comma-separated names for a sparse response)
+  getAllExpenses: (params) => {
+    return api.get('/api/expenses/', { params });
+  },
+  
+  // Download expenses as CSV/XLSX (list filters plus output: 'csv' | 'xlsx')
+  exportExpenses: (params) => {
+    return api.get('/api/expenses/export/', { params, responseType: 'blob' });
   },
   
   // Get expense by ID
@@ -2,9 +2,24 @@ import api from './api';
 
 // Ledger API services
 const ledgerService = {
-  // Get all ledger entries
-  getAllLedgers: () => {
-    return api.get('/api/ledger/');
+  // Get all ledger entries (optional filters / keyset paging: month_from, month_to, page_size, cursor; since: version from X-Sync-Version for a delta sync; fields / exclude: comma-separated names for a sparse response)
+  getAllLedgers: (params) => {
+    return api.get('/api/ledger/', { params });
+  },
+  
+  // Download the ledger as CSV/XLSX (month_from, month_to, output)
+  exportLedger: (params) => {
+    return api.get('/api/ledger/export/', { params, responseType: 'blob' });
+  },
+  
+  // Ledger summed over campuses, with a per-campus breakdown (campuses: "main,north", month_from, month_to)
+  getConsolidatedLedger: (params) => {
+    return api.get('/api/ledger/consolidated/', { params });
+  },
+  
+  // Dashboard totals, outstanding balance and collection rate (params: months)
+  getDashboardSummary: (params) => {
+    return api.get('/api/dashboard/summary/', { params });
   },
   
   // Get ledger by ID
@@ -2,9 +2,9 @@ import api from './api';
 
 // Student API services
 const studentService = {
-  // Get all students
-  getAllStudents: () => {
-    return api.get('/api/students/');
+  // Get all students (optional filters / keyset paging: grade, name, enrolled, page_size, cursor; since: version from X-Sync-Version for a delta sync; fields / exclude: comma-separated names for a sparse response)
+  getAllStudents: (params) => {
+    return api.get('/api/students/', { params });
   },
   
   // Get student by ID
@@ -43,9 +43,14 @@ const studentService = {
     return api.delete(`/api/students/${id}/`);
   },
   
-  // Get all student fees
-  getAllStudentFees: () => {
-    return api.get('/api/studentfees/');
+  // Get all student fees (optional filters / keyset paging: month_from, month_to, paid, grade, name, page_size, cursor; since: version from X-Sync-Version for a delta sync; fields / exclude: comma-separated names for a sparse response)
+  getAllStudentFees: (params) => {
+    return api.get('/api/studentfees/', { params });
+  },
+  
+  // Download fees as CSV/XLSX (list filters or month, plus output: 'csv' | 'xlsx')
+  exportStudentFees: (params) => {
+    return api.get('/api/studentfees/export/', { params, responseType: 'blob' });
   },
   
   // Get student fee by ID
@@ -73,6 +78,48 @@ const studentService = {
     return api.put(`/api/feeupdate/${id}/`, feeData);
   },
   
+  // Unenrol many students, refund security deposits and (graduate: true) move them to alumni
+  withdrawStudents: (rollNos, graduate = true) => {
+    return api.post('/api/students/withdraw/', { roll_nos: rollNos, graduate });
+  },
+  
+  // Post many payments at once: [{ id, amount_paid }, ...]
+  bulkPayFees: (payments) => {
+    return api.post('/api/feepayments/bulk/', payments);
+  },
+  
+  // Render challans on the server as one multi-page PDF (or a ZIP with output: 'zip')
+  downloadChallans: (ids, output = 'pdf') => {
+    return api.post('/api/challans/', { ids, output }, { responseType: 'blob' });
+  },
+  
+  // Import students from a CSV/XLSX file (header row uses the API field names)
+  importStudents: (file, dryRun = false) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    return api.post('/api/students/import/', formData, { params: { dry_run: dryRun } });
+  },
+  
+  // Download students as CSV/XLSX (same filters as getAllStudents, plus output: 'csv' | 'xlsx')
+  exportStudents: (params) => {
+    return api.get('/api/students/export/', { params, responseType: 'blob' });
+  },
+  
+  // Payment log (params: student, fee, paid_from, paid_to, page_size, cursor)
+  getFeePayments: (params) => {
+    return api.get('/api/feepayments/', { params });
+  },
+  
+  // Billed, paid and balance for a student at a date (params: as_of)
+  getStudentBalance: (rollNo, params) => {
+    return api.get(`/api/students/${rollNo}/balance/`, { params });
+  },
+  
+  // Outstanding balances bucketed 0-30 / 31-60 / 61-90 / 90+ days (params: grade, as_of, detail)
+  getAgingReport: (params) => {
+    return api.get('/api/reports/aging/', { params });
+  },
+  
   // Generate fees for enrolled students
   generateFees: (feeData) => {
     return api.post('/api/feegen/', feeData);
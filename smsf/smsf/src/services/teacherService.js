@@ -35,9 +35,19 @@ const teacherService = {
     return api.delete(`/api/teacher/${id}/`);
   },
   
-  // Get all teacher payments
-  getAllTeacherPayments: () => {
-    return api.get('/api/teacherpay/');
+  // Get all teacher payments (optional filters / keyset paging: month_from, month_to, paid, teacher, page_size, cursor; since: version from X-Sync-Version for a delta sync; fields / exclude: comma-separated names for a sparse response)
+  getAllTeacherPayments: (params) => {
+    return api.get('/api/teacherpay/', { params });
+  },
+  
+  // Download teacher payments as CSV/XLSX (list filters plus output: 'csv' | 'xlsx')
+  exportTeacherPayments: (params) => {
+    return api.get('/api/teacherpay/export/', { params, responseType: 'blob' });
+  },
+  
+  // Mark many payments paid in one request: { ids: [...] } or { month: 'YYYY-MM' }, paid defaults to true
+  markTeacherPaymentsPaid: (data) => {
+    return api.post('/api/teacherpay/mark-paid/', data);
   },
   
   // Get teacher payment by ID
@@ -80,6 +90,18 @@ const teacherService = {
     return api.put(`/api/genteacherpay/${id}/`, paymentData);
   },
   
+  // Import teachers from a CSV/XLSX file (header row uses the API field names)
+  importTeachers: (file, dryRun = false) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    return api.post('/api/teacher/import/', formData, { params: { dry_run: dryRun } });
+  },
+  
+  // Download teachers as CSV/XLSX (output: 'csv' | 'xlsx')
+  exportTeachers: (params) => {
+    return api.get('/api/teacher/export/', { params, responseType: 'blob' });
+  },
+  
   // Delete generated teacher payment
   deleteGenTeacherPayment: (id) => {
     return api.delete(`/api/genteacherpay/${id}/`);